@@ -44,9 +44,10 @@ del _date
 __version__ = "0.7.2"
 version_info = (0, 7, 2)
 __author__ = "Rossen Georgiev"
-__all__ = ['IS', 'parse', 'passcode']
+__all__ = ['IS', 'parse', 'try_parse', 'Parser', 'FieldProfile', 'ObjectRegistry', 'passcode']
 
 from aprslib.exceptions import *
-from aprslib.parsing import parse
+from aprslib.parsing import parse, try_parse, Parser, FieldProfile
 from aprslib.passcode import passcode
 from aprslib.inet import IS
+from aprslib.objects import ObjectRegistry
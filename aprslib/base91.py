@@ -30,12 +30,80 @@ if sys.version_info < (3,):
 else:
     _range = range
 
+# the 91 digits and their values
+_digits = "".join(chr(33 + i) for i in _range(91))
+_values = dict((char, i) for i, char in enumerate(_digits))
+
 
 def to_decimal(text):
     """
     Takes a base91 char string and returns decimal
     """
 
+    if not isinstance(text, string_type):
+        raise TypeError("expected str or unicode, %s given" % type(text))
+
+    values = _values
+
+    try:
+        # 2 and 4 characters are the common widths, telemetry and
+        # compressed positions
+        if len(text) == 2:
+            return values[text[0]] * 91 + values[text[1]]
+        if len(text) == 4:
+            return ((values[text[0]] * 91 + values[text[1]]) * 91 + values[text[2]]) * 91 + values[text[3]]
+
+        decimal = 0
+        for char in text:
+            decimal = decimal * 91 + values[char]
+    except KeyError:
+        raise ValueError("invalid character in sequence")
+
+    return decimal
+
+
+def from_decimal(number, width=1):
+    """
+    Takes a decimal and returns base91 char string.
+    With optional parameter for fix with output
+    """
+    if not isinstance(number, int_type):
+        raise TypeError("Expected number to be int, got %s", type(number))
+    elif not isinstance(width, int_type):
+        raise TypeError("Expected width to be int, got %s", type(number))
+    elif number < 0:
+        raise ValueError("Expected number to be positive integer")
+
+    digits = _digits
+
+    if number < 91:
+        text = digits[number]
+    elif number < 8281:  # 91**2
+        text = digits[number // 91] + digits[number % 91]
+    elif number < 68574961:  # 91**4
+        high, low = divmod(number, 8281)
+        text = digits[high // 91] + digits[high % 91] + digits[low // 91] + digits[low % 91]
+        text = text.lstrip('!')
+    else:
+        chars = []
+        while number:
+            number, digit = divmod(number, 91)
+            chars.append(digits[digit])
+
+        text = "".join(reversed(chars))
+
+    if width > len(text):
+        return text.rjust(width, '!')
+
+    return text
+
+
+def to_decimal_reference(text):
+    """
+    Reference implementation of to_decimal(), the tests check the faster
+    one against it
+    """
+
     if not isinstance(text, string_type):
         raise TypeError("expected str or unicode, %s given" % type(text))
 
@@ -51,10 +119,10 @@ def to_decimal(text):
     return decimal if text != '' else 0
 
 
-def from_decimal(number, width=1):
+def from_decimal_reference(number, width=1):
     """
-    Takes a decimal and returns base91 char string.
-    With optional parameter for fix with output
+    Reference implementation of from_decimal(), the tests check the faster
+    one against it
     """
     text = []
 
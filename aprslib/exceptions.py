@@ -19,7 +19,51 @@
 Contains exception definitions for the module
 """
 
+
+class _IntEnumMeta(type):
+    """
+    Turns the int attributes of a class into members with .name and
+    .value, and looks them up by value on Class(value)
+    """
+    def __new__(mcs, name, bases, attrs):
+        cls = type.__new__(mcs, name, bases, attrs)
+        cls._members = {}
+
+        for key, value in attrs.items():
+            if key.startswith('_') or not isinstance(value, int):
+                continue
+
+            member = int.__new__(cls, value)
+            member.name = key
+            member.value = value
+            setattr(cls, key, member)
+            cls._members[value] = member
+
+        return cls
+
+    def __call__(cls, value):
+        try:
+            return cls._members[value]
+        except KeyError:
+            raise ValueError("%r is not a valid %s" % (value, cls.__name__))
+
+    def __iter__(cls):
+        return iter(sorted(cls._members.values()))
+
+
+# minimal IntEnum, for py2 without the enum34 backport
+_IntEnum = _IntEnumMeta('IntEnum', (int, ), {
+    '__repr__': lambda self: "<%s.%s: %d>" % (type(self).__name__, self.name, self),
+    '__str__': lambda self: "%s.%s" % (type(self).__name__, self.name),
+    })
+
+try:
+    from enum import IntEnum
+except ImportError:
+    IntEnum = _IntEnum
+
 __all__ = [
+    "ParseErrorCode",
     "GenericError",
     "UnknownFormat",
     "ParseError",
@@ -29,6 +73,20 @@ __all__ = [
     ]
 
 
+class ParseErrorCode(IntEnum):
+    """
+    Failure reasons returned by aprslib.try_parse()
+    """
+    EMPTY_PACKET = 1
+    NO_BODY = 2
+    EMPTY_BODY = 3
+    INVALID_HEADER = 4
+    UNSUPPORTED_FORMAT = 5
+    UNKNOWN_FORMAT = 6
+    INVALID_FORMAT = 7
+    PACKET_TOO_LONG = 8
+
+
 class GenericError(Exception):
     """
     Base exception class for the library. Logs information via logging module
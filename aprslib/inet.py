@@ -32,6 +32,7 @@ from aprslib.exceptions import (
     ConnectionError,
     LoginError,
     ParseError,
+    ParseErrorCode,
     UnknownFormat,
     )
 
@@ -50,15 +51,17 @@ class IS(object):
     Note: sending of packets is not supported yet
 
     """
-    def __init__(self, callsign, passwd="-1", host="rotate.aprs.net", port=10152, skip_login=False):
+    def __init__(self, callsign, passwd="-1", host="rotate.aprs.net", port=10152, skip_login=False,
+                 parser=None):
         """
         callsign        - used when login in
         passwd          - for verification, or "-1" if only listening
         Host & port     - aprs-is server
+        parser          - aprslib.parsing.Parser used by consumer(), instead of aprslib.parse()
         """
 
         self.logger = logging.getLogger("%s.%s" % (__name__, self.__class__.__name__))
-        self._parse = parse
+        self._parse = parser.parse if parser is not None else parse
 
         self.set_server(host, port)
         self.set_login(callsign, passwd, skip_login)
@@ -70,7 +73,7 @@ class IS(object):
         self.buf = b''
 
     def _sendall(self, text):
-        if is_py3:
+        if is_py3 and not isinstance(text, bytes):
             text = text.encode('utf-8')
         self.sock.sendall(text)
 
@@ -138,17 +141,22 @@ class IS(object):
         Send a line, or multiple lines sperapted by '\\r\\n'
         """
         if isinstance(line, APRSPacket):
-            line = str(line)
+            # already encoded, and cached by the packet
+            line = line.to_bytes().rstrip(b"\r\n") + b"\r\n"
+        elif isinstance(line, (bytes, bytearray)):
+            # encoded lines, like those of PacketTemplate
+            line = bytes(line).rstrip(b"\r\n") + b"\r\n" if line else b""
         elif not isinstance(line, string_type):
-            raise TypeError("Expected line to be str or APRSPacket, got %s", type(line))
+            raise TypeError("Expected line to be str, bytes or APRSPacket, got %s", type(line))
+        elif line != "":
+            line = line.rstrip("\r\n") + "\r\n"
+
         if not self._connected:
             raise ConnectionError("not connected")
 
-        if line == "":
+        if not line:
             return
 
-        line = line.rstrip("\r\n") + "\r\n"
-
         try:
             self.sock.setblocking(1)
             self.sock.settimeout(5)
@@ -157,7 +165,7 @@ class IS(object):
             self.close()
             raise ConnectionError(str(exp))
 
-    def consumer(self, callback, blocking=True, immortal=False, raw=False):
+    def consumer(self, callback, blocking=True, immortal=False, raw=False, pool=None):
         """
         When a position sentence is received, it will be passed to the callback function
 
@@ -168,12 +176,16 @@ class IS(object):
                   if false (default), consumer will return
 
         raw: when true, raw packet is passed to callback, otherwise the result from aprs.parse()
+
+        pool: aprslib.parsing.ParsePool, to parse the packets received together in parallel
+              instead of one by one. Packets that fail to parse are logged with their ParseErrorCode
         """
 
         if not self._connected:
             raise ConnectionError("not connected to a server")
 
         line = b''
+        batch = []
 
         while True:
             try:
@@ -181,10 +193,17 @@ class IS(object):
                     if line[0:1] != b'#':
                         if raw:
                             callback(line)
+                        elif pool is not None:
+                            batch.append(line)
                         else:
                             callback(self._parse(line))
                     else:
                         self.logger.debug("Server: %s", line.decode('utf8'))
+
+                    # parse once all lines received so far are collected
+                    if batch and b'\r\n' not in self.buf:
+                        lines, batch = batch, []
+                        self._parse_batch(lines, pool, callback)
             except ParseError as exp:
                 self.logger.log(11, "%s\n    Packet: %s", exp.message, exp.packet)
             except UnknownFormat as exp:
@@ -212,6 +231,17 @@ class IS(object):
             if not blocking:
                 break
 
+    def _parse_batch(self, lines, pool, callback):
+        chunksize = -(-len(lines) // pool.workers)
+
+        for line, (parsed, code) in zip(lines, pool.map(lines, chunksize)):
+            if code is None:
+                callback(parsed)
+            elif code in (ParseErrorCode.UNSUPPORTED_FORMAT, ParseErrorCode.UNKNOWN_FORMAT):
+                self.logger.log(9, "%s\n    Packet: %s", code.name, line)
+            else:
+                self.logger.log(11, "%s\n    Packet: %s", code.name, line)
+
     def _open_socket(self):
         """
         Creates a socket
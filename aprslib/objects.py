@@ -0,0 +1,142 @@
+"""
+Table of the current APRS objects and items
+"""
+import time
+from collections import OrderedDict
+
+__all__ = ['ObjectRegistry']
+
+
+class ObjectRegistry(object):
+    """
+    Keeps the latest report of every live object and item, from the
+    results of parse() or try_parse()
+
+    ttl     - seconds after which an object that wasn't reported again expires,
+              never when None
+    maxsize - number of objects kept, the least recently reported ones are
+              dropped first, unbounded when None
+    clock   - callable returning the current time in epoch seconds
+
+        registry = ObjectRegistry(ttl=3600)
+
+        for parsed, code in pool.map(lines):
+            registry.update(parsed)
+
+        registry.get(('N0CALL', 'LEADER'))
+
+    Objects are kept per station, keyed by (source callsign, name), where
+    the name has no trailing spaces, so stations reusing a name don't
+    overwrite each other. Objects and items share the names of a station.
+    A killed object is removed, and a report with an older timestamp than
+    the one kept is ignored. An update takes constant time. Not thread safe.
+    """
+    def __init__(self, ttl=3600, maxsize=100000, clock=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock or time.time
+        # (source, name) -> (time reported, parsed), least recently reported first
+        self._objects = OrderedDict()
+
+    def __repr__(self):
+        return "<ObjectRegistry(%d objects)>" % len(self._objects)
+
+    def __len__(self):
+        self.expire()
+        return len(self._objects)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __iter__(self):
+        self.expire()
+        return iter(list(self._objects))
+
+    def get(self, key, default=None):
+        """
+        Returns the latest parsed report of an object or item,
+        key is (source callsign, name)
+        """
+        source, name = key
+        entry = self._objects.get((source, name.rstrip(' ')))
+
+        if entry is None or self._expired(entry[0], self.clock()):
+            return default
+
+        return entry[1]
+
+    def items(self):
+        """
+        Returns a list of ((source, name), parsed) of the current objects
+        """
+        self.expire()
+        return [(key, entry[1]) for key, entry in self._objects.items()]
+
+    def update(self, parsed):
+        """
+        Takes a parse result. Returns the (source, name) key of the object
+        or item it reported, or None when it isn't one or was ignored
+
+        Third-party packets are unwrapped, other formats and None are ignored.
+        """
+        if parsed is None:
+            return None
+
+        if parsed.get('format') == 'thirdparty':
+            parsed = parsed.get('subpacket') or {}
+
+        name = parsed.get('object_name', parsed.get('item_name'))
+
+        if name is None:
+            return None
+
+        key = (parsed.get('from'), name.rstrip(' '))
+        objects = self._objects
+        now = self.clock()
+        entry = objects.get(key)
+
+        if entry is not None and not self._expired(entry[0], now):
+            timestamp, previous = parsed.get('timestamp'), entry[1].get('timestamp')
+
+            if timestamp and previous and timestamp < previous:
+                return None
+
+        # moves the object to the end, where the most recent reports are
+        objects.pop(key, None)
+
+        if parsed.get('alive', True):
+            objects[key] = (now, parsed)
+
+            if self.maxsize is not None:
+                while len(objects) > self.maxsize:
+                    objects.popitem(last=False)
+
+        self.expire(now)
+
+        return key
+
+    def expire(self, now=None):
+        """
+        Drops the objects that weren't reported for longer than ttl
+        """
+        if self.ttl is None:
+            return
+
+        objects = self._objects
+        deadline = (self.clock() if now is None else now) - self.ttl
+
+        # reports are in the order they were received, so the expired ones
+        # are at the front
+        while objects:
+            key = next(iter(objects))
+
+            if objects[key][0] > deadline:
+                break
+
+            del objects[key]
+
+    def clear(self):
+        self._objects.clear()
+
+    def _expired(self, reported, now):
+        return self.ttl is not None and reported <= now - self.ttl
@@ -1,2 +1,3 @@
 from aprslib.packets.position import PositionReport
 from aprslib.packets.telemetry import TelemetryReport
+from aprslib.packets.template import PacketTemplate, render_batch
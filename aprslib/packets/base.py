@@ -1,16 +1,40 @@
 from aprslib import parse
 from aprslib.parsing.common import parse_header
 
+
 class APRSPacket(object):
+    """
+    Base of the packet classes
+
+    The serialized packet is cached, along with the field values it was
+    made from, see _state(). It is serialized again once they change.
+    """
+    __slots__ = ('fromcall', 'tocall', 'path', 'body', '_serialized')
+
     format = 'raw'
-    fromcall = 'N0CALL'
-    tocall = 'N0CALL'
-    path = []
 
     def __init__(self, data=None):
+        self.fromcall = 'N0CALL'
+        self.tocall = 'N0CALL'
+        self.path = []
+        self.body = ''
+        self._serialized = None
+
         if data:
             self.load(data)
 
+    @classmethod
+    def from_parsed(cls, parsed):
+        """
+        Returns a packet with the fields of a parse() result
+
+        Keys without a matching attribute are ignored, missing ones keep
+        their defaults.
+        """
+        packet = cls()
+        packet._update(parsed)
+        return packet
+
     def __repr__(self):
         return "<%s(%s)>" % (
                     self.__class__.__name__,
@@ -18,14 +42,57 @@ class APRSPacket(object):
                     )
 
     def __str__(self):
-        return "%s:%s" % (
-            self._serialize_header(),
-            self._serialize_body(),
-            )
+        return self._cached()[1]
 
     def __eq__(self, other):
         return str(self) == str(other)
 
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        # on the text, as packets also compare equal to their str
+        return hash(str(self))
+
+    def to_bytes(self):
+        """
+        Returns the packet encoded as UTF-8, without the line ending
+        """
+        serialized = self._cached()
+
+        if serialized[2] is None:
+            text = serialized[1]
+            serialized[2] = text if isinstance(text, bytes) else text.encode('utf-8')
+
+        return serialized[2]
+
+    def _cached(self):
+        """
+        Returns [state, text, bytes or None], serializing the packet when
+        its state changed
+        """
+        state = self._state()
+        serialized = self._serialized
+
+        if serialized is None or serialized[0] != state:
+            serialized = self._serialized = [
+                state,
+                "%s:%s" % (
+                    self._serialize_header(),
+                    self._serialize_body(),
+                    ),
+                None,
+                ]
+
+        return serialized
+
+    def _state(self):
+        """
+        Returns the values the serialized packet depends on, copying the
+        mutable ones, as a tuple
+        """
+        return (self.fromcall, self.tocall, tuple(self.path), self.body)
+
     def _serialize_header(self):
         header = "%s>%s" % (self.fromcall, self.tocall)
 
@@ -35,8 +102,7 @@ class APRSPacket(object):
         return header
 
     def _serialize_body(self):
-        return getattr(self, 'body', '')
-
+        return self.body
 
     def load(self, obj):
         if not isinstance(obj, dict):
@@ -46,11 +112,11 @@ class APRSPacket(object):
             else:
                 obj = parse(obj)
 
-        for k, v in obj.items():
-            if k == 'format':
-                continue
-            if k == 'to' or k == 'from':
-                k += 'call'
+        self._update(obj)
+
+    def _update(self, parsed):
+        get = parsed.get
 
-            if hasattr(self, k):
-                setattr(self, k, v)
+        self.fromcall = get('from', self.fromcall)
+        self.tocall = get('to', self.tocall)
+        self.path = get('path', self.path)
@@ -4,9 +4,22 @@ from aprslib.util import latitude_to_ddm, longitude_to_ddm, comment_altitude
 
 
 class PositionReport(APRSPacket):
+    __slots__ = ('_latitude', '_longitude', 'symbol_table', 'symbol', 'altitude',
+                 'timestamp', 'comment')
+
     format = 'uncompressed'
 
-    _latitude = 0
+    def __init__(self, data=None):
+        self._latitude = 0
+        self._longitude = 0
+        self.symbol_table = '/'
+        self.symbol = 'l'
+        self.altitude = None
+        self.timestamp = None
+        self.comment = ''
+
+        super(PositionReport, self).__init__(data)
+
     @property
     def latitude(self):
         return self._latitude
@@ -18,7 +31,6 @@ class PositionReport(APRSPacket):
         else:
             raise ValueError("Latitude outside of -90 to 90 degree range")
 
-    _longitude = 0
     @property
     def longitude(self):
         return self._longitude
@@ -30,11 +42,25 @@ class PositionReport(APRSPacket):
         else:
             raise ValueError("Longitude outside of -180 to 180 degree range")
 
-    symbol_table = '/'
-    symbol = 'l'
-    altitude = None
-    timestamp = None
-    comment = ''
+    def _update(self, parsed):
+        super(PositionReport, self)._update(parsed)
+        get = parsed.get
+
+        if 'latitude' in parsed:
+            self.latitude = parsed['latitude']
+        if 'longitude' in parsed:
+            self.longitude = parsed['longitude']
+
+        self.symbol_table = get('symbol_table', self.symbol_table)
+        self.symbol = get('symbol', self.symbol)
+        self.altitude = get('altitude', self.altitude)
+        self.timestamp = get('timestamp', self.timestamp)
+        self.comment = get('comment', self.comment)
+
+    def _state(self):
+        return super(PositionReport, self)._state() + (
+            self._latitude, self._longitude, self.symbol_table, self.symbol,
+            self.altitude, self.timestamp, self.comment)
 
     def _serialize_body(self):
 
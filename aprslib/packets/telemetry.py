@@ -1,25 +1,66 @@
 from aprslib.packets.base import APRSPacket
 
 class TelemetryReport(APRSPacket):
+    __slots__ = ('telemetry', 'comment')
+
     format = 'raw'
-    telemetry = dict(seq=0,
-                     vals=['0']*6)
-    telemetry['vals'][5] = ['1']*8  # Replace io data with list of 8 values
-    comment = ''
+
+    def __init__(self, data=None):
+        self.telemetry = dict(seq=0,
+                              vals=['0']*5 + [['1']*8])  # io data is a list of 8 values
+        self.comment = ''
+
+        super(TelemetryReport, self).__init__(data)
+
+    def _update(self, parsed):
+        super(TelemetryReport, self)._update(parsed)
+
+        telemetry = parsed.get('telemetry')
+
+        if telemetry is not None:
+            self.telemetry = self._from_parsed_telemetry(telemetry)
+
+        self.comment = parsed.get('comment', self.comment)
+
+    def _from_parsed_telemetry(self, telemetry):
+        """
+        Returns parsed telemetry with the bits as the sixth value, a list
+        of 8 characters, as the report keeps them. Without bits the current
+        ones are kept.
+        """
+        vals = list(telemetry['vals'])
+
+        if len(vals) == 5:
+            bits = telemetry.get('bits')
+            vals.append(list(bits) if bits is not None else list(self.telemetry['vals'][5]))
+
+        return dict(seq=telemetry.get('seq', 0), vals=vals)
+
+    def _state(self):
+        telemetry = self.telemetry
+        vals = tuple(tuple(val) if isinstance(val, list) else val for val in telemetry['vals'])
+
+        return super(TelemetryReport, self)._state() + (telemetry['seq'], vals, self.comment)
 
     def _serialize_body(self):
         # What do we do when len(digitalvalue) != 8?
         tempio = ''.join(self.telemetry['vals'][5])
 
-        body = [
-            str(self.telemetry['seq']).zfill(3),
-            str(self.telemetry['vals'][0]).zfill(3),
-            str(self.telemetry['vals'][1]).zfill(3),
-            str(self.telemetry['vals'][2]).zfill(3),
-            str(self.telemetry['vals'][3]).zfill(3),
-            str(self.telemetry['vals'][4]).zfill(3),
-            str(tempio),
-            self.comment,
-        ]
-        # Add packet type to body joined by commas
-        return 'T#' + ",".join(body)
+        body = [str(self.telemetry['seq']).zfill(3)]
+        body.extend(_format_value(val) for val in self.telemetry['vals'][:5])
+        body.append(str(tempio))
+
+        # Add packet type to body joined by commas, the comment follows the bits
+        return 'T#' + ",".join(body) + (' ' + self.comment if self.comment else '')
+
+
+def _format_value(val):
+    """
+    Returns an analog value as parse() reads it, integers with at least
+    3 digits, floats with their decimals
+    """
+    if isinstance(val, float):
+        text = repr(val)
+        return text if 'e' not in text else ('%f' % val)
+
+    return str(val).zfill(3)
@@ -0,0 +1,115 @@
+import time
+from math import floor
+
+__all__ = ['PacketTemplate', 'render_batch']
+
+
+class PacketTemplate(object):
+    """
+    Position report of one station, serialized once, where only the
+    coordinates, timestamp and comment change between reports
+
+    The header, symbol and comment are encoded up front. render() formats
+    the fixed width fields at once, patches them into a buffer, and
+    returns the wire line, ending with '\\r\\n'. The line is the same as
+    str() of a PositionReport with those fields.
+
+        template = PacketTemplate('N0CALL-9', symbol='>', comment='fleet')
+        sock.sendall(template.render(49.0583, -72.0291, time.time()))
+
+    With timestamp=False the reports are sent without one ('!'), like
+    PositionReport does when its timestamp is None.
+
+    The constant parts can't be changed once the template is made, and
+    render() reuses one buffer, so a template is not thread safe.
+    """
+    __slots__ = ('clock', '_timestamp', '_buffer', '_start', '_end', '_comment',
+                 '_format', '_day', '_mday')
+
+    def __init__(self, fromcall, tocall='APRS', path=(), symbol_table='/', symbol='l',
+                 comment='', timestamp=True, clock=None):
+        self.clock = clock or time.time
+        self._timestamp = timestamp
+
+        header = "%s>%s" % (fromcall, tocall)
+
+        if path:
+            header += "," + ",".join(path)
+
+        # header:/DDHHMMzDDMM.mmN/DDDMM.mmWlcomment\r\n
+        # everything from the timestamp to the longitude is variable
+        prefix = (header + (":/" if timestamp else ":!")).encode('utf-8')
+        symbol_table = symbol_table.encode('utf-8')
+        symbol = symbol.encode('utf-8')
+
+        self._format = ((b"%02d%02d%02dz" if timestamp else b"") + b"%02d%05.2f%s"
+                        + symbol_table.replace(b"%", b"%%") + b"%03d%05.2f%s")
+        self._start = len(prefix)
+        self._end = self._start + (7 if timestamp else 0) + 8 + len(symbol_table) + 9
+        self._comment = self._end + len(symbol)
+        self._buffer = bytearray(prefix + b" " * (self._end - self._start)
+                                 + symbol + comment.encode('utf-8') + b"\r\n")
+        self._day = None
+        self._mday = None
+
+    def __repr__(self):
+        return "<PacketTemplate(%r)>" % bytes(self._buffer[:self._start]).decode('utf-8')
+
+    def render(self, latitude, longitude, timestamp=None, comment=None):
+        """
+        Returns the report as bytes, ready to be sent
+
+        timestamp - epoch seconds, the clock's time when None
+        comment   - replaces the template comment for this report
+        """
+        if not -90 <= latitude <= 90:
+            raise ValueError("Latitude outside of -90 to 90 degree range")
+        if not -180 <= longitude <= 180:
+            raise ValueError("Longitude outside of -180 to 180 degree range")
+
+        # the same degrees and minutes as latitude_to_ddm()/longitude_to_ddm()
+        lat, lon = abs(latitude), abs(longitude)
+        lat_deg, lon_deg = int(floor(lat)), int(floor(lon))
+        fields = (lat_deg, (lat - lat_deg) * 60, b"S" if latitude < 0 else b"N",
+                  lon_deg, (lon - lon_deg) * 60, b"W" if longitude < 0 else b"E")
+
+        if self._timestamp:
+            fields = self._dhm(self.clock() if timestamp is None else timestamp) + fields
+
+        buf = self._buffer
+        buf[self._start:self._end] = self._format % fields
+
+        if comment is None:
+            return bytes(buf)
+
+        return bytes(buf[:self._comment]) + comment.encode('utf-8') + b"\r\n"
+
+    def render_many(self, rows):
+        """
+        Returns a list of reports, for rows of (latitude, longitude[, timestamp[, comment]])
+        """
+        render = self.render
+        return [render(*row) for row in rows]
+
+    def _dhm(self, timestamp):
+        """
+        Returns (day, hours, minutes) of the timestamp, the day of the month
+        is looked up once per day
+        """
+        day, seconds = divmod(int(timestamp), 86400)
+
+        if day != self._day:
+            self._mday = time.gmtime(day * 86400).tm_mday
+            self._day = day
+
+        return (self._mday, seconds // 3600, seconds % 3600 // 60)
+
+
+def render_batch(rows):
+    """
+    Returns a list of reports, for rows of
+    (template, latitude, longitude[, timestamp[, comment]])
+
+    Renders the reports of many stations, each with its own template, in one call.
+    """
+    return [row[0].render(*row[1:]) for row in rows]
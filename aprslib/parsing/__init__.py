@@ -19,9 +19,11 @@
 This module contains all function used in parsing packets
 """
 import re
-import logging
+import codecs
+import copy
+import threading
 
-logger = logging.getLogger(__name__)
+from aprslib.parsing import trace
 
 try:
     import chardet
@@ -33,181 +35,702 @@ except ImportError:
         def detect(x):
             return {'confidence': 0.0, 'encoding': 'windows-1252'}
 
-from aprslib import string_type_parse
-from aprslib.exceptions import (UnknownFormat, ParseError)
+from aprslib import string_type, string_type_parse
+from aprslib.exceptions import (UnknownFormat, ParseError, ParseErrorCode)
+from aprslib.util.cache import LRUCache
+from aprslib.parsing.fields import *
 from aprslib.parsing.common import *
 from aprslib.parsing.misc import *
 from aprslib.parsing.position import *
 from aprslib.parsing.mice import *
 from aprslib.parsing.message import *
 from aprslib.parsing.telemetry import *
+from aprslib.parsing.nmea import *
 from aprslib.parsing.thirdparty import *
 from aprslib.parsing.weather import *
+from aprslib.parsing.peek import *
+from aprslib.parsing.pool import *
+from aprslib.parsing.common import timestamp_decoder
+from aprslib.parsing.mice import mice_dstcall_cache, _decode_mice
+from aprslib.parsing.nmea import nmea_date_cache
+from aprslib.parsing.position import _decode_position
 
 unsupported_formats = {
         '#':'raw weather report',
-        '$':'raw gps',
         '%':'agrelo',
         '&':'reserved',
         '(':'unused',
-        ')':'item report',
         '*':'complete weather report',
         '+':'reserved',
         '-':'unused',
         '.':'reserved',
         '<':'station capabilities',
         '?':'general query format',
-        'T':'telemetry report',
         '[':'maidenhead locator beacon',
         '\\':'unused',
         ']':'unused',
         '^':'unused',
 }
 
-def _unicode_packet(packet):
+# longest packet accepted by parse(), APRS-IS lines are at most 512 bytes
+# including the line ending. Set to None to disable the check
+MAX_PACKET_LENGTH = 512
+
+# minimum chardet confidence for a detected encoding to be used
+ENCODING_CONFIDENCE = 0.7
+
+# detection results keyed on the source callsign of the packet
+# each entry is (encoding, confident, length of the examined body)
+encoding_cache = LRUCache(maxsize=2048)
+
+
+# data type identifiers of formats where only trailing fields are free text
+# non-ascii packets of these formats are parsed before any charset decoding
+structured_formats = set("!=/@;`'_")
+
+_binary_type = (bytes, bytearray, memoryview)
+
+
+def _unicode_packet(packet, cache=encoding_cache):
+    return _decode_packet(packet, cache)[0]
+
+
+def _decode_packet(packet, cache=encoding_cache):
+    """
+    Decodes a packet and returns (text, encoding)
+    """
+    # fast path for 7-bit ascii, which is the vast majority of packets
+    try:
+        return packet.decode('ascii'), 'ascii'
+    except UnicodeDecodeError:
+        pass
+
     # attempt utf-8
     try:
-        return packet.decode('utf-8')
+        return packet.decode('utf-8'), 'utf-8'
     except UnicodeDecodeError:
         pass
 
+    source = packet.split(b'>', 1)[0]
+    body = packet.split(b':', 1)[-1]
+
+    # stations tend to keep using the same encoding, so reuse the previous result.
+    # inconclusive results are only retried once there is more text to examine
+    cached = cache.get(source)
+
+    if cached is not None:
+        encoding, confident, length = cached
+
+        if confident or len(body) <= length:
+            try:
+                return packet.decode(encoding), encoding
+            except UnicodeDecodeError:
+                cache.discard(source)
+
     # attempt to detect encoding
-    res = chardet.detect(packet.split(b':', 1)[-1])
-    if res['confidence'] > 0.7 and res['encoding'] != 'EUC-TW':
+    res = chardet.detect(body)
+    if (res['confidence'] > ENCODING_CONFIDENCE
+       and res['encoding'] not in (None, 'EUC-TW')):
         try:
-            return packet.decode(res['encoding'])
-        except UnicodeDecodeError:
+            text = packet.decode(res['encoding'])
+        except (UnicodeDecodeError, LookupError):
             pass
+        else:
+            cache.set(source, (res['encoding'], True, len(body)))
+            return text, res['encoding']
 
     # if everything fails
-    return packet.decode('latin-1')
+    cache.set(source, ('latin-1', False, len(body)))
+    return packet.decode('latin-1'), 'latin-1'
+
+
+def _bytes_packet(packet, cache=encoding_cache):
+    """
+    Converts a bytes-like packet to text and returns (text, rawbytes)
+
+    Structured formats with non-ascii content are decoded byte for byte, as
+    their header and position fields are pure ascii anyway. Their original
+    bytes are returned, so that the free-text fields can be decoded later.
+    For everything else rawbytes is None.
+    """
+    try:
+        return codecs.decode(packet, 'ascii'), None
+    except UnicodeDecodeError:
+        pass
+
+    packet = bytes(packet)
+    idx = packet.find(b':')
+
+    if idx > -1 and packet[idx+1:idx+2].decode('latin-1') in structured_formats:
+        return packet.decode('latin-1'), packet
+
+    return _unicode_packet(packet, cache), None
+
+
+def _decode_text_fields(parsed, rawbytes, cache=encoding_cache):
+    """
+    Decodes the non-ascii text fields of a packet parsed from rawbytes
+    """
+    encoding = None
+
+    for key, value in list(parsed.items()):
+        if not isinstance(value, string_type) or _is_ascii(value):
+            continue
+
+        # charset detection runs only once a field actually needs it
+        if encoding is None:
+            encoding = _decode_packet(rawbytes, cache)[1]
+
+        try:
+            parsed[key] = value.encode('latin-1').decode(encoding)
+        except UnicodeDecodeError:
+            pass
+
 
+def _is_ascii(text):
+    try:
+        text.encode('ascii')
+    except UnicodeError:
+        return False
+    return True
 
-def parse(packet):
+
+def parse(packet, fields=None, mode=STRICT):
     """
     Parses an APRS packet and returns a dict with decoded data
 
     - All attributes are in metric units
+    - Accepts str/unicode or bytes-like packets (bytes, bytearray, memoryview)
+    - Packets longer than MAX_PACKET_LENGTH are rejected with ParseError
+    - fields limits the result to the given field names, see FieldProfile;
+      the parser for each set of fields is kept per thread
+    - mode is one of STRICT, LENIENT or TRUSTED, see parsing.common
+
+    Uses the default Parser instance, see Parser for separate caches
+    """
+    return _parser_for(fields, mode).parse(packet)
+
+
+def try_parse(packet, fields=None, mode=STRICT):
+    """
+    Parses an APRS packet without raising on failure
+
+    Returns (parsed, None) when the packet was parsed,
+    or (None, code) where code is a ParseErrorCode.
+
+    The common failures (empty or incomplete packets, unsupported and
+    unknown formats, malformed position and mic-e reports) are detected
+    without raising exceptions internally.
+    """
+    return _parser_for(fields, mode).try_parse(packet)
+
+
+class Parser(object):
+    """
+    Packet parser with its own options, caches and statistics
+
+    fields              - field names to return, see FieldProfile
+    mode                - one of STRICT, LENIENT or TRUSTED
+    clock               - callable returning the current time, for timestamps
+    header_cache_size   - number of decoded packet headers to keep
+    encoding_cache_size - number of source callsigns to remember the charset for
+    mice_cache_size     - number of decoded mic-e destination calls to keep
+    date_cache_size     - number of decoded NMEA dates to keep
+
+    Each worker can have a parser of its own, so that the caches are sized for,
+    and only filled by, the traffic it handles:
+
+        parser = Parser(fields=['from', 'latitude', 'longitude'], mode=LENIENT)
+        parser.parse(packet)
+
+    stats counts the packets seen, including third-party subpackets,
+    and the ones that failed to parse.
+
+    An instance is meant for one thread at a time, as its caches and stats
+    are not locked. aprslib.parse() uses a default instance per thread, see
+    thread_parser().
     """
+    def __init__(self, fields=None, mode=STRICT, clock=None, header_cache_size=1024,
+                 encoding_cache_size=2048, mice_cache_size=1024, date_cache_size=64):
+        if mode not in MODES:
+            raise ValueError("expected mode to be one of %s, got %r" % (", ".join(MODES), mode))
+        if fields is not None and not isinstance(fields, FieldProfile):
+            fields = FieldProfile(fields)
+
+        self.profile = fields
+        self.mode = mode
+        self.timestamp_decoder = TimestampDecoder(clock)
+        self.header_cache = LRUCache(maxsize=header_cache_size)
+        self.encoding_cache = LRUCache(maxsize=encoding_cache_size)
+        self.mice_cache = LRUCache(maxsize=mice_cache_size)
+        self.date_cache = LRUCache(maxsize=date_cache_size)
+        self.stats = {
+            'packets': 0,
+            'failed': 0,
+            }
+
+    def __repr__(self):
+        return "Parser(fields=%r, mode=%r)" % (self.profile, self.mode)
+
+    def parse(self, packet):
+        """
+        Parses an APRS packet and returns a dict with decoded data,
+        see aprslib.parse()
+        """
+        stats = self.stats
+        stats['packets'] += 1
+
+        try:
+            parsed, error = _parse_packet(packet, self)
+        except (UnknownFormat, ParseError):
+            stats['failed'] += 1
+            raise
+
+        if error is not None:
+            stats['failed'] += 1
+            code, detail, packet = error
+            exception = UnknownFormat if code in _unknown_format_codes else ParseError
+            raise exception(_error_message(code, detail), packet)
+
+        return parsed
+
+    def try_parse(self, packet):
+        """
+        Parses an APRS packet without raising on failure,
+        see aprslib.try_parse()
+        """
+        stats = self.stats
+        stats['packets'] += 1
+
+        try:
+            parsed, error = _parse_packet(packet, self)
+        except UnknownFormat:
+            stats['failed'] += 1
+            return None, ParseErrorCode.UNKNOWN_FORMAT
+        except ParseError:
+            stats['failed'] += 1
+            return None, ParseErrorCode.INVALID_FORMAT
+
+        if error is not None:
+            stats['failed'] += 1
+            return None, error[0]
+
+        return parsed, None
+
+    def clear(self):
+        """
+        Empties the caches and resets the statistics
+        """
+        self.header_cache.clear()
+        self.encoding_cache.clear()
+        self.mice_cache.clear()
+        self.date_cache.clear()
+
+        for key in self.stats:
+            self.stats[key] = 0
+
+    def with_fields(self, fields):
+        """
+        Returns a parser for a different set of fields,
+        sharing the caches and statistics of this one
+        """
+        if fields is not None and not isinstance(fields, FieldProfile):
+            fields = FieldProfile(fields)
+
+        parser = copy.copy(self)
+        parser.profile = fields
+        return parser
+
+
+def _default_parsers(shared=False):
+    """
+    Creates the parsers behind aprslib.parse() for a thread, one per mode as
+    the header cache only holds headers valid in its mode. The other caches,
+    and the stats, are common to the modes. With shared set they are the
+    module level encoding_cache, mice_dstcall_cache, nmea_date_cache and
+    timestamp_decoder
+    """
+    parsers = {}
+    first = None
+
+    for mode in MODES:
+        parser = Parser(mode=mode)
+
+        if first is None:
+            if shared:
+                parser.encoding_cache = encoding_cache
+                parser.mice_cache = mice_dstcall_cache
+                parser.date_cache = nmea_date_cache
+                parser.timestamp_decoder = timestamp_decoder
+            first = parser
+        else:
+            parser.encoding_cache = first.encoding_cache
+            parser.mice_cache = first.mice_cache
+            parser.date_cache = first.date_cache
+            parser.timestamp_decoder = first.timestamp_decoder
+            parser.stats = first.stats
+
+        parsers[mode] = parser
+
+    return parsers
+
+
+# the thread importing aprslib keeps using the module level caches,
+# every other thread gets its own on first use
+_local = threading.local()
+_local.parsers = _default_parsers(shared=True)
+
+
+def thread_parser(mode=STRICT):
+    """
+    Returns the Parser used by aprslib.parse() in the calling thread
+
+    Threads never share these, so parse() needs no locking and threads
+    don't contend for the caches, e.g. on free-threaded builds.
+    """
+    try:
+        parsers = _local.parsers
+    except AttributeError:
+        parsers = _local.parsers = _default_parsers()
+
+    try:
+        return parsers[mode]
+    except KeyError:
+        raise ValueError("expected mode to be one of %s, got %r" % (", ".join(MODES), mode))
 
-    if not isinstance(packet, string_type_parse):
+
+# number of field sets per thread that parse(fields=...) keeps a parser for
+FIELD_PARSERS_SIZE = 64
+
+
+def _parser_for(fields, mode):
+    """
+    Returns the thread's parser for mode, limited to fields
+
+    The parsers for a set of fields are kept per thread, keyed by the field
+    names, so that passing the same fields on every call doesn't build a
+    new FieldProfile and Parser each time.
+    """
+    if fields is None:
+        return thread_parser(mode)
+
+    key = (mode, fields.fields if isinstance(fields, FieldProfile) else frozenset(fields))
+
+    try:
+        cache = _local.field_parsers
+    except AttributeError:
+        cache = _local.field_parsers = LRUCache(maxsize=FIELD_PARSERS_SIZE)
+
+    parser = cache.get(key)
+
+    if parser is None:
+        if not isinstance(fields, FieldProfile):
+            fields = FieldProfile(key[1])
+
+        parser = thread_parser(mode).with_fields(fields)
+        cache.set(key, parser)
+
+    return parser
+
+
+_unknown_format_codes = (
+    ParseErrorCode.UNSUPPORTED_FORMAT,
+    ParseErrorCode.UNKNOWN_FORMAT,
+    )
+
+_error_messages = {
+    ParseErrorCode.EMPTY_PACKET: "packet is empty",
+    ParseErrorCode.NO_BODY: "packet has no body",
+    ParseErrorCode.EMPTY_BODY: "packet body is empty",
+    ParseErrorCode.PACKET_TOO_LONG: "packet is too long",
+    ParseErrorCode.UNKNOWN_FORMAT: "format is not supported",
+    }
+
+
+def _error_message(code, detail):
+    if code == ParseErrorCode.UNSUPPORTED_FORMAT:
+        return "Format is not supported: '{}' {}".format(detail, unsupported_formats.get(detail, ''))
+
+    return detail or _error_messages[code]
+
+
+def _parse_packet(packet, parser):
+    """
+    Returns (parsed, None), or (None, (code, detail, packet)) for failures
+    detected before or around the format parsers, and by the position,
+    mic-e and message parsers. Errors raised by the other format parsers
+    propagate with the packet attached.
+    """
+    if not isinstance(packet, string_type_parse + _binary_type):
         raise TypeError("Expected packet to be str/unicode/bytes, got %s", type(packet))
 
     if len(packet) == 0:
-        raise ParseError("packet is empty", packet)
+        return None, (ParseErrorCode.EMPTY_PACKET, None, packet)
+
+    # bounds the work done on a single packet, see MAX_PACKET_LENGTH
+    if MAX_PACKET_LENGTH is not None and len(packet) > MAX_PACKET_LENGTH:
+        return None, (ParseErrorCode.PACKET_TOO_LONG, None, packet)
+
+    rawbytes = None
+
+    if isinstance(packet, _binary_type):
+        packet, rawbytes = _bytes_packet(packet, parser.encoding_cache)
+
+    if rawbytes is None:
+        return _parse(packet, parser)
+
+    try:
+        parsed, error = _parse(packet, parser)
+    except (UnknownFormat, ParseError) as exp:
+        exp.packet = _unicode_packet(rawbytes, parser.encoding_cache).rstrip("\r\n")
+        raise
+
+    if error is not None:
+        return None, error[:2] + (_unicode_packet(rawbytes, parser.encoding_cache).rstrip("\r\n"), )
+
+    _decode_text_fields(parsed, rawbytes, parser.encoding_cache)
+
+    return parsed, None
 
-    # attempt to detect encoding
-    if isinstance(packet, bytes):
-        packet = _unicode_packet(packet)
 
+def _parse(packet, parser):
     packet = packet.rstrip("\r\n")
-    logger.debug("Parsing: %s", packet)
+    if trace.hook is not None:
+        trace.hook('packet', packet)
 
     # split into head and body
-    try:
-        (head, body) = packet.split(':', 1)
-    except:
-        raise ParseError("packet has no body", packet)
+    idx = packet.find(':')
+
+    if idx == -1:
+        return None, (ParseErrorCode.NO_BODY, None, packet)
+
+    head = packet[:idx]
+    body = packet[idx+1:]
 
     if len(body) == 0:
-        raise ParseError("packet body is empty", packet)
+        return None, (ParseErrorCode.EMPTY_BODY, None, packet)
 
-    parsed = {
-        'raw': packet,
-        }
+    profile = parser.profile
+    parsed = {'raw': packet} if profile is None or profile.raw else {}
 
-    # parse head
-    try:
-        parsed.update(parse_header(head))
-    except ParseError as msg:
-        raise ParseError(str(msg), packet)
+    # parse head, stations keep sending the same one
+    header = parser.header_cache.get(head)
+
+    if header is None:
+        try:
+            header = parse_header(head, parser.mode)
+        except ParseError as msg:
+            return None, (ParseErrorCode.INVALID_HEADER, str(msg), packet)
+
+        parser.header_cache.set(head, header)
+
+    parsed.update(header)
+
+    # the cached header is shared, so the path is copied when returned
+    if profile is None or profile.path:
+        parsed['path'] = list(header['path'])
 
     # parse body
     packet_type = body[0]
     body = body[1:]
 
     if len(body) == 0 and packet_type != '>':
-        raise ParseError("packet body is empty after packet type character", packet)
+        return None, (ParseErrorCode.EMPTY_BODY, "packet body is empty after packet type character", packet)
+
+    handler = _format_table[ord(packet_type)] if ord(packet_type) < 256 else None
+
+    if handler is _parse_unsupported:
+        return None, (ParseErrorCode.UNSUPPORTED_FORMAT, packet_type, packet)
 
     # attempt to parse the body
     try:
-        _try_toparse_body(packet_type, body, parsed)
+        detail = _try_toparse_body(handler, packet_type, body, parsed, parser)
 
     # capture ParseErrors and attach the packet
     except (UnknownFormat, ParseError) as exp:
         exp.packet = packet
         raise
 
+    if detail is not None:
+        return None, (ParseErrorCode.INVALID_FORMAT, detail, packet)
+
     # if we fail all attempts to parse, try beacon packet
     if 'format' not in parsed:
-        if not re.match(r"^(AIR.*|ALL.*|AP.*|BEACON|CQ.*|GPS.*|DF.*|DGPS.*|"
-                        "DRILL.*|DX.*|ID.*|JAVA.*|MAIL.*|MICE.*|QST.*|QTH.*|"
-                        "RTCM.*|SKY.*|SPACE.*|SPC.*|SYM.*|TEL.*|TEST.*|TLM.*|"
-                        "WX.*|ZIP.*|UIDIGI)$", parsed['to']):
-            raise UnknownFormat("format is not supported", packet)
+        if not _beacon_tocall.match(parsed['to']):
+            return None, (ParseErrorCode.UNKNOWN_FORMAT, None, packet)
 
         parsed.update({
             'format': 'beacon',
             'text': packet_type + body,
             })
 
-    logger.debug("Parsed ok.")
-    return parsed
-
+    if profile is not None:
+        parsed = profile.select(parsed)
 
-def _try_toparse_body(packet_type, body, parsed):
-    result = {}
+    if trace.hook is not None:
+        trace.hook('parsed', parsed)
 
-    if packet_type in unsupported_formats:
-        raise UnknownFormat("Format is not supported: '{}' {}".format(packet_type, unsupported_formats[packet_type]))
+    return parsed, None
 
-    # 3rd party traffic
-    elif packet_type == '}':
-        logger.debug("Packet is third-party")
-        body, result = parse_thirdparty(body)
 
-    # user defined
-    elif packet_type == ',':
-        logger.debug("Packet is invalid format")
+_beacon_tocall = re.compile(r"^(AIR.*|ALL.*|AP.*|BEACON|CQ.*|GPS.*|DF.*|DGPS.*|"
+                            "DRILL.*|DX.*|ID.*|JAVA.*|MAIL.*|MICE.*|QST.*|QTH.*|"
+                            "RTCM.*|SKY.*|SPACE.*|SPC.*|SYM.*|TEL.*|TEST.*|TLM.*|"
+                            "WX.*|ZIP.*|UIDIGI)$")
 
-        body, result = parse_invalid(body)
+# body parsers indexed by the ordinal of the data type identifier
+_format_table = [None] * 256
 
-    # user defined
-    elif packet_type == '{':
-        logger.debug("Packet is user-defined")
+# register_format() calls so far, as packet_type -> parser,
+# which ParsePool repeats in its process and interpreter workers
+_registered_formats = {}
 
-        body, result = parse_user_defined(body)
 
-    # Status report
-    elif packet_type == '>':
-        logger.debug("Packet is just a status message")
+def register_format(packet_type, parser):
+    """
+    Registers a body parser for a data type identifier, replacing any
+    existing one. Passing None as parser removes the registration.
+
+    The parser is called as ``parser(packet_type, body, parsed)``, where
+    body excludes the data type identifier and parsed holds the decoded
+    header. It should return (remaining_body, dict_of_fields) and raise
+    ParseError on malformed packets, or return (None, error_message),
+    which try_parse() reports as INVALID_FORMAT without raising.
+    """
+    if not isinstance(packet_type, string_type) or len(packet_type) != 1 or ord(packet_type) > 255:
+        raise ValueError("expected packet_type to be a single character, got %r" % (packet_type, ))
+    if parser is not None and not callable(parser):
+        raise TypeError("expected parser to be callable, got %s" % type(parser))
 
-        body, result = parse_status(packet_type, body)
+    unsupported_formats.pop(packet_type, None)
+    _format_table[ord(packet_type)] = _format_handler(parser) if parser is not None else None
+    _registered_formats[packet_type] = parser
 
-    # Mic-encoded packet
-    elif packet_type in "`'":
-        logger.debug("Attempting to parse as mic-e packet")
 
-        body, result = parse_mice(parsed['to'], body)
+def _format_handler(func):
+    """
+    Adapts a registered parser to the table, whose built-in handlers also
+    take the Parser instance as a fourth argument
+    """
+    def handler(packet_type, body, parsed, parser):
+        return func(packet_type, body, parsed)
 
-    # Message packet
-    elif packet_type == ':':
-        logger.debug("Attempting to parse as message packet")
+    return handler
 
-        body, result = parse_message(body)
 
-    # Positionless weather report
-    elif packet_type == '_':
-        logger.debug("Attempting to parse as positionless weather report")
+def _try_toparse_body(handler, packet_type, body, parsed, parser):
+    """
+    Updates parsed with the fields of the body. Returns None, or the error
+    detail when the format parser returned (None, error) for it
+    """
+    if handler is not None:
+        body, result = handler(packet_type, body, parsed, parser)
 
-        body, result = parse_weather(body)
+    # postion report with data preceding the '!'
+    elif 0 <= body.find('!') < 40:  # page 28 of spec (PDF)
+        body, result = _decode_position(packet_type, body, parser.profile, parser.mode,
+                                        parser.timestamp_decoder)
 
-    # postion report (regular or compressed)
-    elif (packet_type in '!=/@;' or
-          0 <= body.find('!') < 40):  # page 28 of spec (PDF)
+    else:
+        return None
 
-        body, result = parse_position(packet_type, body)
+    if body is None:
+        return result
 
     # we are done
     parsed.update(result)
+    return None
+
+
+def _parse_unsupported(packet_type, body, parsed, parser):
+    raise UnknownFormat("Format is not supported: '{}' {}".format(packet_type, unsupported_formats[packet_type]))
+
+
+# 3rd party traffic
+def _parse_thirdparty(packet_type, body, parsed, parser):
+    if trace.hook is not None:
+        trace.hook('format', 'thirdparty')
+    return parse_thirdparty(body, parser)
+
+
+# user defined
+def _parse_invalid(packet_type, body, parsed, parser):
+    if trace.hook is not None:
+        trace.hook('format', 'invalid')
+    return parse_invalid(body)
+
+
+# user defined
+def _parse_user_defined(packet_type, body, parsed, parser):
+    if trace.hook is not None:
+        trace.hook('format', 'user-defined')
+    return parse_user_defined(body)
+
+
+# Status report
+def _parse_status(packet_type, body, parsed, parser):
+    if trace.hook is not None:
+        trace.hook('format', 'status')
+    return parse_status(packet_type, body, parser.timestamp_decoder)
+
+
+# Mic-encoded packet
+def _parse_mice(packet_type, body, parsed, parser):
+    if trace.hook is not None:
+        trace.hook('format', 'mic-e')
+    return _decode_mice(parsed['to'], body, parser.profile, parser.mice_cache)
+
+
+# Message packet
+def _parse_message(packet_type, body, parsed, parser):
+    if trace.hook is not None:
+        trace.hook('format', 'message')
+    return parse_message(body)
+
+
+# Telemetry report
+def _parse_telemetry(packet_type, body, parsed, parser):
+    if trace.hook is not None:
+        trace.hook('format', 'telemetry')
+    return parse_telemetry_report(body)
+
+
+# Raw GPS (NMEA)
+def _parse_nmea(packet_type, body, parsed, parser):
+    if trace.hook is not None:
+        trace.hook('format', 'nmea')
+    return parse_nmea(body, parser.mode, parser.timestamp_decoder, parser.date_cache, parsed['to'])
+
+
+# Positionless weather report
+def _parse_weather(packet_type, body, parsed, parser):
+    if trace.hook is not None:
+        trace.hook('format', 'wx')
+    return parse_weather(body, parser.profile)
+
+
+# postion report (regular or compressed)
+def _parse_position(packet_type, body, parsed, parser):
+    return _decode_position(packet_type, body, parser.profile, parser.mode,
+                            parser.timestamp_decoder)
+
+
+for _packet_type in unsupported_formats:
+    _format_table[ord(_packet_type)] = _parse_unsupported
+
+for _packet_types, _parser in (
+        ('}', _parse_thirdparty),
+        (',', _parse_invalid),
+        ('{', _parse_user_defined),
+        ('>', _parse_status),
+        ("`'", _parse_mice),
+        (':', _parse_message),
+        ('T', _parse_telemetry),
+        ('$', _parse_nmea),
+        ('_', _parse_weather),
+        ('!=/@;)', _parse_position),
+        ):
+    for _packet_type in _packet_types:
+        _format_table[ord(_packet_type)] = _parser
 
+del _packet_type, _packet_types, _parser
@@ -1,36 +1,61 @@
 import re
+import time
 from math import sqrt
-from datetime import datetime
+from calendar import monthrange
 from aprslib import base91
 from aprslib.exceptions import ParseError
-from aprslib.parsing import logger
-from aprslib.parsing.telemetry import parse_comment_telemetry
+from aprslib.parsing.telemetry import (parse_comment_telemetry, _decode_comment_telemetry,
+                                       _find_comment_telemetry, _split_line)
 
 __all__ = [
+    'STRICT',
+    'LENIENT',
+    'TRUSTED',
+    'MODES',
     'validate_callsign',
     'parse_header',
+    'TimestampDecoder',
     'parse_timestamp',
     'parse_comment',
+    'parse_comment_extensions',
     'parse_data_extentions',
     'parse_comment_altitude',
     'parse_dao',
     ]
 
+# validation modes
+#
+# STRICT  - every header field and position value is validated (default)
+# LENIENT - the header is only checked for a source and destination, for
+#           feeds that carry callsigns outside of the AX.25 rules
+# TRUSTED - for packets validated before, e.g. a replay archive. Checks that
+#           don't contribute to the decoded values are skipped altogether
+STRICT = 'strict'
+LENIENT = 'lenient'
+TRUSTED = 'trusted'
+MODES = (STRICT, LENIENT, TRUSTED)
+
+_callsign_re = re.compile(r"^([A-Z0-9]{1,6})(-(\d{1,2}))?$")
+_fromcall_re = re.compile(r"^[a-z0-9]{0,9}(\-[a-z0-9]{1,8})?$", re.I)
+_digi_re = re.compile(r"^[A-Z0-9\-]{1,9}\*?$", re.I)
+_qconstruct_re = re.compile(r"^q..$")
+
+
 def validate_callsign(callsign, prefix=""):
     prefix = '%s: ' % prefix if bool(prefix) else ''
 
-    match = re.findall(r"^([A-Z0-9]{1,6})(-(\d{1,2}))?$", callsign)
+    match = _callsign_re.match(callsign)
 
     if not match:
         raise ParseError("%sinvalid callsign" % prefix)
 
-    callsign, _, ssid = match[0]
+    callsign, _, ssid = match.groups()
 
     if bool(ssid) and int(ssid) > 15:
         raise ParseError("%sssid not in 0-15 range" % prefix)
 
 
-def parse_header(head):
+def parse_header(head, mode=STRICT):
     """
     Parses the header part of packet
     Returns a dict
@@ -40,9 +65,10 @@ def parse_header(head):
     except:
         raise ParseError("invalid packet header")
 
-    if (not 1 <= len(fromcall) <= 9 or
-       not re.findall(r"^[a-z0-9]{0,9}(\-[a-z0-9]{1,8})?$", fromcall, re.I)):
-
+    if mode == STRICT:
+        if not 1 <= len(fromcall) <= 9 or not _fromcall_re.match(fromcall):
+            raise ParseError("fromcallsign is invalid")
+    elif len(fromcall) == 0:
         raise ParseError("fromcallsign is invalid")
 
     path = path.split(',')
@@ -53,11 +79,12 @@ def parse_header(head):
     tocall = path[0]
     path = path[1:]
 
-    validate_callsign(tocall, "tocallsign")
+    if mode == STRICT:
+        validate_callsign(tocall, "tocallsign")
 
-    for digi in path:
-        if not re.findall(r"^[A-Z0-9\-]{1,9}\*?$", digi, re.I):
-            raise ParseError("invalid callsign in path")
+        for digi in path:
+            if not _digi_re.match(digi):
+                raise ParseError("invalid callsign in path")
 
     parsed = {
         'from': fromcall,
@@ -66,7 +93,7 @@ def parse_header(head):
         }
 
     viacall = ""
-    if len(path) >= 2 and re.match(r"^q..$", path[-2]):
+    if len(path) >= 2 and _qconstruct_re.match(path[-2]):
         viacall = path[-1]
 
     parsed.update({'via': viacall})
@@ -74,57 +101,151 @@ def parse_header(head):
     return parsed
 
 
-def parse_timestamp(body, packet_type=''):
+class TimestampDecoder(object):
+    """
+    Converts APRS DHM/HMS timestamps to epoch seconds (UTC)
+
+    clock - callable returning the current time in epoch seconds,
+            replays and tests can supply their own (default: time.time)
+
+    The start of the current day and month are cached and only recomputed
+    once the clock moves to another day. Timestamps that would be in the
+    future are attributed to the previous day (HMS) or month (DHM), and
+    ones from just after a day or month boundary to the next one. A DHM day
+    missing from the previous month is taken from the last month that has it.
+    """
+    # allowance for clock differences, before a timestamp counts as future
+    hms_tolerance = 3600
+    dhm_tolerance = 86400
+
+    def __init__(self, clock=None):
+        self.clock = clock or time.time
+        self._calendar = None
+
+    def _get_calendar(self, now):
+        calendar = self._calendar
+
+        if calendar is None or not calendar[0] <= now < calendar[1]:
+            year, month, day = time.gmtime(now)[:3]
+
+            day_start = now - now % 86400
+            month_start = day_start - (day - 1) * 86400
+            days = monthrange(year, month)[1]
+            prev_days = monthrange(year - (month == 1), (month - 2) % 12 + 1)[1]
+            next_days = monthrange(year + (month == 12), month % 12 + 1)[1]
+
+            calendar = self._calendar = (
+                day_start,
+                day_start + 86400,
+                month_start,
+                days,
+                month_start - prev_days * 86400,
+                prev_days,
+                month_start + days * 86400,
+                next_days,
+                )
+
+        return calendar
+
+    def decode(self, digits, form):
+        """
+        Takes the 6 timestamp digits and the format character,
+        returns epoch seconds or 0 if the timestamp is invalid
+        """
+        if form not in 'hz/':
+            return 0
+
+        now = int(self.clock())
+        (day_start, _, month_start, days,
+         prev_start, prev_days, next_start, next_days) = self._get_calendar(now)
+
+        a, b, c = int(digits[0:2]), int(digits[2:4]), int(digits[4:6])
+
+        # zulu hhmmss format
+        if form == 'h':
+            if a > 23 or b > 59 or c > 59:
+                return 0
+
+            timestamp = day_start + a * 3600 + b * 60 + c
+            latest = now + self.hms_tolerance
+
+            if timestamp > latest:
+                timestamp -= 86400
+            elif timestamp + 86400 <= latest:
+                timestamp += 86400
+
+            return timestamp
+
+        # zulu ddhhmm format
+        # '/' local ddhhmm format
+        if a < 1 or b > 23 or c > 59:
+            return 0
+
+        offset = (a - 1) * 86400 + b * 3600 + c * 60
+        latest = now + self.dhm_tolerance
+
+        if a <= next_days and next_start + offset <= latest:
+            return next_start + offset
+        if a <= days and month_start + offset <= latest:
+            return month_start + offset
+        if a <= prev_days:
+            return prev_start + offset
+        if a > 31:
+            return 0
+
+        # the day isn't in the previous month either, e.g. the 31st after
+        # a 30 day month, so it's from the last month that has it
+        year, month = time.gmtime(prev_start)[:2]
+
+        while True:
+            year, month = year - (month == 1), (month - 2) % 12 + 1
+            month_days = monthrange(year, month)[1]
+            prev_start -= month_days * 86400
+
+            if a <= month_days:
+                return prev_start + offset
+
+
+timestamp_decoder = TimestampDecoder()
+
+_timestamp_re = re.compile(r"^(\d{6})(.)$")
+
+
+def parse_timestamp(body, packet_type='', decoder=None):
     parsed = {}
 
-    match = re.findall(r"^((\d{6})(.))$", body[0:7])
+    match = _timestamp_re.match(body[0:7])
     if match:
-        rawts, ts, form = match[0]
-        utc = datetime.utcnow()
-
+        ts, form = match.groups()
         timestamp = 0
 
         if packet_type == '>' and form != 'z':
             pass
         else:
             body = body[7:]
-
-            try:
-                # zulu hhmmss format
-                if form == 'h':
-                    timestamp = "%d%02d%02d%s" % (utc.year, utc.month, utc.day, ts)
-                # zulu ddhhmm format
-                # '/' local ddhhmm format
-                elif form in 'z/':
-                    timestamp = "%d%02d%s%02d" % (utc.year, utc.month, ts, 0)
-                else:
-                    timestamp = "19700101000000"
-
-                td = utc.strptime(timestamp, "%Y%m%d%H%M%S") - datetime(1970, 1, 1)
-                timestamp = int((td.microseconds + (td.seconds + td.days * 24 * 3600) * 10**6) / 10**6)
-            except Exception as exp:
-                timestamp = 0
-                logger.debug(exp)
+            timestamp = (decoder or timestamp_decoder).decode(ts, form)
 
         parsed.update({
-            'raw_timestamp': rawts,
-            'timestamp': int(timestamp),
+            'raw_timestamp': ts + form,
+            'timestamp': timestamp,
             })
 
     return (body, parsed)
 
 
-def parse_comment(body, parsed):
-    body, result = parse_data_extentions(body)
-    parsed.update(result)
-
-    body, result = parse_comment_altitude(body)
-    parsed.update(result)
+def parse_comment(body, parsed, profile=None):
+    if profile is not None and not profile.comment:
+        # only the DAO correction of the position can be selected
+        if not (profile.dao and '!' in body):
+            return
 
-    body, result = parse_comment_telemetry(body)
-    parsed.update(result)
+    # the data extension is a prefix without '/A=', '|' or '!', so leaving
+    # it in doesn't change the extensions found after it
+    if profile is None or profile.data_extensions:
+        body, result = parse_data_extentions(body, profile)
+        parsed.update(result)
 
-    body = parse_dao(body, parsed)
+    body = parse_comment_extensions(body, parsed, profile=profile)
 
     if len(body) > 0 and body[0] == "/":
         body = body[1:]
@@ -132,7 +253,122 @@ def parse_comment(body, parsed):
     parsed.update({'comment': body.strip(' ')})
 
 
-def parse_data_extentions(body):
+def parse_comment_extensions(text, parsed, altitude=True, profile=None):
+    """
+    Extracts the altitude (optional), base91 telemetry and DAO extensions
+    from a comment, updates parsed and returns the remaining text
+
+    The result is the same as applying parse_comment_altitude,
+    parse_comment_telemetry and parse_dao one after another. With a
+    FieldProfile, telemetry and DAO are only decoded when selected.
+    """
+    spans = _scan_comment(text, altitude)
+
+    if spans is None:
+        if altitude:
+            text, result = parse_comment_altitude(text)
+            parsed.update(result)
+
+        text, result = parse_comment_telemetry(text)
+        parsed.update(result)
+
+        return parse_dao(text, parsed)
+
+    alt, tel = spans
+
+    if alt:
+        parsed.update({'altitude': int(text[alt[0]+3:alt[1]])*0.3048})
+    if tel and (profile is None or profile.telemetry):
+        parsed.update(_decode_comment_telemetry(text[tel[0]+1:tel[1]-1]))
+
+    # cut out the extensions
+    if alt and tel:
+        (s1, e1), (s2, e2) = sorted(spans)
+        text = text[:s1] + text[e1:s2] + text[e2:]
+    elif alt or tel:
+        start, end = alt or tel
+        text = text[:start] + text[end:]
+
+    idx = _find_dao(text)
+
+    if idx > -1:
+        if profile is None or profile.dao:
+            _apply_dao(text[idx+1], text[idx+2:idx+4], parsed)
+
+        text = text[:idx] + text[idx+5:]
+
+    return text
+
+
+_altitude_value = re.compile(r"\-\d{5}|\d{6}")
+
+_dao_chars = "".join(chr(i) for i in range(0x20, 0x7c))
+
+
+def _scan_comment(text, altitude=True):
+    """
+    Locates the '/A=' altitude and '|...|' telemetry extensions in text
+    and returns their (start, end) spans as (altitude, telemetry), with
+    None for missing ones.
+
+    Returns None when the result would depend on the order in which the
+    extensions are removed (telemetry markers around the altitude), or on
+    regex newline semantics. The sequential parsers are used then.
+    """
+    if '\n' in text:
+        return None
+
+    alt = _find_altitude(text) if altitude else -1
+    tel = _find_comment_telemetry(text)
+
+    if alt > -1:
+        # the telemetry search went past a '|' pair enclosing the altitude
+        before = text.rfind('|', 0, alt)
+
+        if before > -1 and (tel is None or tel[0] >= before) and text.find('|', alt + 9) > -1:
+            return None
+
+    if tel and (tel[1] - tel[0]) % 2:
+        tel = None
+
+    return ((alt, alt + 9) if alt > -1 else None, tel)
+
+
+def _find_altitude(text):
+    """
+    Returns the index of the first '/A=' followed by a valid altitude, or -1
+    """
+    idx = text.find('/A=')
+
+    while idx > -1 and not _altitude_value.match(text, idx + 3):
+        idx = text.find('/A=', idx + 1)
+
+    return idx
+
+
+def _find_dao(text):
+    """
+    Returns the index of the last !xyz! DAO extension in text, or -1
+
+    Candidates are tried from the end with rfind, which keeps this linear
+    where ^(.*)!...!(.*?)$ backtracks over every '!' for each prefix.
+    """
+    idx = len(text)
+
+    while idx > 0:
+        idx = text.rfind('!', 0, idx)
+
+        if idx == -1:
+            break
+        if (text[idx+4:idx+5] == '!'
+           and '!' <= text[idx+1] <= '{'
+           and not text[idx+2:idx+4].strip(_dao_chars)):
+            return idx
+
+    return -1
+
+
+def parse_data_extentions(body, profile=None):
     parsed = {}
 
     # course speed bearing nrq
@@ -167,28 +403,10 @@ def parse_data_extentions(body):
         if match:
             ext, phg, phgr = match[0]
             body = body[len(ext):]
-            parsed.update({
-                'phg': phg,
-                'phg_power': int(phg[0]) ** 2, # watts
-                'phg_height': (10 * (2 ** (ord(phg[1]) - 0x30))) * 0.3048, # in meters
-                'phg_gain': 10 ** (int(phg[2]) / 10.0), # dB
-                })
-
-            phg_dir = int(phg[3])
-            if phg_dir == 0:
-                phg_dir = 'omni'
-            elif phg_dir == 9:
-                phg_dir = 'invalid'
-            else:
-                phg_dir = 45 * phg_dir
-
-            parsed['phg_dir'] = phg_dir
-            # range in km
-            parsed['phg_range'] = sqrt(2 * (parsed['phg_height'] / 0.3048)
-                                       * sqrt((parsed['phg_power'] / 10.0)
-                                               * (parsed['phg_gain'] / 2.0)
-                                              )
-                                       ) * 1.60934
+            parsed['phg'] = phg
+
+            if profile is None or profile.phg_details:
+                parsed.update(_phg_details(phg))
 
             if phgr:
                 # PHG rate per hour
@@ -203,34 +421,75 @@ def parse_data_extentions(body):
 
     return body, parsed
 
+# PHG values, indexed by the digit or by the character code - 0x30 for height
+PHG_POWER = [p ** 2 for p in range(10)]  # watts
+PHG_HEIGHT = [(10 * (2 ** h)) * 0.3048 for h in range(0x7f - 0x30)]  # in meters
+PHG_GAIN = [10 ** (g / 10.0) for g in range(10)]  # dB
+PHG_DIR = ['omni'] + [45 * d for d in range(1, 9)] + ['invalid']
+
+# range in km, indexed by (power * 79 + height) * 10 + gain
+# filled in on use, as most of it never is
+PHG_RANGE = [None] * (10 * 79 * 10)
+
+
+def _phg_details(phg):
+    power, height, gain = int(phg[0]), ord(phg[1]) - 0x30, int(phg[2])
+
+    parsed = {
+        'phg_power': PHG_POWER[power],
+        'phg_height': PHG_HEIGHT[height],
+        'phg_gain': PHG_GAIN[gain],
+        'phg_dir': PHG_DIR[int(phg[3])],
+        }
+
+    key = (power * 79 + height) * 10 + gain
+    phg_range = PHG_RANGE[key]
+
+    if phg_range is None:
+        phg_range = PHG_RANGE[key] = sqrt(
+            2 * (parsed['phg_height'] / 0.3048)
+            * sqrt((parsed['phg_power'] / 10.0) * (parsed['phg_gain'] / 2.0))
+            ) * 1.60934
+
+    parsed['phg_range'] = phg_range
+
+    return parsed
+
+
 def parse_comment_altitude(body):
     parsed = {}
-    match = re.findall(r"^(.*?)/A=(\-\d{5}|\d{6})(.*)$", body)
-    if match:
-        body, altitude, rest = match[0]
-        body += rest
-        parsed.update({'altitude': int(altitude)*0.3048})
+    text = _split_line(body)
+    idx = _find_altitude(text) if text is not None else -1
+
+    if idx > -1:
+        body = text[:idx] + text[idx+9:]
+        parsed.update({'altitude': int(text[idx+3:idx+9])*0.3048})
 
     return body, parsed
 
 
 def parse_dao(body, parsed):
-    match = re.findall("^(.*)\!([\x21-\x7b])([\x20-\x7b]{2})\!(.*?)$", body)
-    if match:
-        body, daobyte, dao, rest = match[0]
-        body += rest
-
-        parsed.update({'daodatumbyte': daobyte.upper()})
-        lat_offset = lon_offset = 0
+    text = _split_line(body)
+    idx = _find_dao(text) if text is not None else -1
 
-        if daobyte == 'W' and dao.isdigit():
-            lat_offset = int(dao[0]) * 0.001 / 60
-            lon_offset = int(dao[1]) * 0.001 / 60
-        elif daobyte == 'w' and ' ' not in dao:
-            lat_offset = (base91.to_decimal(dao[0]) / 91.0) * 0.01 / 60
-            lon_offset = (base91.to_decimal(dao[1]) / 91.0) * 0.01 / 60
+    if idx > -1:
+        body = text[:idx] + text[idx+5:]
 
-        parsed['latitude'] += lat_offset if parsed['latitude'] >= 0 else -lat_offset
-        parsed['longitude'] += lon_offset if parsed['longitude'] >= 0 else -lon_offset
+        _apply_dao(text[idx+1], text[idx+2:idx+4], parsed)
 
     return body
+
+
+def _apply_dao(daobyte, dao, parsed):
+    parsed.update({'daodatumbyte': daobyte.upper()})
+    lat_offset = lon_offset = 0
+
+    if daobyte == 'W' and dao.isdigit():
+        lat_offset = int(dao[0]) * 0.001 / 60
+        lon_offset = int(dao[1]) * 0.001 / 60
+    elif daobyte == 'w' and ' ' not in dao:
+        lat_offset = (base91.to_decimal(dao[0]) / 91.0) * 0.01 / 60
+        lon_offset = (base91.to_decimal(dao[1]) / 91.0) * 0.01 / 60
+
+    parsed['latitude'] += lat_offset if parsed['latitude'] >= 0 else -lat_offset
+    parsed['longitude'] += lon_offset if parsed['longitude'] >= 0 else -lon_offset
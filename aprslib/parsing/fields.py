@@ -0,0 +1,59 @@
+"""
+Field selection for parse()
+"""
+
+__all__ = [
+    'FieldProfile',
+    ]
+
+# values derived from the PHG extension, see parse_data_extentions()
+PHG_DETAILS = frozenset(['phg_power', 'phg_height', 'phg_gain', 'phg_dir', 'phg_range'])
+
+# fields that need the DAO extension decoded
+DAO_FIELDS = frozenset(['latitude', 'longitude', 'daodatumbyte'])
+
+# fields of the data extension at the start of a position comment
+DATA_EXT_FIELDS = frozenset(['course', 'speed', 'bearing', 'nrq', 'phg', 'phg_rate', 'rng']) | PHG_DETAILS
+
+# fields decoded from the comment of a position, besides the DAO correction
+COMMENT_FIELDS = DATA_EXT_FIELDS | frozenset(['comment', 'altitude', 'telemetry', 'daodatumbyte'])
+
+
+class FieldProfile(object):
+    """
+    Set of fields to return from parse(), prepared once and reused
+
+    The parsers skip decoding and unit conversion that only feeds fields
+    outside the profile, and the result holds just the selected fields.
+    ``raw`` is selected like any other field, so leaving it out means the
+    result does not keep a reference to the packet.
+
+    The position, mic-e and weather parsers only look at the comment for
+    the fields in it, and for a DAO extension when the position is selected.
+
+        profile = FieldProfile(['from', 'to', 'latitude', 'longitude'])
+        parse(packet, fields=profile)
+    """
+    def __init__(self, fields):
+        self.fields = frozenset(fields)
+        self.phg_details = not self.fields.isdisjoint(PHG_DETAILS)
+        self.dao = not self.fields.isdisjoint(DAO_FIELDS)
+        self.telemetry = 'telemetry' in self.fields
+        self.raw = 'raw' in self.fields
+        self.path = 'path' in self.fields
+        self.comment = not self.fields.isdisjoint(COMMENT_FIELDS)
+        self.data_extensions = 'comment' in self.fields or not self.fields.isdisjoint(DATA_EXT_FIELDS)
+        self.weather = 'weather' in self.fields or 'comment' in self.fields
+        self.motion = 'speed' in self.fields or 'course' in self.fields
+
+    def __contains__(self, field):
+        return field in self.fields
+
+    def __repr__(self):
+        return "FieldProfile(%r)" % sorted(self.fields)
+
+    def select(self, parsed):
+        """
+        Returns a dict with only the selected fields of parsed
+        """
+        return dict((key, parsed[key]) for key in self.fields if key in parsed)
@@ -1,6 +1,5 @@
-import re
-from aprslib.parsing import logger
-from aprslib.parsing.telemetry import parse_telemetry_config
+import string
+from aprslib.parsing.telemetry import parse_telemetry_config, _split_line
 
 __all__ = [
         'parse_message',
@@ -21,114 +20,126 @@ __all__ = [
 def parse_message(body):
     parsed = {}
 
-    # the while loop is used to easily break out once a match is found
-    while True:
-        # try to match bulletin
-        match = re.findall(r"^BLN([0-9])([a-z0-9_ \-]{5}):(.{0,67})", body, re.I)
-        if match:
-            bid, identifier, text = match[0]
-            identifier = identifier.rstrip(' ')
+    # bulletins, announcements and messages all start with a 9 character
+    # addressee field followed by ':', so one check covers all of them
+    if body[9:10] != ':' or body[:9].strip(_addressee_chars):
+        return ('', parsed)
+
+    addresse = body[:9]
 
+    if addresse[:3].upper() == 'BLN':
+        bid = addresse[3]
+        identifier = addresse[4:].rstrip(' ')
+
+        # try to match bulletin
+        if '0' <= bid <= '9':
             mformat = 'bulletin' if identifier == "" else 'group-bulletin'
 
             parsed.update({
                 'format': mformat,
-                'message_text': text.strip(' '),
+                'message_text': _bulletin_text(body),
                 'bid': bid,
                 'identifier': identifier
                 })
-            break
+            return ('', parsed)
 
         # try to match announcement
-        match = re.findall(r"^BLN([A-Z])([a-zA-Z0-9_ \-]{5}):(.{0,67})", body)
-        if match:
-            aid, identifier, text = match[0]
-            identifier = identifier.rstrip(' ')
-
+        if 'A' <= bid <= 'Z' and addresse[:3] == 'BLN':
             parsed.update({
                 'format': 'announcement',
-                'message_text': text.strip(' '),
-                'aid': aid,
+                'message_text': _bulletin_text(body),
+                'aid': bid,
                 'identifier': identifier
                 })
-            break
-
-        # validate addresse
-        match = re.findall(r"^([a-zA-Z0-9_ \-]{9}):(.*)$", body)
-        if not match:
-            break
+            return ('', parsed)
 
-        addresse, body = match[0]
+    # the rest of the message is a single line
+    body = _split_line(body[10:])
+    if body is None:
+        return ('', parsed)
 
-        parsed.update({'addresse': addresse.rstrip(' ')})
+    parsed.update({'addresse': addresse.rstrip(' ')})
 
-        # check if it's a telemetry configuration message
+    # check if it's a telemetry configuration message
+    if body[4:5] == '.' and body[:4] in _telemetry_config_forms:
         body, result = parse_telemetry_config(body)
-        if result:
-            parsed.update(result)
-            break
-
-        # regular message
-        # ---------------------------
-        logger.debug("Packet is just a regular message")
-        parsed.update({'format': 'message'})
-
-        # APRS supports two different message formats:
-        # - the standard format which is described in 'aprs101.pdf':
-        #   http://www.aprs.org/doc/APRS101.PDF
-        # - an addendum from 1999 which introduces a new format:
-        #   http://www.aprs.org/aprs11/replyacks.txt
-        #
-        # A message (ack/rej as well as a standard msg text body) can either have:
-        # - no message number at all
-        # - a message number in the old format (1..5 characters / digits)
-        # - a message number in the new format (2 characters / digits) without trailing 'ack msg no'
-        # - a message number in the new format with trailing 'free ack msg no' (2 characters / digits)
-
-        # ack / rej
-        # ---------------------------
+        parsed.update(result)
+        return ('', parsed)
+
+    # regular message
+    # ---------------------------
+    parsed.update({'format': 'message'})
+
+    # APRS supports two different message formats:
+    # - the standard format which is described in 'aprs101.pdf':
+    #   http://www.aprs.org/doc/APRS101.PDF
+    # - an addendum from 1999 which introduces a new format:
+    #   http://www.aprs.org/aprs11/replyacks.txt
+    #
+    # A message (ack/rej as well as a standard msg text body) can either have:
+    # - no message number at all
+    # - a message number in the old format (1..5 characters / digits)
+    # - a message number in the new format (2 characters / digits) without trailing 'ack msg no'
+    # - a message number in the new format with trailing 'free ack msg no' (2 characters / digits)
+
+    # ack / rej
+    # ---------------------------
+    if body[:3] in ('ack', 'rej'):
+        response = body[:3]
+        number = body[3:]
+
         # NEW REPLAY-ACK
         # format: :AAAABBBBC:ackMM}AA
-        match = re.findall(r"^(ack|rej)([A-Za-z0-9]{2})}([A-Za-z0-9]{2})?$", body)
-        if match:
-            parsed['response'], parsed['msgNo'], ackMsgNo = match[0]
-            if ackMsgNo:
-                parsed['ackMsgNo'] = ackMsgNo
-            break
+        if number[2:3] == '}' and len(number) in (3, 5) and _is_msgno(number[:2] + number[3:]):
+            parsed['response'] = response
+            parsed['msgNo'] = number[:2]
+            if number[3:]:
+                parsed['ackMsgNo'] = number[3:]
+            return ('', parsed)
 
         # ack/rej standard format as per aprs101.pdf chapter 14
         # format: :AAAABBBBC:ack12345
-        match = re.findall(r"^(ack|rej)([A-Za-z0-9]{1,5})$", body)
-        if match:
-            parsed['response'], parsed['msgNo'] = match[0]
-            break
-
-        # regular message body parser
-        # ---------------------------
-        parsed['message_text'] = body.strip(' ')
-
-        # check for ACKs
-        # new message format: http://www.aprs.org/aprs11/replyacks.txt
-        # format: :AAAABBBBC:text.....{MM}AA
-        match = re.findall(r"{([A-Za-z0-9]{2})}([A-Za-z0-9]{2})?$", body)
-        if match:
-            msgNo, ackMsgNo = match[0]
-            parsed['message_text'] = body[:len(body) - 4 - len(ackMsgNo)].strip(' ')
-            parsed['msgNo'] = msgNo
-            if ackMsgNo:
-                parsed['ackMsgNo'] = ackMsgNo
-            break
-
-        # old message format - see aprs101.pdf.
-        # search for: msgNo present
-        match = re.findall(r"{([A-Za-z0-9]{1,5})$", body)
-        if match:
-            msgNo = match[0]
-            parsed['message_text'] = body[:len(body) - 1 - len(msgNo)].strip(' ')
-            parsed['msgNo'] = msgNo
-            break
-
-        # break free from the eternal 'while'
-        break
+        if len(number) <= 5 and _is_msgno(number):
+            parsed['response'] = response
+            parsed['msgNo'] = number
+            return ('', parsed)
+
+    # regular message body parser
+    # ---------------------------
+    parsed['message_text'] = body.strip(' ')
+
+    # check for ACKs
+    # new message format: http://www.aprs.org/aprs11/replyacks.txt
+    # format: :AAAABBBBC:text.....{MM}AA
+    idx = body.rfind('{', -6)
+    number = body[idx+1:] if idx > -1 else ''
+
+    if number[2:3] == '}' and len(number) in (3, 5) and _is_msgno(number[:2] + number[3:]):
+        parsed['message_text'] = body[:idx].strip(' ')
+        parsed['msgNo'] = number[:2]
+        if number[3:]:
+            parsed['ackMsgNo'] = number[3:]
+
+    # old message format - see aprs101.pdf.
+    # search for: msgNo present
+    elif _is_msgno(number):
+        parsed['message_text'] = body[:idx].strip(' ')
+        parsed['msgNo'] = number
 
     return ('', parsed)
+
+
+_msgno_chars = string.ascii_letters + string.digits
+_addressee_chars = _msgno_chars + "_ -"
+_telemetry_config_forms = ('PARM', 'UNIT', 'EQNS', 'BITS')
+
+
+def _is_msgno(text):
+    return text != '' and not text.strip(_msgno_chars)
+
+
+def _bulletin_text(body):
+    """
+    Returns up to 67 characters of bulletin text, ending at a line break
+    """
+    return body[10:77].split('\n', 1)[0].strip(' ')
@@ -2,8 +2,9 @@ import re
 import math
 from aprslib import base91
 from aprslib.exceptions import ParseError
-from aprslib.parsing.common import parse_dao
-from aprslib.parsing.telemetry import parse_comment_telemetry
+from aprslib.parsing.common import parse_comment_extensions
+from aprslib.parsing.telemetry import _base91_chars, _split_line
+from aprslib.util.cache import LRUCache
 
 __all__ = [
         'parse_mice',
@@ -32,102 +33,122 @@ MTYPE_TABLE_CUSTOM = {
     "000": "Emergency",
     }
 
-# Mic-encoded packet
+# Mic-e destination address field encoding, indexed by character code
 #
-# 'lllc/s$/.........         Mic-E no message capability
-# 'lllc/s$/>........         Mic-E message capability
-# `lllc/s$/>........         Mic-E old posit
-def parse_mice(dstcall, body):
-    parsed = {'format': 'mic-e'}
+# latitude digit, with ' ' marking position ambiguity
+DSTCALL_DIGIT = [None] * 256
+# message bit, '2' for custom message bits
+DSTCALL_MBIT = [None] * 256
 
-    dstcall = dstcall.split('-')[0]
+for _i in range(10):
+    DSTCALL_DIGIT[ord('0') + _i] = str(_i)
+    DSTCALL_DIGIT[ord('A') + _i] = str(_i)
+    DSTCALL_DIGIT[ord('P') + _i] = str(_i)
+    DSTCALL_MBIT[ord('0') + _i] = '0'
+    DSTCALL_MBIT[ord('A') + _i] = '2'
+    DSTCALL_MBIT[ord('P') + _i] = '1'
 
-    # verify mic-e format
-    if len(dstcall) != 6:
-        raise ParseError("dstcall has to be 6 characters")
-    if len(body) < 8:
-        raise ParseError("packet data field is too short")
-    if not re.match(r"^[0-9A-Z]{3}[0-9L-Z]{3}$", dstcall):
-        raise ParseError("invalid dstcall")
-    if not re.match(r"^[&-\x7f][&-a][\x1c-\x7f]{2}[\x1c-\x7d]"
-                    r"[\x1c-\x7f][\x21-\x7e][\/\\0-9A-Z]", body):
-        raise ParseError("invalid data format")
+for _char, _mbit in zip("KLZ", "201"):
+    DSTCALL_DIGIT[ord(_char)] = ' '
+    DSTCALL_MBIT[ord(_char)] = _mbit
 
-    # get symbol table and symbol
-    parsed.update({
-        'symbol': body[6],
-        'symbol_table': body[7]
-        })
+del _i, _char, _mbit
+
+# 4th character: south latitude
+DSTCALL_SOUTH = [i <= 0x4c for i in range(256)]
+# 5th character: longitude offset of 100 degrees
+DSTCALL_LNG_OFFSET = [100 if i >= 0x50 else 0 for i in range(256)]
+# 6th character: west longitude
+DSTCALL_WEST = [i >= 0x50 for i in range(256)]
+
+# decoded destination calls, see _decode_dstcall()
+mice_dstcall_cache = LRUCache(maxsize=1024)
+
+_dstcall_re = re.compile(r"^[0-9A-Z]{3}[0-9L-Z]{3}$")
+_body_re = re.compile(r"^[&-\x7f][&-a][\x1c-\x7f]{2}[\x1c-\x7d]"
+                      r"[\x1c-\x7f][\x21-\x7e][\/\\0-9A-Z]")
+
+_hexdigits = "0123456789abcdef"
+
+
+def _decode_dstcall(dstcall):
+    """
+    Decodes the fields carried in a mic-e destination call
 
-    # parse latitude
-    # the routine translates each characters into a lat digit as described in
+    Returns (posambiguity, latitude, mbits, mtype, longitude offset, west),
+    with posambiguity set to None when the latitude digits are invalid,
+    or None when dstcall isn't a mic-e destination call
+    """
+    if not _dstcall_re.match(dstcall):
+        return None
+
+    codes = [ord(c) for c in dstcall]
+
+    # translates each characters into a lat digit as described in
     # 'Mic-E Destination Address Field Encoding' table
-    tmpdstcall = ""
-    for i in dstcall:
-        if i in "KLZ":  # spaces
-            tmpdstcall += " "
-        elif ord(i) > 76:  # P-Y
-            tmpdstcall += chr(ord(i) - 32)
-        elif ord(i) > 57:  # A-J
-            tmpdstcall += chr(ord(i) - 17)
-        else:  # 0-9
-            tmpdstcall += i
-
-    # determine position ambiguity
-    match = re.findall(r"^\d+( *)$", tmpdstcall)
-    if not match:
-        raise ParseError("invalid latitude ambiguity")
-
-    posambiguity = len(match[0])
-    parsed.update({
-        'posambiguity': posambiguity
-        })
+    digits = [DSTCALL_DIGIT[i] for i in codes]
+
+    # determine position ambiguity, spaces are only allowed at the end
+    posambiguity = 0
+    while posambiguity < 5 and digits[5 - posambiguity] == ' ':
+        posambiguity += 1
+
+    if None in digits or ' ' in digits[:6 - posambiguity]:
+        return (None, None, None, None, 0, False)
+
+    # parse message bits
+    mbits = "".join(DSTCALL_MBIT[i] for i in codes[:3])
+
+    # resolve message type
+    if '2' in mbits:
+        mtype = MTYPE_TABLE_CUSTOM[mbits.replace("2", "1")]
+    else:
+        mtype = MTYPE_TABLE_STD[mbits]
 
     # adjust the coordinates be in center of ambiguity box
-    tmpdstcall = list(tmpdstcall)
     if posambiguity > 0:
         if posambiguity >= 4:
-            tmpdstcall[2] = '3'
+            digits[2] = '3'
         else:
-            tmpdstcall[6 - posambiguity] = '5'
+            digits[6 - posambiguity] = '5'
 
-    tmpdstcall = "".join(tmpdstcall)
+    tmpdstcall = "".join(digits)
 
     latminutes = float(("%s.%s" % (tmpdstcall[2:4], tmpdstcall[4:6])).replace(" ", "0"))
     latitude = int(tmpdstcall[0:2]) + (latminutes / 60.0)
 
     # determine the sign N/S
-    latitude = -latitude if ord(dstcall[3]) <= 0x4c else latitude
+    latitude = -latitude if DSTCALL_SOUTH[codes[3]] else latitude
 
-    parsed.update({
-        'latitude': latitude
-        })
+    return (
+        posambiguity,
+        latitude,
+        mbits,
+        mtype,
+        DSTCALL_LNG_OFFSET[codes[4]],
+        DSTCALL_WEST[codes[5]],
+        )
 
-    # parse message bits
 
-    mbits = re.sub(r"[0-9L]", "0", dstcall[0:3])
-    mbits = re.sub(r"[P-Z]", "1", mbits)
-    mbits = re.sub(r"[A-K]", "2", mbits)
+def _dstcall_fields(dstcall, cache=mice_dstcall_cache):
+    """
+    Returns the _decode_dstcall() result for dstcall, from the cache
+    when possible, as a parked vehicle keeps sending the same one
+    """
+    fields = cache.get(dstcall)
 
-    parsed.update({
-        'mbits': mbits
-        })
+    if fields is None:
+        fields = _decode_dstcall(dstcall)
 
-    # resolve message type
+        if fields is not None:
+            cache.set(dstcall, fields)
 
-    if mbits.find("2") > -1:
-        parsed.update({
-            'mtype': MTYPE_TABLE_CUSTOM[mbits.replace("2", "1")]
-            })
-    else:
-        parsed.update({
-            'mtype': MTYPE_TABLE_STD[mbits]
-            })
+    return fields
 
-    # parse longitude
 
+def _decode_longitude(body, posambiguity, lng_offset, west):
     longitude = ord(body[0]) - 28  # decimal part of longitude
-    longitude += 100 if ord(dstcall[4]) >= 0x50 else 0  # apply lng offset
+    longitude += lng_offset  # apply lng offset
     longitude += -80 if longitude >= 180 and longitude <= 189 else 0
     longitude += -190 if longitude >= 190 and longitude <= 199 else 0
 
@@ -154,65 +175,129 @@ def parse_mice(dstcall, body):
     longitude += lngminutes / 60.0
 
     # apply E/W sign
-    longitude = 0 - longitude if ord(dstcall[5]) >= 0x50 else longitude
+    return 0 - longitude if west else longitude
+
+
+# Mic-encoded packet
+#
+# 'lllc/s$/.........         Mic-E no message capability
+# 'lllc/s$/>........         Mic-E message capability
+# `lllc/s$/>........         Mic-E old posit
+def parse_mice(dstcall, body, profile=None, cache=mice_dstcall_cache):
+    result = _decode_mice(dstcall, body, profile, cache)
+
+    if result[0] is None:
+        raise ParseError(result[1])
+
+    return result
+
+
+def _decode_mice(dstcall, body, profile=None, cache=mice_dstcall_cache):
+    """
+    Like parse_mice(), but returns (None, error) for malformed packets
+    instead of raising ParseError
+    """
+    parsed = {'format': 'mic-e'}
+
+    dstcall = dstcall.split('-')[0]
+
+    # verify mic-e format
+    if len(dstcall) != 6:
+        return None, "dstcall has to be 6 characters"
+    if len(body) < 8:
+        return None, "packet data field is too short"
+
+    fields = _dstcall_fields(dstcall, cache)
+
+    if fields is None:
+        return None, "invalid dstcall"
+    if not _body_re.match(body):
+        return None, "invalid data format"
+
+    posambiguity, latitude, mbits, mtype, lng_offset, west = fields
 
+    if posambiguity is None:
+        return None, "invalid latitude ambiguity"
+    if posambiguity > 4:
+        return None, "Unsupported position ambiguity: %d" % posambiguity
+
+    # get symbol table and symbol
     parsed.update({
-        'longitude': longitude
+        'symbol': body[6],
+        'symbol_table': body[7],
+        'posambiguity': posambiguity,
+        'latitude': latitude,
+        'mbits': mbits,
+        'mtype': mtype,
         })
 
-    # parse speed and course
-    speed = (ord(body[3]) - 28) * 10
-    course = ord(body[4]) - 28
-    quotient = int(course / 10.0)
-    course += -(quotient * 10)
-    course = course*100 + ord(body[5]) - 28
-    speed += quotient
+    longitude = _decode_longitude(body, posambiguity, lng_offset, west)
 
-    speed += -800 if speed >= 800 else 0
-    course += -400 if course >= 400 else 0
-
-    speed *= 1.852  # knots * 1.852 = kmph
     parsed.update({
-        'speed': speed,
-        'course': course
+        'longitude': longitude
         })
 
-    # the rest of the packet can contain telemetry and comment
+    # parse speed and course
+    if profile is None or profile.motion:
+        speed = (ord(body[3]) - 28) * 10
+        course = ord(body[4]) - 28
+        quotient = int(course / 10.0)
+        course += -(quotient * 10)
+        course = course*100 + ord(body[5]) - 28
+        speed += quotient
+
+        speed += -800 if speed >= 800 else 0
+        course += -400 if course >= 400 else 0
+
+        speed *= 1.852  # knots * 1.852 = kmph
+        parsed.update({
+            'speed': speed,
+            'course': course
+            })
 
-    if len(body) > 8:
+    # the rest of the packet can contain telemetry and comment
+    # with a profile, it's only needed for its fields or a DAO extension
+    if len(body) > 8 and (profile is None or profile.comment
+                          or profile.dao and '!' in body[8:]):
         body = body[8:]
 
         # check for optional 2 or 5 channel telemetry
-        match = re.findall(r"^('[0-9a-f]{10}|`[0-9a-f]{4})(.*)$", body)
-        if match:
-            hexdata, body = match[0]
+        flag = body[:1]
+        length = 11 if flag == "'" else 5 if flag == "`" else 0
+        hexdata = body[1:length]
+
+        if length and len(hexdata) == length - 1 and not hexdata.strip(_hexdigits):
+            rest = _split_line(body[length:])
+
+            if rest is not None:
+                body = rest
 
-            hexdata = hexdata[1:]             # remove telemtry flag
-            channels = int(len(hexdata) / 2)  # determine number of channels
-            hexdata = int(hexdata, 16)        # convert hex to int
+                if profile is None or profile.telemetry:
+                    channels = int(len(hexdata) / 2)  # determine number of channels
+                    hexdata = int(hexdata, 16)        # convert hex to int
 
-            telemetry = []
-            for i in range(channels):
-                telemetry.insert(0, int(hexdata >> 8*i & 255))
+                    telemetry = []
+                    for i in range(channels):
+                        telemetry.insert(0, int(hexdata >> 8*i & 255))
 
-            parsed.update({'telemetry': telemetry})
+                    parsed.update({'telemetry': telemetry})
 
-        # check for optional altitude
-        match = re.findall(r"^(.*)([!-{]{3})\}(.*)$", body)
-        if match:
-            body, altitude, extra = match[0]
+        # check for optional altitude, the last xxx} in the comment
+        text = _split_line(body)
+        idx = len(text) if text is not None else -1
 
-            altitude = base91.to_decimal(altitude) - 10000
-            parsed.update({'altitude': altitude})
+        while idx > 0:
+            idx = text.rfind('}', 0, idx)
 
-            body = body + extra
+            if idx >= 3 and not text[idx-3:idx].strip(_base91_chars):
+                altitude = base91.to_decimal(text[idx-3:idx]) - 10000
+                parsed.update({'altitude': altitude})
 
-        # attempt to parse comment telemetry
-        body, telemetry = parse_comment_telemetry(body)
-        parsed.update(telemetry)
+                body = text[:idx-3] + text[idx+1:]
+                break
 
-        # parse DAO extention
-        body = parse_dao(body, parsed)
+        # comment telemetry and DAO extention
+        body = parse_comment_extensions(body, parsed, altitude=False, profile=profile)
 
         # rest is a comment
         parsed.update({'comment': body.strip(' ')})
@@ -13,8 +13,8 @@ __all__ = [
 #
 # >DDHHMMzComments
 # >Comments
-def parse_status(packet_type, body):
-    body, result = parse_timestamp(body, packet_type)
+def parse_status(packet_type, body, decoder=None):
+    body, result = parse_timestamp(body, packet_type, decoder)
 
     result.update({
         'format': 'status',
@@ -0,0 +1,260 @@
+from calendar import timegm
+from datetime import datetime
+
+from aprslib.exceptions import ParseError, UnknownFormat
+from aprslib.parsing.common import STRICT, TRUSTED, timestamp_decoder
+from aprslib.util.cache import LRUCache
+
+__all__ = [
+        'parse_nmea',
+        ]
+
+
+# RAW GPS (NMEA)
+#
+# $GPRMC,hhmmss,A,ddmm.mm,N,dddmm.mm,W,kts,crs,ddmmyy,...*CS
+# $GPGGA,hhmmss,ddmm.mm,N,dddmm.mm,W,q,nn,hdop,alt,M,...*CS
+# $GPGLL,ddmm.mm,N,dddmm.mm,W,hhmmss,A*CS
+def parse_nmea(body, mode=STRICT, decoder=None, cache=None, tocall=''):
+    """
+    Parses the body of a raw GPS packet, after the '$'
+
+    Decodes RMC, GGA and GLL sentences of any talker (GP, GN, GL, ...) into
+    the latitude, longitude, speed, course and altitude fields of the other
+    position formats. The checksum is verified when present.
+    Other sentences raise UnknownFormat.
+
+    The sentence carries no symbol, it's taken from a GPSxyz, GPSCnn,
+    GPSEnn, SPCxyz or SYMxyz destination call (tocall), and is the '/'
+    dot otherwise, see chapter 20 of the spec.
+
+    cache holds the decoded RMC dates, nmea_date_cache when None
+    """
+    sentence = body[2:5]
+
+    if sentence not in _sentence_fields:
+        raise UnknownFormat("unsupported NMEA sentence")
+
+    star = body.rfind('*')
+
+    if star > -1:
+        if _checksum(body[:star]) != body[star+1:star+3].upper():
+            raise ParseError("NMEA checksum mismatch")
+
+        body = body[:star]
+
+    fields = body.split(',')
+
+    if len(fields) < _sentence_fields[sentence]:
+        raise ParseError("NMEA %s sentence is too short" % sentence)
+
+    symbol_table, symbol = _dstcall_symbol(tocall)
+    parsed = {
+        'format': 'nmea',
+        'nmea_sentence': sentence,
+        'symbol': symbol,
+        'symbol_table': symbol_table,
+        'posambiguity': 0,
+        }
+
+    if sentence == 'RMC':
+        _, time, status, lat, lat_dir, lon, lon_dir, speed, course, date = fields[:10]
+
+        if status != 'A':
+            raise ParseError("NMEA sentence has no GPS fix")
+
+        _decode_position(lat, lat_dir, lon, lon_dir, parsed, mode)
+
+        if speed:
+            parsed['speed'] = _decode_number(speed) * 1.852  # knots to km/h
+        if course:
+            course = int(_decode_number(course) + 0.5)
+
+            if 0 <= course <= 360:
+                parsed['course'] = course or 360
+
+        parsed['timestamp'] = _decode_datetime(date, time, cache)
+    elif sentence == 'GGA':
+        _, time, lat, lat_dir, lon, lon_dir, quality, _, _, altitude, unit = fields[:11]
+
+        if quality in ('', '0'):
+            raise ParseError("NMEA sentence has no GPS fix")
+
+        _decode_position(lat, lat_dir, lon, lon_dir, parsed, mode)
+
+        if altitude and unit == 'M':
+            parsed['altitude'] = _decode_number(altitude)
+
+        parsed['timestamp'] = _decode_time(time, decoder)
+    else:
+        _, lat, lat_dir, lon, lon_dir, time = fields[:6]
+
+        if len(fields) > 6 and fields[6] != 'A':
+            raise ParseError("NMEA sentence has no GPS fix")
+
+        _decode_position(lat, lat_dir, lon, lon_dir, parsed, mode)
+        parsed['timestamp'] = _decode_time(time, decoder)
+
+    return ('', parsed)
+
+
+# minimum number of fields in each sentence
+_sentence_fields = {
+    'RMC': 10,
+    'GGA': 11,
+    'GLL': 6,
+    }
+
+_digits = '0123456789'
+_number_chars = _digits + '+-.'
+
+# symbols of the destination call, by the two character code of the spec,
+# as (symbol table, symbol)
+_dstcall_symbols = {}
+
+for _table, _groups in (('/', (('B', 'BCDEFGHIJKLMNOP', '!'), ('P', _digits, '0'),
+                                ('M', 'RSTUVWX', ':'), ('P', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'A'),
+                                ('H', 'STUVWX', '['), ('L', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'a'),
+                                ('J', '1234', '{'))),
+                        ('\\', (('O', 'BCDEFGHIJKLMNOP', '!'), ('A', _digits, '0'),
+                                 ('N', 'RSTUVWX', ':'), ('A', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'A'),
+                                 ('D', 'STUVWX', '['), ('S', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'a'),
+                                 ('Q', '1234', '{')))):
+    for _prefix, _chars, _first in _groups:
+        for _i, _char in enumerate(_chars):
+            _dstcall_symbols[_prefix + _char] = (_table, chr(ord(_first) + _i))
+
+del _table, _groups, _prefix, _chars, _first, _i, _char
+
+_overlays = _digits + 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def _dstcall_symbol(tocall):
+    """
+    Returns (symbol table, symbol) from a destination call like GPSxyz,
+    where z is the overlay of alternate symbols, or the default ('/', '/')
+    """
+    call = tocall.split('-')[0]
+    prefix, code = call[:3], call[3:]
+
+    if prefix == 'GPS' and len(code) == 3 and code[0] in 'CE' and code[1:].isdigit():
+        # GPSCnn and GPSEnn, symbols numbered from 01 for '!'
+        number = int(code[1:])
+
+        if 1 <= number <= 94:
+            return ('/' if code[0] == 'C' else '\\', chr(32 + number))
+    elif prefix in ('GPS', 'SPC', 'SYM') and len(code) in (2, 3):
+        symbol = _dstcall_symbols.get(code[:2])
+
+        if symbol is not None:
+            if symbol[0] == '\\' and code[2:] and code[2] in _overlays:
+                return (code[2], symbol[1])
+
+            return symbol
+
+    return ('/', '/')
+
+
+def _checksum(text):
+    """
+    Returns the XOR of the characters after the '$', as hex
+    """
+    value = 0
+
+    for char in text:
+        value ^= ord(char)
+
+    return "%02X" % value
+
+
+def _decode_number(text):
+    """
+    Returns a signed decimal number as float
+
+    Only digits, a sign and '.' are accepted, float() alone would also
+    take 'nan', 'inf' and exponents
+    """
+    if text.strip(_number_chars):
+        raise ParseError("invalid number in NMEA sentence")
+
+    try:
+        return float(text)
+    except ValueError:
+        raise ParseError("invalid number in NMEA sentence")
+
+
+def _decode_position(lat, lat_dir, lon, lon_dir, parsed, mode):
+    """
+    Converts the ddmm.mmmm and dddmm.mmmm fields to decimal degrees
+    """
+    if (lat[4:5] != '.' or lon[5:6] != '.'
+       or lat_dir not in ('N', 'S') or lon_dir not in ('E', 'W')
+       or lat[:4].strip(_digits) or lon[:5].strip(_digits)):
+        raise ParseError("invalid NMEA position")
+
+    lat_deg, lat_min = int(lat[:2]), _decode_number(lat[2:])
+    lon_deg, lon_min = int(lon[:3]), _decode_number(lon[3:])
+
+    if mode != TRUSTED:
+        if lat_deg > 89 or lat_min >= 60:
+            raise ParseError("latitude is out of range (0-90 degrees)")
+        if lon_deg > 179 or lon_min >= 60:
+            raise ParseError("longitude is out of range (0-180 degrees)")
+
+    latitude = lat_deg + (lat_min / 60.0)
+    longitude = lon_deg + (lon_min / 60.0)
+
+    parsed.update({
+        'latitude': -latitude if lat_dir == 'S' else latitude,
+        'longitude': -longitude if lon_dir == 'W' else longitude,
+        })
+
+
+def _decode_time(time, decoder):
+    """
+    Returns epoch seconds for a hhmmss time of the current day, see
+    TimestampDecoder, or 0 if the time is invalid
+    """
+    if len(time) < 6 or time[:6].strip(_digits):
+        return 0
+
+    return (decoder or timestamp_decoder).decode(time[:6], 'h')
+
+
+# epoch seconds of recently seen ddmmyy dates
+nmea_date_cache = LRUCache(maxsize=64)
+
+
+def _decode_datetime(date, time, cache=None):
+    """
+    Returns epoch seconds for a ddmmyy date and hhmmss time,
+    or 0 if either is invalid
+    """
+    if cache is None:
+        cache = nmea_date_cache
+
+    if len(time) < 6 or time[:6].strip(_digits):
+        return 0
+
+    hours, minutes, seconds = int(time[0:2]), int(time[2:4]), int(time[4:6])
+
+    if hours > 23 or minutes > 59 or seconds > 59:
+        return 0
+
+    day = cache.get(date)
+
+    if day is None:
+        if len(date) != 6 or date.strip(_digits):
+            return 0
+
+        year = int(date[4:6])
+
+        try:
+            day = timegm(datetime(2000 + year if year < 70 else 1900 + year,
+                                  int(date[2:4]), int(date[0:2])).timetuple())
+        except ValueError:
+            return 0
+
+        cache.set(date, day)
+
+    return day + hours * 3600 + minutes * 60 + seconds
@@ -0,0 +1,197 @@
+"""
+Cheap inspection of raw packets, without a full parse()
+
+Both functions accept str/unicode or bytes-like lines, as read from
+APRS-IS, and only look at the few fields they return. They are meant for
+filtering a feed before deciding which packets to parse() in full.
+"""
+import aprslib.parsing
+from aprslib import string_type
+from aprslib.parsing.position import (_compressed_re, _compressed_coordinates,
+                                      _normal_position_re, _normal_coordinates, _item_re)
+from aprslib.parsing.mice import _body_re, _dstcall_fields, _decode_longitude
+from aprslib.parsing.message import _telemetry_config_forms
+
+__all__ = [
+    'classify',
+    'peek_position',
+    ]
+
+_binary_type = (bytes, bytearray, memoryview)
+
+# format names of the data type identifiers, as reported by parse()
+# position reports are resolved further, see _position_format()
+_type_formats = {
+    '`': 'mic-e',
+    "'": 'mic-e',
+    ';': 'object',
+    ')': 'item',
+    ':': 'message',
+    '>': 'status',
+    '_': 'wx',
+    'T': 'telemetry',
+    '$': 'nmea',
+    '}': 'thirdparty',
+    '{': 'user-defined',
+    ',': 'invalid',
+    }
+
+# offset of the position in the body: after the data type identifier,
+# the timestamp and the object name
+_position_offsets = {
+    '!': 1,
+    '=': 1,
+    '/': 8,
+    '@': 8,
+    ';': 18,
+    }
+
+
+def _split(raw):
+    """
+    Returns (fromcall, tocall, body) of a raw line, or None
+    """
+    if not isinstance(raw, string_type):
+        if not isinstance(raw, _binary_type):
+            raise TypeError("Expected raw to be str/unicode/bytes, got %s" % type(raw))
+
+        # bytes(memoryview) is its repr on py2
+        raw = (raw.tobytes() if isinstance(raw, memoryview) else bytes(raw)).decode('latin-1')
+
+    idx = raw.find(':')
+    gt = raw.find('>', 0, idx) if idx > -1 else -1
+
+    if gt < 1:
+        return None
+
+    body = raw[idx+1:].rstrip("\r\n")
+
+    if not body:
+        return None
+
+    comma = raw.find(',', gt, idx)
+
+    return raw[:gt], raw[gt+1:comma if comma > -1 else idx], body
+
+
+def _position_start(body):
+    """
+    Returns the offset of the position in body, or -1
+    """
+    packet_type = body[0]
+    start = _position_offsets.get(packet_type)
+
+    if start is not None:
+        return start
+    if packet_type == ')':
+        match = _item_re.match(body, 1)
+        return match.end() if match else -1
+    if packet_type in _type_formats:
+        return -1
+
+    # postion report with data preceding the '!', see _try_toparse_body()
+    if ord(packet_type) < 256 and aprslib.parsing._format_table[ord(packet_type)] is not None:
+        return -1
+
+    idx = body.find('!', 1)
+
+    return idx + 1 if 0 < idx < 41 else -1
+
+
+def _position_format(data):
+    if _compressed_re.match(data):
+        return 'compressed'
+    if data[:1].isdigit():
+        return 'uncompressed'
+    return None
+
+
+def classify(raw):
+    """
+    Returns (fromcall, tocall, type_char, format_guess) for a raw packet,
+    or None when it has no header and body
+
+    format_guess is the format parse() would most likely report, or None.
+    Only the data type identifier and the start of a position are looked
+    at, so the packet may still fail to parse.
+    """
+    fields = _split(raw)
+
+    if fields is None:
+        return None
+
+    fromcall, tocall, body = fields
+    packet_type = body[0]
+    guess = _type_formats.get(packet_type)
+
+    if packet_type == ':':
+        # ':ADDRESSEE:PARM.' and the like
+        if body[15:16] == '.' and body[11:15] in _telemetry_config_forms:
+            guess = 'telemetry-message'
+    elif guess is None:
+        start = _position_start(body)
+
+        if start > -1:
+            guess = _position_format(body[start:])
+
+    return fromcall, tocall, packet_type, guess
+
+
+def peek_position(raw):
+    """
+    Returns (latitude, longitude) of an uncompressed, compressed or mic-e
+    position, or None when the packet has no valid position
+
+    Only the coordinates are decoded. They are the values parse() returns,
+    except for the extra precision of a DAO extension in the comment, and
+    the rest of the packet is not validated.
+    """
+    fields = _split(raw)
+
+    if fields is None:
+        return None
+
+    fromcall, tocall, body = fields
+
+    if body[0] in "`'":
+        return _peek_mice(tocall, body[1:])
+
+    start = _position_start(body)
+
+    if start == -1:
+        return None
+
+    data = body[start:]
+
+    # compressed positions never start with a digit
+    if not data[:1].isdigit():
+        return _compressed_coordinates(data) if _compressed_re.match(data) else None
+
+    match = _normal_position_re.match(data)
+
+    if match:
+        lat_deg, lat_min, lat_dir, _, lon_deg, lon_min, lon_dir, _ = match.groups()
+        posambiguity, latitude, longitude = _normal_coordinates(
+            lat_deg, lat_min, lat_dir, lon_deg, lon_min, lon_dir)
+
+        if posambiguity is not None:
+            return latitude, longitude
+
+    return None
+
+
+def _peek_mice(tocall, body):
+    dstcall = tocall.split('-')[0]
+
+    if len(dstcall) != 6 or len(body) < 8 or not _body_re.match(body):
+        return None
+
+    cache = aprslib.parsing.thread_parser().mice_cache
+    fields = _dstcall_fields(dstcall, cache)
+
+    if fields is None or fields[0] is None or fields[0] > 4:
+        return None
+
+    posambiguity, latitude, _, _, lng_offset, west = fields
+
+    return latitude, _decode_longitude(body, posambiguity, lng_offset, west)
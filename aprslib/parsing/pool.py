@@ -0,0 +1,215 @@
+"""
+Parsing of many packets in parallel
+
+ParsePool runs try_parse() in a pool of workers, with one of the backends:
+
+- ``thread`` - threads, which only run in parallel on free-threaded builds
+- ``process`` - processes
+- ``interpreter`` - sub-interpreters (PEP 684/734), needs Python 3.14+
+
+The process and interpreter workers take the raw lines in chunks, and send
+the results of a chunk back marshalled into a single bytes object, which is
+cheap to pass between interpreters and faster to produce and load than
+pickled dicts.
+"""
+import os
+import marshal
+import pickle
+from collections import deque
+
+import aprslib.parsing
+from aprslib.exceptions import ParseErrorCode
+from aprslib.parsing.common import STRICT
+
+__all__ = [
+    'ParsePool',
+    'BACKENDS',
+    ]
+
+BACKENDS = ('thread', 'process', 'interpreter')
+
+
+def _executor(backend, workers, formats=()):
+    import concurrent.futures
+
+    if backend == 'thread':
+        return concurrent.futures.ThreadPoolExecutor(workers)
+
+    # only passed when needed, as the py2 futures backport has no initializer
+    options = {'initializer': _register_formats, 'initargs': (formats, )} if formats else {}
+
+    if backend == 'process':
+        return concurrent.futures.ProcessPoolExecutor(workers, **options)
+
+    executor = getattr(concurrent.futures, 'InterpreterPoolExecutor', None)
+
+    if executor is None:
+        raise RuntimeError("the interpreter backend needs concurrent.futures.InterpreterPoolExecutor"
+                           " (Python 3.14+)")
+
+    return executor(workers, **options)
+
+
+def _worker_formats(backend):
+    """
+    Returns the register_format() calls to repeat in the workers of a
+    process or interpreter pool, as (packet_type, parser) pairs
+    """
+    formats = tuple(sorted(aprslib.parsing._registered_formats.items()))
+
+    try:
+        pickle.dumps(formats, pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        raise ValueError("the %s backend needs the parsers added with register_format() to be"
+                         " picklable, e.g. module level functions" % backend)
+
+    return formats
+
+
+def _register_formats(formats):
+    """
+    Initializer of the process and interpreter workers
+    """
+    for packet_type, parser in formats:
+        aprslib.parsing.register_format(packet_type, parser)
+
+
+def _parse_lines(lines, fields, mode):
+    # the worker thread's parser for these fields, see aprslib.parse()
+    parser = aprslib.parsing._parser_for(fields, mode)
+
+    return [parser.try_parse(line) for line in lines]
+
+
+def _parse_chunk(lines, fields, mode):
+    """
+    Worker side of the process and interpreter backends
+
+    fields is a tuple of field names or None. Returns the results as bytes,
+    marshalled as [parsed, code] pairs, or pickled when a format parser
+    returned values marshal doesn't support
+    """
+    results = [(parsed, None if code is None else int(code))
+               for parsed, code in _parse_lines(lines, fields, mode)]
+
+    try:
+        return b'm' + marshal.dumps(results)
+    except ValueError:
+        return b'p' + pickle.dumps(results, pickle.HIGHEST_PROTOCOL)
+
+
+def _load_chunk(data):
+    if data[:1] == b'm':
+        results = marshal.loads(data[1:])
+    else:
+        results = pickle.loads(data[1:])
+
+    return [(parsed, None if code is None else ParseErrorCode(code)) for parsed, code in results]
+
+
+class ParsePool(object):
+    """
+    Pool of workers parsing packets with try_parse()
+
+    backend   - one of BACKENDS
+    workers   - number of workers, one per cpu when None
+    fields    - field names to return, see FieldProfile
+    mode      - one of STRICT, LENIENT or TRUSTED
+    chunksize - number of packets handed to a worker at once
+
+        with ParsePool('process', workers=4) as pool:
+            for parsed, code in pool.map(lines):
+                ...
+
+    An instance can also be passed to IS.consumer().
+
+    Process and interpreter workers repeat the register_format() calls made
+    before the pool was created, so the parsers have to be picklable, e.g.
+    module level functions. Formats registered or removed afterwards only
+    apply to the thread backend.
+    """
+    def __init__(self, backend='thread', workers=None, fields=None, mode=STRICT, chunksize=256):
+        if backend not in BACKENDS:
+            raise ValueError("expected backend to be one of %s, got %r" % (", ".join(BACKENDS), backend))
+        if mode not in aprslib.parsing.MODES:
+            raise ValueError("expected mode to be one of %s, got %r" % (
+                ", ".join(aprslib.parsing.MODES), mode))
+        if fields is not None and not isinstance(fields, aprslib.parsing.FieldProfile):
+            fields = aprslib.parsing.FieldProfile(fields)
+
+        self.backend = backend
+        self.fields = fields
+        self.mode = mode
+        self.chunksize = chunksize
+        self.workers = workers or getattr(os, 'cpu_count', lambda: None)() or 1
+        self._executor = _executor(backend, self.workers,
+                                   _worker_formats(backend) if backend != 'thread' else ())
+
+    def __repr__(self):
+        return "ParsePool(%r, workers=%d, mode=%r)" % (self.backend, self.workers, self.mode)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Shuts the workers down, after finishing the submitted packets
+        """
+        self._executor.shutdown()
+
+    def submit(self, lines):
+        """
+        Submits a chunk of packets, returns a future of the list of results
+        """
+        if self.backend == 'thread':
+            return self._executor.submit(_parse_lines, list(lines), self.fields, self.mode)
+
+        fields = None if self.fields is None else tuple(sorted(self.fields.fields))
+        return _ChunkFuture(self._executor.submit(_parse_chunk, tuple(lines), fields, self.mode))
+
+    def map(self, lines, chunksize=None):
+        """
+        Parses an iterable of packets, yields (parsed, code) for each in order,
+        as try_parse() does
+
+        lines is consumed as the workers need more, so it can be a stream.
+        """
+        chunksize = chunksize or self.chunksize
+        pending = deque()
+        chunk = []
+
+        for line in lines:
+            chunk.append(line)
+
+            if len(chunk) == chunksize:
+                pending.append(self.submit(chunk))
+                chunk = []
+
+                # keeps every worker busy, without reading ahead without bound
+                if len(pending) > 2 * self.workers:
+                    for result in pending.popleft().result():
+                        yield result
+
+        if chunk:
+            pending.append(self.submit(chunk))
+
+        while pending:
+            for result in pending.popleft().result():
+                yield result
+
+
+class _ChunkFuture(object):
+    """
+    Decodes the result of a _parse_chunk() future
+    """
+    def __init__(self, future):
+        self._future = future
+
+    def done(self):
+        return self._future.done()
+
+    def result(self, timeout=None):
+        return _load_chunk(self._future.result(timeout))
@@ -1,9 +1,8 @@
-import logging
 import re
-from aprslib import base91
 from aprslib.exceptions import ParseError
-from aprslib.parsing import logger
+from aprslib.parsing import trace
 from aprslib.parsing.common import parse_timestamp, parse_comment, parse_data_extentions
+from aprslib.parsing.common import STRICT, TRUSTED
 from aprslib.parsing.weather import parse_weather_data
 
 __all__ = [
@@ -12,15 +11,35 @@ __all__ = [
         'parse_normal',
         ]
 
-def parse_position(packet_type, body):
+def parse_position(packet_type, body, profile=None, mode=STRICT, decoder=None):
+    return _raise_invalid(_decode_position(packet_type, body, profile, mode, decoder))
+
+
+def _raise_invalid(result):
+    """
+    Raises ParseError for a (None, error) result of the _decode_* functions
+    """
+    if result[0] is None:
+        raise ParseError(result[1])
+
+    return result
+
+
+def _decode_position(packet_type, body, profile=None, mode=STRICT, decoder=None):
+    """
+    Like parse_position(), but returns (None, error) for malformed reports
+    instead of raising ParseError, which is much cheaper on a feed where
+    many of them are
+    """
     parsed = {}
 
-    if packet_type not in '!=/@;':
+    if packet_type not in '!=/@;)':
         _, body = body.split('!', 1)
         packet_type = '!'
 
     if packet_type == ';':
-        logger.debug("Attempting to parse object report format")
+        if trace.hook is not None:
+            trace.hook('format', 'object')
         match = re.findall(r"^([ -~]{9})(\*|_)", body)
         if match:
             name, flag = match[0]
@@ -31,66 +50,99 @@ def parse_position(packet_type, body):
 
             body = body[10:]
         else:
-            raise ParseError("invalid format")
+            return None, "invalid format"
+    elif packet_type == ')':
+        if trace.hook is not None:
+            trace.hook('format', 'item')
+        match = _item_re.match(body)
+        if match:
+            name, flag = match.groups()
+            parsed.update({
+                'item_name': name,
+                'alive': flag == '!',
+                })
+
+            body = body[match.end():]
+        else:
+            return None, "invalid format"
     else:
         parsed.update({"messagecapable": packet_type in '@='})
 
     # decode timestamp
     if packet_type in "/@;":
-        body, result = parse_timestamp(body, packet_type)
+        body, result = parse_timestamp(body, packet_type, decoder)
         parsed.update(result)
 
     if len(body) == 0 and 'timestamp' in parsed:
-        raise ParseError("invalid position report format")
+        return None, "invalid position report format"
 
     # decode body
-    body, result = parse_compressed(body)
-    parsed.update(result)
+    remaining, result = _decode_compressed(body)
 
-    if len(result) > 0:
-        logger.debug("Parsed as compressed position report")
-    else:
-        body, result = parse_normal(body)
-        parsed.update(result)
+    if remaining is None:
+        return None, result
 
-        if len(result) > 0:
-            logger.debug("Parsed as normal position report")
-        else:
-            raise ParseError("invalid format")
+    if len(result) == 0:
+        remaining, result = _decode_normal(body, mode)
+
+        if remaining is None:
+            return None, result
+        if len(result) == 0:
+            return None, "invalid format"
+
+    body = remaining
+    parsed.update(result)
     # check comment for weather information
     # Page 62 of the spec
     if parsed['symbol'] == '_':
-        # attempt to parse winddir/speed
-        # Page 92 of the spec
-        body, result = parse_data_extentions(body)
-        parsed.update(result)
+        if trace.hook is not None:
+            trace.hook('format', 'weather')
 
-        logger.debug("Attempting to parse weather report from comment")
-        body, result = parse_weather_data(body)
-        parsed.update({
-            'comment': body.strip(' '),
-            'weather': result,
-            })
+        if profile is None or profile.weather or profile.data_extensions:
+            # attempt to parse winddir/speed
+            # Page 92 of the spec
+            body, result = parse_data_extentions(body, profile)
+            parsed.update(result)
+
+        if profile is None or profile.weather:
+            body, result = parse_weather_data(body)
+            parsed.update({
+                'comment': body.strip(' '),
+                'weather': result,
+                })
     else:
         # decode comment
-        parse_comment(body, parsed)
+        parse_comment(body, parsed, profile)
 
-    if packet_type == ';':
+    if packet_type in ';)':
         parsed.update({
             'object_format': parsed['format'],
-            'format': 'object',
+            'format': 'object' if packet_type == ';' else 'item',
             })
 
     return ('', parsed)
 
+
+# item name of 3 to 9 characters, which can't contain '!' or '_',
+# followed by '!' (alive) or '_' (killed)
+_item_re = re.compile(r"([ \x22-\x5e\x60-~]{3,9})([!_])")
+
 def parse_compressed(body):
+    return _raise_invalid(_decode_compressed(body))
+
+
+def _decode_compressed(body):
+    """
+    Like parse_compressed(), but returns (None, error) for malformed positions
+    """
     parsed = {}
 
-    if re.match(r"^[\/\\A-Za-j][!-|]{8}[!-{}][ -|]{3}", body):
-        logger.debug("Attempting to parse as compressed position report")
+    if _compressed_re.match(body):
+        if trace.hook is not None:
+            trace.hook('format', 'compressed')
 
         if len(body) < 13:
-            raise ParseError("Invalid compressed packet (less than 13 characters)")
+            return None, "Invalid compressed packet (less than 13 characters)"
 
         parsed.update({'format': 'compressed'})
 
@@ -100,11 +152,12 @@ def parse_compressed(body):
         symbol_table = compressed[0]
         symbol = compressed[9]
 
-        try:
-            latitude = 90 - (base91.to_decimal(compressed[1:5]) / 380926.0)
-            longitude = -180 + (base91.to_decimal(compressed[5:9]) / 190463.0)
-        except ValueError:
-            raise ParseError("invalid characters in latitude/longitude encoding")
+        coordinates = _compressed_coordinates(compressed)
+
+        if coordinates is None:
+            return None, "invalid characters in latitude/longitude encoding"
+
+        latitude, longitude = coordinates
 
         # parse csT
 
@@ -117,12 +170,12 @@ def parse_compressed(body):
         if -1 in [c1, s1]:
             pass
         elif ctype & 0x18 == 0x10:
-            parsed.update({'altitude': (1.002 ** (c1 * 91 + s1)) * 0.3048})
+            parsed.update({'altitude': _compressed_altitude(c1 * 91 + s1)})
         elif c1 >= 0 and c1 <= 89:
             parsed.update({'course': 360 if c1 == 0 else c1 * 4})
-            parsed.update({'speed': (1.08 ** s1 - 1) * 1.852})  # mul = convert knts to kmh
+            parsed.update({'speed': COMPRESSED_SPEED[s1]})
         elif c1 == 90:
-            parsed.update({'radiorange': (2 * 1.08 ** s1) * 1.609344})  # mul = convert mph to kmh
+            parsed.update({'radiorange': COMPRESSED_RANGE[s1]})
 
         parsed.update({
             'symbol': symbol,
@@ -134,13 +187,67 @@ def parse_compressed(body):
     return (body, parsed)
 
 
-def parse_normal(body):
+def _compressed_coordinates(compressed):
+    """
+    Decodes the base91 latitude and longitude of a compressed position,
+    whose characters are already checked by _compressed_re.
+    Returns None when they contain '|', which is outside of base91
+    """
+    if '|' in compressed[1:9]:
+        return None
+
+    y1, y2, y3, y4, x1, x2, x3, x4 = [ord(x) - 33 for x in compressed[1:9]]
+
+    latitude = 90 - ((((y1 * 91 + y2) * 91 + y3) * 91 + y4) / 380926.0)
+    longitude = -180 + ((((x1 * 91 + x2) * 91 + x3) * 91 + x4) / 190463.0)
+
+    return latitude, longitude
+
+
+# compressed csT values, indexed by the base91 value of s
+# or c * 91 + s for altitude. '|' decodes to 91, one past the base91 range
+
+# speed, knots to km/h
+COMPRESSED_SPEED = [(1.08 ** s - 1) * 1.852 for s in range(92)]
+# radio range, miles to km
+COMPRESSED_RANGE = [(2 * 1.08 ** s) * 1.609344 for s in range(92)]
+# altitude, feet to meters. filled in on use, as most of it never is
+COMPRESSED_ALTITUDE = [None] * (91 * 91 + 92)
+
+
+def _compressed_altitude(cs):
+    altitude = COMPRESSED_ALTITUDE[cs]
+
+    if altitude is None:
+        altitude = COMPRESSED_ALTITUDE[cs] = (1.002 ** cs) * 0.3048
+
+    return altitude
+
+
+_compressed_re = re.compile(r"^[\/\\A-Za-j][!-|]{8}[!-{}][ -|]{3}")
+
+_normal_pattern = (r"^(\d{2})([0-9 ]{2}\.[0-9 ]{2})([NnSs])([\/\\0-9A-Z])"
+                   r"(\d{3})([0-9 ]{2}\.[0-9 ]{2})([EeWw])([\x21-\x7e])")
+_normal_re = re.compile(_normal_pattern + r"(.*)$")
+_normal_position_re = re.compile(_normal_pattern)
+
+
+def parse_normal(body, mode=STRICT):
+    return _raise_invalid(_decode_normal(body, mode))
+
+
+def _decode_normal(body, mode=STRICT):
+    """
+    Like parse_normal(), but returns (None, error) for invalid coordinates
+    """
     parsed = {}
 
-    match = re.findall(r"^(\d{2})([0-9 ]{2}\.[0-9 ]{2})([NnSs])([\/\\0-9A-Z])"
-                       r"(\d{3})([0-9 ]{2}\.[0-9 ]{2})([EeWw])([\x21-\x7e])(.*)$", body)
+    match = _normal_re.match(body)
 
     if match:
+        if trace.hook is not None:
+            trace.hook('format', 'uncompressed')
+
         parsed.update({'format': 'uncompressed'})
 
         (
@@ -153,50 +260,16 @@ def parse_normal(body):
             lon_dir,
             symbol,
             body
-        ) = match[0]
+        ) = match.groups()
 
-        # position ambiguity
-        posambiguity = lat_min.count(' ')
+        posambiguity, latitude, longitude = _normal_coordinates(
+            lat_deg, lat_min, lat_dir, lon_deg, lon_min, lon_dir, mode)
 
-        if posambiguity != lon_min.count(' '):
-            raise ParseError("latitude and longitude ambiguity mismatch")
-
-        parsed.update({'posambiguity': posambiguity})
-
-        # we center the position inside the ambiguity box
-        if posambiguity >= 4:
-            lat_min = "30"
-            lon_min = "30"
-        else:
-            lat_min = lat_min.replace(' ', '5', 1)
-            lon_min = lon_min.replace(' ', '5', 1)
-
-        # validate longitude and latitude
-
-        if int(lat_deg) > 89 or int(lat_deg) < 0:
-            raise ParseError("latitude is out of range (0-90 degrees)")
-        if int(lon_deg) > 179 or int(lon_deg) < 0:
-            raise ParseError("longitude is out of range (0-180 degrees)")
-        """
-        f float(lat_min) >= 60:
-            raise ParseError("latitude minutes are out of range (0-60)")
-        if float(lon_min) >= 60:
-            raise ParseError("longitude minutes are out of range (0-60)")
-
-        The above is commented out intentionally
-        apparently aprs.fi doesn't bound check minutes
-        and there are actual packets that have >60min
-        i don't even know why that's the case
-        """
-
-        # convert coordinates from DDMM.MM to decimal
-        latitude = int(lat_deg) + (float(lat_min) / 60.0)
-        longitude = int(lon_deg) + (float(lon_min) / 60.0)
-
-        latitude *= -1 if lat_dir in 'Ss' else 1
-        longitude *= -1 if lon_dir in 'Ww' else 1
+        if posambiguity is None:
+            return None, latitude
 
         parsed.update({
+            'posambiguity': posambiguity,
             'symbol': symbol,
             'symbol_table': symbol_table,
             'latitude': latitude,
@@ -206,3 +279,52 @@ def parse_normal(body):
     return (body, parsed)
 
 
+def _normal_coordinates(lat_deg, lat_min, lat_dir, lon_deg, lon_min, lon_dir, mode=STRICT):
+    """
+    Converts the DDMM.MM fields of an uncompressed position
+    Returns (posambiguity, latitude, longitude), or (None, error, None)
+    when they are out of range
+    """
+    # position ambiguity
+    posambiguity = lat_min.count(' ')
+
+    if mode != TRUSTED and posambiguity != lon_min.count(' '):
+        return None, "latitude and longitude ambiguity mismatch", None
+
+    # we center the position inside the ambiguity box
+    if posambiguity >= 4:
+        lat_min = "30"
+        lon_min = "30"
+    else:
+        lat_min = lat_min.replace(' ', '5', 1)
+        lon_min = lon_min.replace(' ', '5', 1)
+
+    lat_deg = int(lat_deg)
+    lon_deg = int(lon_deg)
+
+    # validate longitude and latitude
+    if mode != TRUSTED:
+        if lat_deg > 89 or lat_deg < 0:
+            return None, "latitude is out of range (0-90 degrees)", None
+        if lon_deg > 179 or lon_deg < 0:
+            return None, "longitude is out of range (0-180 degrees)", None
+    """
+    f float(lat_min) >= 60:
+        raise ParseError("latitude minutes are out of range (0-60)")
+    if float(lon_min) >= 60:
+        raise ParseError("longitude minutes are out of range (0-60)")
+
+    The above is commented out intentionally
+    apparently aprs.fi doesn't bound check minutes
+    and there are actual packets that have >60min
+    i don't even know why that's the case
+    """
+
+    # convert coordinates from DDMM.MM to decimal
+    latitude = lat_deg + (float(lat_min) / 60.0)
+    longitude = lon_deg + (float(lon_min) / 60.0)
+
+    latitude *= -1 if lat_dir in 'Ss' else 1
+    longitude *= -1 if lon_dir in 'Ww' else 1
+
+    return posambiguity, latitude, longitude
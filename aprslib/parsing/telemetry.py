@@ -1,10 +1,11 @@
 import re
 from aprslib import base91
 from aprslib.exceptions import ParseError
-from aprslib.parsing import logger
+from aprslib.parsing import trace
 
 __all__ = [
         'parse_comment_telemetry',
+        'parse_telemetry_report',
         'parse_telemetry_config',
         ]
 
@@ -15,29 +16,156 @@ def parse_comment_telemetry(text):
     Returns [remaining_text, telemetry]
     """
     parsed = {}
-    match = re.findall(r"^(.*?)\|([!-{]{4,14})\|(.*)$", text)
+    line = _split_line(text)
+    span = _find_comment_telemetry(line) if line is not None else None
 
-    if match and len(match[0][1]) % 2 == 0:
-        text, telemetry, post = match[0]
-        text += post
+    if span and (span[1] - span[0]) % 2 == 0:
+        start, end = span
+        text = line[:start] + line[end:]
 
-        temp = [0] * 7
-        for i in range(7):
-            temp[i] = base91.to_decimal(telemetry[i*2:i*2+2])
+        parsed.update(_decode_comment_telemetry(line[start+1:end-1]))
 
-        parsed.update({
-            'telemetry': {
-                'seq': temp[0],
-                'vals': temp[1:6]
-                }
+    return (text, parsed)
+
+
+_base91_chars = "".join(chr(i) for i in range(0x21, 0x7c))
+
+
+def _split_line(text):
+    """
+    Mimics the trailing (.*)$ of a regex: returns text without a single
+    trailing newline, or None when there is a newline before that
+    """
+    if text[-1:] == '\n':
+        text = text[:-1]
+
+    return None if '\n' in text else text
+
+
+def _find_comment_telemetry(text):
+    """
+    Returns the (start, end) span of the first pair of consecutive '|'
+    with 4 to 14 base91 characters in between, or None
+
+    Each character is looked at once, so this stays linear on comments
+    full of '|' where ^(.*?)\\|([!-{]{4,14})\\|(.*)$ would backtrack.
+    """
+    start = text.find('|')
+
+    while start > -1:
+        end = text.find('|', start + 1)
+
+        if end == -1:
+            break
+        if 4 <= end - start - 1 <= 14 and not text[start+1:end].strip(_base91_chars):
+            return (start, end + 1)
+
+        start = end
+
+    return None
+
+
+def _decode_comment_telemetry(telemetry):
+    """
+    Decodes the base91 characters found between the '|' markers
+    """
+    temp = [0] * 7
+    for i in range(7):
+        temp[i] = base91.to_decimal(telemetry[i*2:i*2+2])
+
+    parsed = {
+        'telemetry': {
+            'seq': temp[0],
+            'vals': temp[1:6]
+            }
+        }
+
+    if temp[6] != '':
+        parsed['telemetry'].update({
+            'bits': "{0:08b}".format(temp[6] & 0xFF)[::-1]
             })
 
-        if temp[6] != '':
-            parsed['telemetry'].update({
-                'bits': "{0:08b}".format(temp[6] & 0xFF)[::-1]
-                })
+    return parsed
 
-    return (text, parsed)
+
+# TELEMETRY REPORT
+#
+# T#sss,111,222,333,444,555,xxxxxxxx
+# T#MIC111,222,333,444,555,xxxxxxxx
+# T#MIC,111,222,333,444,555,xxxxxxxx
+def parse_telemetry_report(body):
+    """
+    Parses the body of a T# telemetry report, after the 'T'
+    Returns ('', parsed), with the values in parsed['telemetry'] as
+    parse_comment_telemetry() has them. The sequence is 'MIC' for
+    mic-e telemetry. Analog values can have decimals and a sign, as
+    sent by many trackers. The bits are optional, but when present they
+    are exactly 8 binary digits, which a comment can follow
+    """
+    if body[:1] != '#':
+        raise ParseError("invalid telemetry report format")
+
+    if body[1:4] == 'MIC':
+        seq = 'MIC'
+        body = body[5:] if body[4:5] == ',' else body[4:]
+    else:
+        seq, _, body = body[1:].partition(',')
+
+        if not _is_digits(seq):
+            raise ParseError("invalid telemetry sequence number")
+
+        seq = int(seq)
+
+    fields = body.split(',', 5)
+
+    # a report missing a channel has the bits as its fifth value
+    if len(fields) < 5 or len(fields) == 5 and _is_bits(fields[4]):
+        raise ParseError("telemetry report needs 5 analog values")
+
+    telemetry = {
+        'seq': seq,
+        'vals': [_telemetry_value(val) for val in fields[:5]],
+        }
+    parsed = {
+        'format': 'telemetry',
+        'telemetry': telemetry,
+        }
+
+    rest = fields[5] if len(fields) == 6 else ''
+
+    if rest:
+        if not _is_bits(rest[:8]) or rest[8:9] in ('0', '1'):
+            raise ParseError("invalid telemetry bits %r" % rest)
+
+        telemetry['bits'] = rest[:8]
+        comment = rest[8:].strip(' ')
+
+        if comment:
+            parsed['comment'] = comment
+
+    return ('', parsed)
+
+
+def _is_digits(text):
+    return text != '' and not text.strip('0123456789')
+
+
+def _is_bits(text):
+    return len(text) == 8 and not text.strip('01')
+
+
+def _telemetry_value(text):
+    digits = text[1:] if text[:1] == '-' else text
+
+    if _is_digits(digits):
+        return int(text)
+
+    whole, dot, fraction = digits.partition('.')
+
+    if dot and _is_digits(whole + fraction):
+        return float(text)
+
+    raise ParseError("invalid telemetry value %r" % text)
 
 
 def parse_telemetry_config(body):
@@ -45,7 +173,8 @@ def parse_telemetry_config(body):
 
     match = re.findall(r"^(PARM|UNIT|EQNS|BITS)\.(.*)$", body)
     if match:
-        logger.debug("Attempting to parse telemetry-message packet")
+        if trace.hook is not None:
+            trace.hook('format', 'telemetry-message')
         form, body = match[0]
 
         parsed.update({'format': 'telemetry-message'})
@@ -1,5 +1,4 @@
 import re
-from aprslib.parsing.__init__ import parse
 from aprslib.exceptions import UnknownFormat
 from aprslib.exceptions import ParseError
 
@@ -7,12 +6,17 @@ __all__ = [
         'parse_thirdparty',
         ]
 
-def parse_thirdparty(body):
+def parse_thirdparty(body, parser=None):
     parsed = {'format':'thirdparty'}
 
-    # Parse sub-packet
+    if parser is None:
+        # imported here, as aprslib.parsing imports this module while initializing
+        from aprslib.parsing import thread_parser
+        parser = thread_parser()
+
+    # Parse sub-packet, with the same parser as the outer packet
     try:
-        subpacket = parse(body)
+        subpacket = parser.parse(body)
     except (UnknownFormat,ParseError) as ukf:
         raise
 
@@ -0,0 +1,72 @@
+"""
+Tracing hooks for the parser
+
+The parsers report their progress as ``hook(stage, detail)`` calls:
+
+- ``packet`` with the packet text, before parsing starts
+- ``format`` with the name of the format parser that is tried
+- ``parsed`` with the resulting dict
+
+Nothing is called, or formatted, while no hook is installed. To get the
+old debug log output:
+
+    aprslib.parsing.trace.add_hook(aprslib.parsing.trace.log_hook)
+"""
+import logging
+
+__all__ = [
+    'add_hook',
+    'remove_hook',
+    'log_hook',
+    ]
+
+logger = logging.getLogger('aprslib.parsing')
+
+_hooks = ()
+
+# the installed hooks as a single callable, None while there are none.
+# call sites check it first: if trace.hook is not None: trace.hook(...)
+hook = None
+
+
+def add_hook(func):
+    """
+    Installs func to be called as func(stage, detail)
+    """
+    global _hooks
+
+    if func not in _hooks:
+        _hooks += (func, )
+        _resolve()
+
+
+def remove_hook(func):
+    """
+    Removes a hook installed with add_hook(), if present
+    """
+    global _hooks
+
+    _hooks = tuple(x for x in _hooks if x != func)
+    _resolve()
+
+
+def _resolve():
+    global hook
+
+    hooks = _hooks
+
+    if len(hooks) > 1:
+        def call_all(stage, detail):
+            for func in hooks:
+                func(stage, detail)
+
+        hook = call_all
+    else:
+        hook = hooks[0] if hooks else None
+
+
+def log_hook(stage, detail):
+    """
+    Writes the trace to the aprslib.parsing logger at debug level
+    """
+    logger.debug("%s: %s", stage, detail)
@@ -1,4 +1,3 @@
-import re
 from aprslib.exceptions import ParseError
 
 __all__ = [
@@ -25,55 +24,108 @@ key_map = {
     's': 'snow',
     '#': 'rain_raw',
 }
-val_map = {
-    'g': lambda x: int(x) * wind_multiplier,
-    'c': lambda x: int(x),
-    'S': lambda x: int(x) * wind_multiplier,
-    't': lambda x: (float(x) - 32) / 1.8,
-    'r': lambda x: int(x) * rain_multiplier,
-    'p': lambda x: int(x) * rain_multiplier,
-    'P': lambda x: int(x) * rain_multiplier,
-    'h': lambda x: 100 if int(x) == 0 else int(x),
-    'b': lambda x: float(x) / 10,
-    'l': lambda x: int(x) + 1000,
-    'L': lambda x: int(x),
-    's': lambda x: float(x) * 25.4,
-    '#': lambda x: int(x),
-}
+
+_digits = "0123456789"
+
+# weather fields: width of the value, and characters allowed in it
+_field_format = dict([(key, (3, _digits + '-. ')) for key in 'cSgtrpPlLs#']
+                     + [('h', (2, _digits + '. ')), ('b', (5, _digits + '. '))])
+
+
+def _is_digits(text):
+    return bool(text) and not text.strip(_digits)
+
 
 def parse_weather_data(body):
+    """
+    Decodes weather fields from the start of body in a single pass
+
+    Returns (remaining_text, weather) with all values in metric units
+    """
     parsed = {}
+    pos = 0
+    length = len(body)
+
+    # the first 's' is the wind speed, it's snow after that
+    wind_speed = False
 
-    # parse weather data
-    body = re.sub(r"^([0-9]{3})/([0-9]{3})", "c\\1s\\2", body)
-    body = body.replace('s', 'S', 1)
+    # wind direction and speed: 111/222
+    if len(body) >= 7 and body[3] == '/' and _is_digits(body[0:3]) and _is_digits(body[4:7]):
+        parsed['wind_direction'] = int(body[0:3])
+        parsed['wind_speed'] = int(body[4:7]) * wind_multiplier
+        wind_speed = True
+        pos = 7
 
     # match as many parameters from the start, rest is comment
-    data = re.match(r"^([cSgtrpPlLs#][0-9\-\. ]{3}|h[0-9\. ]{2}|b[0-9\. ]{5})+", body)
-
-    if data:
-        data = data.group()
-        # split out data from comment
-        body = body[len(data):]
-        # parse all weather parameters
-        data = re.findall(r"([cSgtrpPlLs#]\d{3}|t-\d{2}|h\d{2}|b\d{5}|s\.\d{2}|s\d\.\d)", data)
-        data = map(lambda x: (key_map[x[0]] , val_map[x[0]](x[1:])), data)
-        parsed.update(dict(data))
-
-    return (body, parsed)
-
-def parse_weather(body):
-    match = re.match(r"^(\d{8})c[\. \d]{3}s[\. \d]{3}g[\. \d]{3}t[\. \d]{3}", body)
-    if not match:
-        raise ParseError("invalid positionless weather report format")
+    while pos < length:
+        key = body[pos]
+
+        try:
+            width, allowed = _field_format[key]
+        except KeyError:
+            break
+
+        value = body[pos + 1:pos + 1 + width]
 
-    comment, weather = parse_weather_data(body[8:])
+        if len(value) != width or value.strip(allowed):
+            break
+
+        pos += 1 + width
+
+        if key == 's' and not wind_speed:
+            key = 'S'
+            wind_speed = True
+
+        # fields with missing or malformed values are skipped
+        if _is_digits(value):
+            pass
+        elif key == 't' and value[0] == '-' and _is_digits(value[1:]):
+            pass
+        elif key == 's' and (value[0] == '.' and _is_digits(value[1:])
+                             or value[1] == '.' and _is_digits(value[0] + value[2])):
+            pass
+        else:
+            continue
+
+        if key in 'gS':
+            value = int(value) * wind_multiplier
+        elif key in 'rpP':
+            value = int(value) * rain_multiplier
+        elif key == 't':
+            value = (float(value) - 32) / 1.8
+        elif key == 'h':
+            value = int(value) or 100
+        elif key == 'b':
+            value = float(value) / 10
+        elif key == 'l':
+            value = int(value) + 1000
+        elif key == 's':
+            value = float(value) * 25.4
+        else:
+            value = int(value)
+
+        parsed[key_map[key]] = value
+
+    return (body[pos:], parsed)
+
+
+def parse_weather(body, profile=None):
+    # positionless weather starts with MDHM timestamp and c...s...g...t...
+    if (len(body) < 24 or not _is_digits(body[0:8])
+       or body[8] != 'c' or body[12] != 's' or body[16] != 'g' or body[20] != 't'
+       or any(body[i:i+3].strip('. ' + _digits) for i in (9, 13, 17, 21))):
+        raise ParseError("invalid positionless weather report format")
 
     parsed = {
         'format': 'wx',
-        'wx_raw_timestamp': match.group(1),
-        'comment': comment.strip(' '),
-        'weather': weather,
+        'wx_raw_timestamp': body[0:8],
         }
 
+    if profile is None or profile.weather:
+        comment, weather = parse_weather_data(body[8:])
+        parsed.update({
+            'comment': comment.strip(' '),
+            'weather': weather,
+            })
+
     return ('', parsed)
@@ -0,0 +1,45 @@
+"""
+Small bounded caches used by the parser
+"""
+from collections import OrderedDict
+
+__all__ = ['LRUCache']
+
+
+class LRUCache(object):
+    """
+    Bounded mapping that evicts the least recently used key once it holds
+    more than ``maxsize`` items
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            return default
+
+        self._data[key] = value
+        return value
+
+    def set(self, key, value):
+        data = self._data
+        data.pop(key, None)
+        data[key] = value
+
+        while len(data) > self.maxsize:
+            data.popitem(last=False)
+
+    def discard(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
@@ -0,0 +1,84 @@
+"""
+Times parse() on packets crafted to trigger worst-case behaviour, padded
+to the maximum packet length, and fails when any of them exceeds a budget
+
+    PYTHONPATH=. python benchmarks/bench_adversarial.py [budget in us] [length]
+
+With a length above MAX_PACKET_LENGTH the limit is lifted, which shows how
+each input scales past it.
+"""
+import sys
+import timeit
+
+from corpus import PACKETS
+import aprslib.parsing
+from aprslib import try_parse
+
+HEADER = "N0CALL>APRS,TCPIP*,qAC,T2TEST:"
+
+
+def pad(prefix, filler, suffix, length):
+    """
+    Repeats filler between prefix and suffix to get a packet of about length
+    """
+    count = max(0, (length - len(prefix) - len(suffix)) // len(filler))
+    return prefix + filler * count + suffix
+
+
+def adversarial(length=512):
+    """
+    Returns (label, packet) pairs aimed at the comment, mic-e, message,
+    weather, header and third-party parsers
+    """
+    # a compressed position, as the uncompressed one rejects line breaks
+    position = HEADER + "!/.(M4I^C,O `D"
+    mice = "VE3XYZ-9>TQ4W2V,WIDE1-1,qAR,VE3ABC:`c51!f?>/"
+
+    return [
+        ("dao markers", pad(position, "!a  ", "\nx", length)),
+        ("telemetry markers", pad(position, "|!!!!", "\nx", length)),
+        ("bare pipes", pad(position, "|", "\nx", length)),
+        ("altitudes", pad(position, "/A=000000", "\nx", length)),
+        ("broken altitudes", pad(position, "/A=", "", length)),
+        ("data extensions", pad(position, "PHG5132", "", length)),
+        ("mic-e altitudes", pad(mice, "}", "\nx", length)),
+        ("mic-e base91", pad(mice, "!!!}", "\nx", length)),
+        ("message ids", pad(HEADER + ":N0CALL   :", "{", "", length)),
+        ("message acks", pad(HEADER + ":N0CALL   :ack", "a", "", length)),
+        ("weather", pad(HEADER + "_10090556c220s004g005t077", "c...", "", length)),
+        ("weather digits", pad(HEADER + "_10090556c220s004g005t077", "g000", "", length)),
+        ("long path", pad("N0CALL>APRS", ",WIDE1-1", ":>status", length)),
+        ("third-party", pad(HEADER, "}N0CALL>APRS,TCPIP,N0CALL*:", ">status", length)),
+        ("status", pad(HEADER + ">", "x", "", length)),
+    ]
+
+
+def measure(packet, number=50):
+    return min(timeit.repeat(lambda: try_parse(packet), number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 500.0
+    length = int(sys.argv[2]) if len(sys.argv) > 2 else aprslib.parsing.MAX_PACKET_LENGTH
+
+    if length > aprslib.parsing.MAX_PACKET_LENGTH:
+        aprslib.parsing.MAX_PACKET_LENGTH = None
+
+    typical = max(measure(packet) for packet in PACKETS)
+    print("%-20s %8.1f us  (slowest regular packet)" % ("reference", typical))
+
+    failed = 0
+    for label, packet in adversarial(length):
+        elapsed = measure(packet)
+        over = elapsed > budget
+        failed += over
+
+        print("%-20s %8.1f us  %4d chars  %s" % (label, elapsed, len(packet), "OVER BUDGET" if over else "ok"))
+
+    if failed:
+        print("%d of the inputs took longer than %.0f us" % (failed, budget))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Measures base91 encoding and decoding against the reference
+implementations, for the 2 and 4 character widths used by telemetry and
+compressed positions
+
+    PYTHONPATH=. python benchmarks/bench_base91.py [values]
+"""
+import random
+import sys
+import timeit
+
+from aprslib import base91
+
+
+def best(func, number=7):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rnd = random.Random(47)
+    results = []
+
+    for width in (2, 4):
+        numbers = [rnd.randrange(91 ** width) for _ in range(size)]
+        texts = [base91.from_decimal(number, width) for number in numbers]
+
+        for label, to_decimal, from_decimal in (
+                ("reference", base91.to_decimal_reference, base91.from_decimal_reference),
+                ("fast", base91.to_decimal, base91.from_decimal),
+                ):
+            results.append(("to_decimal %d %s" % (width, label),
+                            best(lambda: [to_decimal(text) for text in texts])))
+            results.append(("from_decimal %d %s" % (width, label),
+                            best(lambda: [from_decimal(number, width) for number in numbers])))
+
+    for label, elapsed in results:
+        print("%-26s %8d calls  %.3fs  %.2f us/call" % (label, size, elapsed, elapsed / size * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Measures compressed position and PHG decoding, on packets with varied
+course/speed, altitude and radio range values
+
+    PYTHONPATH=. python benchmarks/bench_compressed.py [packets]
+"""
+import random
+import sys
+import timeit
+
+from aprslib import try_parse
+from aprslib.parsing import parse_compressed
+from aprslib.parsing.common import _phg_details
+
+
+def compressed_bodies(size):
+    rnd = random.Random(41)
+    bodies = []
+
+    for _ in range(size):
+        cs = chr(33 + rnd.randrange(91)) + chr(33 + rnd.randrange(91))
+        ctype = rnd.choice("!#+3")
+        bodies.append("/5L!!<*e7>" + cs + ctype + "comment")
+
+    return bodies
+
+
+def phg_values(size):
+    rnd = random.Random(41)
+    return ["%d%s%d%d" % (rnd.randrange(10), chr(0x30 + rnd.randrange(10)),
+                          rnd.randrange(10), rnd.randrange(10)) for _ in range(size)]
+
+
+def best(func, number=7):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    bodies = compressed_bodies(size)
+    phgs = phg_values(size)
+    packets = ["N0CALL>APRS,TCPIP*,qAC,T2TEST:!" + body for body in bodies]
+    packets += ["N0CALL>APRS,TCPIP*,qAC,T2TEST:=4903.50N/07201.75W>PHG" + phg for phg in phgs]
+
+    results = (
+        ("parse_compressed", best(lambda: [parse_compressed(body) for body in bodies]), len(bodies)),
+        ("_phg_details", best(lambda: [_phg_details(phg) for phg in phgs]), len(phgs)),
+        ("try_parse", best(lambda: [try_parse(packet) for packet in packets]), len(packets)),
+        )
+
+    for label, elapsed, count in results:
+        print("%-18s %8d calls  %.3fs  %.2f us/call" % (label, count, elapsed, elapsed / count * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Counts ``chardet.detect`` calls made while decoding a capture, with and
+without the per-source encoding cache
+
+    PYTHONPATH=. python benchmarks/bench_encoding.py [packets]
+"""
+import sys
+import timeit
+
+from corpus import capture
+from aprslib import parsing
+
+
+class CountingDetector(object):
+    def __init__(self, detector):
+        self.detector = detector
+        self.calls = 0
+
+    def detect(self, data):
+        self.calls += 1
+        return self.detector.detect(data)
+
+
+def run(packets, cache_size):
+    parsing.encoding_cache.clear()
+    parsing.encoding_cache.maxsize = cache_size
+
+    detector = CountingDetector(parsing.chardet)
+    parsing.chardet = detector
+    try:
+        elapsed = timeit.timeit(lambda: [parsing._unicode_packet(p) for p in packets], number=1)
+    finally:
+        parsing.chardet = detector.detector
+
+    return detector.calls, elapsed
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    packets = capture(size)
+    maxsize = parsing.encoding_cache.maxsize
+
+    for label, cache_size in (("no cache", 0), ("cache", maxsize)):
+        calls, elapsed = run(packets, cache_size)
+        print("%-10s %8d packets  %6d chardet calls  %.3fs" % (label, len(packets), calls, elapsed))
+
+    parsing.encoding_cache.maxsize = maxsize
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Compares parse() returning every field with parse() limited to a
+FieldProfile, per packet format
+
+    PYTHONPATH=. python benchmarks/bench_fields.py [repeat]
+"""
+import sys
+import timeit
+
+from aprslib import parse, FieldProfile
+
+PACKETS = [
+    ("uncompressed + PHG + DAO",
+     "N0CALL>APRS,WIDE1-1,qAR,IGATE:!4903.50N/07201.75W#PHG5132/A=001234 digi !W12!"),
+    ("compressed + /A= + telemetry",
+     "M0XER-4>APRS64,TF3RPF,WIDE2*,qAR,TF3SUT-2:!/.(M4I^C,O `DXa/A=040849|#B>@\"v90!+|"),
+    ("mic-e",
+     "VE3XYZ-9>TQ4W2V,WIDE1-1,qAR,VE3ABC:`c51!f?>/]\"4W}Moving along="),
+    ("position weather",
+     "CW1234>APRS,TCPXX*,qAX,CWOP-1:@092345z4903.50N/07201.75W_225/000g000t050r000p001P000h00b10138L123"),
+    ("positionless weather",
+     "WX1ABC>APRS,WIDE2-1,qAR,WX1DEF:_10090556c220s004g005t077r010p020P030h50b09900"),
+]
+
+PROFILE = FieldProfile(['from', 'latitude', 'longitude'])
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    for label, packet in PACKETS:
+        full = min(timeit.repeat(lambda: parse(packet), number=number, repeat=7))
+        fields = min(timeit.repeat(lambda: parse(packet, fields=PROFILE), number=number, repeat=7))
+
+        print("%-30s all fields %5.1f us   from/latitude/longitude %5.1f us" % (
+            label, full / number * 1e6, fields / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
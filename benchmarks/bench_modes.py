@@ -0,0 +1,36 @@
+"""
+Compares parse() throughput in the strict, lenient and trusted modes
+
+    PYTHONPATH=. python benchmarks/bench_modes.py [packets]
+"""
+import sys
+import timeit
+
+from corpus import capture
+from aprslib import try_parse
+from aprslib.parsing import MODES
+
+
+def run(packets, mode):
+    for packet in packets:
+        try_parse(packet, mode=mode)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    packets = capture(size)
+    best = dict((mode, None) for mode in MODES)
+
+    # alternate the runs, so all modes see the same machine conditions
+    for _ in range(7):
+        for mode in MODES:
+            elapsed = timeit.timeit(lambda: run(packets, mode), number=1)
+            best[mode] = elapsed if best[mode] is None else min(best[mode], elapsed)
+
+    for mode in MODES:
+        print("%-8s %8d packets  %.3fs  %.1f us/packet  %6.0f packets/s" % (
+            mode, len(packets), best[mode], best[mode] / len(packets) * 1e6, len(packets) / best[mode]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Measures building aprslib.packets objects from parse() results, the
+memory they take, and serializing them
+
+    PYTHONPATH=. python benchmarks/bench_packets.py [packets]
+"""
+import gc
+import sys
+import timeit
+import tracemalloc
+
+from aprslib import parse
+from aprslib.packets import PositionReport, TelemetryReport
+
+
+def best(func, number=5):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+def memory(func):
+    """
+    Returns the bytes allocated by func() and still held by its result
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+
+    return size
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    parsed = parse("N0CALL>APRS,WIDE1-1,qAR,T2TEST:/092345z4903.50N/07201.75W>comment /A=001234")
+    telemetry = parse("N0CALL>APRS:T#005,199,000,255,073,123,01101001")
+    rows = range(size)
+    packets = [PositionReport.from_parsed(parsed) for _ in rows]
+
+    results = (
+        ("PositionReport(parsed)", lambda: [PositionReport(parsed) for _ in rows]),
+        ("PositionReport.from_parsed", lambda: [PositionReport.from_parsed(parsed) for _ in rows]),
+        ("TelemetryReport.from_parsed", lambda: [TelemetryReport.from_parsed(telemetry) for _ in rows]),
+        ("PositionReport()", lambda: [PositionReport() for _ in rows]),
+        ("serialize", lambda: [packet._serialize_header() + packet._serialize_body() for packet in packets]),
+        ("str(), cached", lambda: [str(packet) for packet in packets]),
+        ("to_bytes(), cached", lambda: [packet.to_bytes() for packet in packets]),
+        ("hash()", lambda: [hash(packet) for packet in packets]),
+        )
+
+    for label, func in results:
+        elapsed = best(func)
+        print("%-28s %8d packets  %.3fs  %.2f us/packet  %4d bytes/packet" % (
+            label, size, elapsed, elapsed / size * 1e6, memory(func) // size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Compares parse() with the cheap classify() and peek_position() on raw lines
+
+    PYTHONPATH=. python benchmarks/bench_peek.py [packets]
+"""
+import sys
+import timeit
+
+from corpus import capture
+from aprslib import try_parse
+from aprslib.parsing import classify, peek_position
+
+
+def run(func, packets):
+    for packet in packets:
+        func(packet)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    packets = capture(size)
+
+    funcs = (("try_parse", try_parse), ("classify", classify), ("peek_position", peek_position))
+    best = dict((label, None) for label, _ in funcs)
+
+    # alternate the runs, so all see the same machine conditions
+    for _ in range(7):
+        for label, func in funcs:
+            elapsed = timeit.timeit(lambda: run(func, packets), number=1)
+            best[label] = elapsed if best[label] is None else min(best[label], elapsed)
+
+    for label, func in funcs:
+        print("%-14s %8d packets  %.3fs  %5.1f us/packet  %5.1fx" % (
+            label, len(packets), best[label], best[label] / len(packets) * 1e6,
+            best['try_parse'] / best[label]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Compares ParsePool backends with parsing in the calling thread
+
+Also reports the cost of moving the results of a chunk between workers,
+as marshal bytes (what the process and interpreter backends send) and as
+pickled dicts.
+
+    PYTHONPATH=. python benchmarks/bench_pool.py [packets] [workers]
+"""
+import marshal
+import os
+import pickle
+import sys
+import timeit
+
+from corpus import mixed_capture
+from aprslib import try_parse
+from aprslib.parsing import ParsePool
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    packets = mixed_capture(size)
+
+    print("%d packets, %d workers" % (len(packets), workers))
+
+    elapsed = min(timeit.repeat(lambda: [try_parse(packet) for packet in packets], number=1, repeat=3))
+    print("%-12s %.3fs  %8.0f packets/s" % ("serial", elapsed, len(packets) / elapsed))
+
+    for backend in ('thread', 'process', 'interpreter'):
+        try:
+            pool = ParsePool(backend, workers=workers)
+        except RuntimeError as exp:
+            print("%-12s skipped, %s" % (backend, exp))
+            continue
+
+        with pool:
+            list(pool.map(packets[:1000]))  # start the workers
+            elapsed = min(timeit.repeat(lambda: list(pool.map(packets)), number=1, repeat=3))
+
+        print("%-12s %.3fs  %8.0f packets/s" % (backend, elapsed, len(packets) / elapsed))
+
+    chunk = [(parsed, None if code is None else int(code))
+             for parsed, code in (try_parse(packet) for packet in packets[:256])]
+
+    for label, dumps, loads in (("marshal", marshal.dumps, marshal.loads),
+                                ("pickle", lambda x: pickle.dumps(x, pickle.HIGHEST_PROTOCOL), pickle.loads)):
+        data = dumps(chunk)
+        elapsed = min(timeit.repeat(lambda: loads(dumps(chunk)), number=100, repeat=5)) / 100
+        print("%-12s %6d bytes per 256 packets  %.1f us round trip" % (label, len(data), elapsed * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Measures rendering fleet position reports with PacketTemplate, against
+building and serializing a PositionReport for each
+
+    PYTHONPATH=. python benchmarks/bench_template.py [vehicles]
+"""
+import random
+import sys
+import timeit
+
+from aprslib.packets import PositionReport, PacketTemplate, render_batch
+
+
+def best(func, number=5):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rnd = random.Random(50)
+    now = 1700000000
+    calls = ["N%dCALL-9" % i for i in range(size)]
+    fixes = [(rnd.uniform(-90, 90), rnd.uniform(-180, 180), now + rnd.randrange(600)) for _ in range(size)]
+    templates = [PacketTemplate(call, 'APRS', ['WIDE1-1'], '/', '>', "fleet vehicle") for call in calls]
+    rows = [(template,) + fix for template, fix in zip(templates, fixes)]
+
+    def position_reports():
+        lines = []
+
+        for call, (latitude, longitude, timestamp) in zip(calls, fixes):
+            packet = PositionReport()
+            packet.fromcall = call
+            packet.tocall = 'APRS'
+            packet.path = ['WIDE1-1']
+            packet.symbol = '>'
+            packet.comment = "fleet vehicle"
+            packet.latitude = latitude
+            packet.longitude = longitude
+            packet.timestamp = timestamp
+            lines.append(packet.to_bytes() + b"\r\n")
+
+        return lines
+
+    results = (
+        ("PositionReport", best(position_reports)),
+        ("PacketTemplate.render", best(lambda: [template.render(*fix) for template, fix in zip(templates, fixes)])),
+        ("render_batch", best(lambda: render_batch(rows))),
+        ("render, new comment", best(lambda: [template.render(*fix + ("moving",))
+                                              for template, fix in zip(templates, fixes)])),
+        )
+
+    for label, elapsed in results:
+        print("%-22s %8d reports  %.3fs  %.2f us/report" % (label, size, elapsed, elapsed / size * 1e6))
+
+
+if __name__ == '__main__':
+    main()
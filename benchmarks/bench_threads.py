@@ -0,0 +1,74 @@
+"""
+Measures parse() throughput with 1 to N threads
+
+Scaling is only expected on free-threaded builds (python3.13t and later).
+With the GIL the threads take turns, and throughput stays flat.
+
+    PYTHONPATH=. python benchmarks/bench_threads.py [packets per thread] [max threads]
+"""
+import os
+import sys
+import threading
+import time
+
+from corpus import capture
+from aprslib import try_parse
+
+
+def worker(packets, barrier, results):
+    # each thread parses its own copy, so that it doesn't contend with the
+    # others for the reference counts of the packet objects
+    packets = [bytes(bytearray(packet)) for packet in packets]
+    barrier.wait()
+
+    for packet in packets:
+        try_parse(packet)
+
+    results.append(time.time())
+
+
+def run(threads, packets):
+    barrier = threading.Barrier(threads + 1)
+    results = []
+    workers = [threading.Thread(target=worker, args=(packets, barrier, results))
+               for _ in range(threads)]
+
+    for thread in workers:
+        thread.start()
+
+    barrier.wait()
+    start = time.time()
+
+    for thread in workers:
+        thread.join()
+
+    return max(results) - start
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    max_threads = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    packets = capture(size)
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print("%s, GIL %s, %d cpus" % (sys.version.split()[0], "enabled" if gil else "disabled", os.cpu_count() or 1))
+
+    counts = [1]
+    while counts[-1] * 2 <= max_threads:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_threads:
+        counts.append(max_threads)
+
+    base = None
+
+    for threads in counts:
+        elapsed = min(run(threads, packets) for _ in range(3))
+        rate = threads * len(packets) / elapsed
+        base = base or rate
+
+        print("%3d threads  %8d packets  %.3fs  %8.0f packets/s  %.2fx" % (
+            threads, threads * len(packets), elapsed, rate, rate / base))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Compares parse() wrapped in try/except with try_parse() on a capture
+with a realistic share of failing packets
+
+    PYTHONPATH=. python benchmarks/bench_try_parse.py [packets] [failure ratio]
+"""
+import sys
+import timeit
+
+from corpus import mixed_capture
+from aprslib import parse, try_parse
+from aprslib.exceptions import ParseError, UnknownFormat
+
+
+def with_exceptions(packets):
+    failed = 0
+    for packet in packets:
+        try:
+            parse(packet)
+        except (ParseError, UnknownFormat):
+            failed += 1
+    return failed
+
+
+def with_codes(packets):
+    failed = 0
+    for packet in packets:
+        if try_parse(packet)[1] is not None:
+            failed += 1
+    return failed
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.12
+    packets = mixed_capture(size, ratio)
+
+    funcs = (("parse", with_exceptions), ("try_parse", with_codes))
+    best = dict((label, None) for label, _ in funcs)
+
+    # alternate the runs, so both see the same machine conditions
+    for _ in range(7):
+        for label, func in funcs:
+            elapsed = timeit.timeit(lambda: func(packets), number=1)
+            best[label] = elapsed if best[label] is None else min(best[label], elapsed)
+
+    for label, func in funcs:
+        print("%-10s %8d packets  %6d failed  %.3fs  %.1f us/packet" % (
+            label, len(packets), func(packets), best[label], best[label] / len(packets) * 1e6))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Times weather decoding on the weather reports in the sample capture
+
+    PYTHONPATH=. python benchmarks/bench_weather.py [repeat]
+"""
+import sys
+import timeit
+
+from corpus import PACKETS
+from aprslib import parse
+from aprslib.parsing import parse_weather_data
+
+WEATHER = [p for p in PACKETS if b':_' in p or b'W_' in p]
+
+# the weather part of each report, as handed to parse_weather_data()
+FIELDS = [p.split(b'_', 1)[1].decode('ascii') for p in WEATHER]
+FIELDS = [f[8:] if f[:8].isdigit() else f for f in FIELDS]
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    for label, func, data in (("parse_weather_data", parse_weather_data, FIELDS),
+                              ("parse", parse, WEATHER)):
+        elapsed = min(timeit.repeat(lambda: [func(d) for d in data], number=number, repeat=5))
+        print("%-20s %.2f us/packet" % (label, elapsed / number / len(data) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
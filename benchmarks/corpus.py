@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Sample APRS-IS traffic used by the benchmark scripts
+
+``PACKETS`` is a mix of the packet formats commonly seen on the APRS-IS
+feed. ``capture()`` repeats it to build a larger stream, the way a handful
+of stations keep reporting over time.
+"""
+import itertools
+
+PACKETS = [
+    # uncompressed positions
+    b"FROMCALL>APRS,WIDE1-1,WIDE2-1,qAR,IGATE:!4903.50N/07201.75W-Test /A=001234",
+    b"N0CALL-9>APRS,TCPIP*,qAC,T2TEST:=4903.50N/07201.75W>PHG5132 mobile station",
+    b"N0CALL-1>APDR15,TCPIP*,qAC,T2TEST:/092345z4903.50N/07201.75W>088/036/A=000123",
+    b"DB0XYZ>APNU19,qAR,DB0ABC:!5126.12N/01234.56E#PHG3460/ digipeater !wvU!",
+    # compressed positions
+    b"M0XER-4>APRS64,TF3RPF,WIDE2*,qAR,TF3SUT-2:!/.(M4I^C,O `DXa/A=040849|#B>@\"v90!+|",
+    b"SQ1ABC-7>APOTC1,qAR,SR1DEF:!/4C.=0'\\Zk  G OpenTracker",
+    # mic-e
+    b"VE3XYZ-9>TQ4W2V,WIDE1-1,qAR,VE3ABC:`c51!f?>/]\"4W}Moving along=",
+    b"K6ABC-9>S32U6T,WIDE1-1,WIDE2-1,qAR,K6DEF:`(_fn\"Oj/]\"3u}commute",
+    # weather
+    b"CW1234>APRS,TCPXX*,qAX,CWOP-1:@092345z4903.50N/07201.75W_225/000g000t050r000p001P000h00b10138L123",
+    b"WX1ABC>APRS,WIDE2-1,qAR,WX1DEF:_10090556c220s004g005t077r010p020P030h50b09900",
+    b"EW1234>APRS,TCPXX*,qAX,CWOP-3:@191045z5134.23N/00007.59W_180/004g009t052r000p000P000h86b10154L000eCumulusDsVP",
+    b"CW5678>APRS,TCPXX*,qAX,CWOP-5:=3352.41N/11800.98W_.../...g...t071r...p...P...h52b10123wview",
+    # objects
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST:;LEADER   *092345z4903.50N/07201.75W>088/036 object",
+    # status and messages
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST:>status text",
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST::KB2ICI-14:Message text{00123",
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST::KB2ICI-14:ack00123",
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST::N0CALL   :PARM.Battery,BTemp,AirTemp,Pres,Altude",
+    # telemetry and unsupported
+    b"N0CALL-11>APRS,TCPIP*,qAC,T2TEST:T#005,199,000,255,073,123,01101001",
+    b"N0CALL>GPSLK,qAR,N0CALL-2:$GPRMC,063909,A,3349.4302,N,11700.3721,W,43.022,89.3,291099,13.6,E*52",
+    # non-ascii free text
+    u"R1XYZ>APRS,TCPIP*,qAC,T2TEST:>Статус станции".encode('cp1251'),
+    u"JA1XYZ>APRS,TCPIP*,qAC,T2TEST:>テスト局です".encode('shift_jis'),
+    u"DL1XYZ>APRS,TCPIP*,qAC,T2TEST:>Grüße aus München".encode('utf-8'),
+]
+
+# packets that fail to parse, roughly in the proportions seen on the feed
+FAILING = [
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST:<IGATE,MSG_CNT=0,LOC_CNT=0",
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST:?APRS?",
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST:[JO62QN",
+    b"N0CALL>CQ,TCPIP*,qAC,T2TEST:%agrelo",
+    b"N0CALL>NOTAPRS,TCPIP*,qAC,T2TEST:~unknown type",
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST:!4903.50N/07201",
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST:=0000.00N/00000.00E",
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST:!4903. 0N/07201.75W-",
+    b"N0CALL-9>T2SP0,WIDE1-1,qAR,N0CALL-2:`(_fn\"Oj/]",
+    b"N0CALL-9>TLZZZZ,WIDE1-1,qAR,N0CALL-2:`(_fn\"Oj/]",
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST:",
+    b"N0CALL>APRS,TCPIP*,qAC,T2TEST",
+]
+
+
+def capture(size=10000):
+    """
+    Returns a list of ``size`` packets cycling through ``PACKETS``
+    """
+    return list(itertools.islice(itertools.cycle(PACKETS), size))
+
+
+def mixed_capture(size=10000, failures=0.12):
+    """
+    Returns a capture where about ``failures`` of the packets fail to parse
+    """
+    every = max(1, int(round(1 / failures))) if failures else size + 1
+    failing = itertools.cycle(FAILING)
+
+    return [next(failing) if i % every == 0 else packet
+            for i, packet in enumerate(capture(size))]
@@ -321,6 +321,32 @@ class TC_IS(unittest.TestCase):
 
             mox.Verify(self.ais.sock)
 
+    def test_sendall_packet(self):
+        from aprslib.packets.base import APRSPacket
+
+        self.ais._connected = True
+        self.ais.sock = mox.MockAnything()
+        self.ais.sock.setblocking(mox.IgnoreArg())
+        self.ais.sock.settimeout(mox.IgnoreArg())
+        self.ais.sock.sendall(b"N0CALL>APRS:>status\r\n")
+        mox.Replay(self.ais.sock)
+
+        self.ais.sendall(APRSPacket("N0CALL>APRS:>status"))
+
+        mox.Verify(self.ais.sock)
+
+    def test_sendall_bytes(self):
+        self.ais._connected = True
+        self.ais.sock = mox.MockAnything()
+        self.ais.sock.setblocking(mox.IgnoreArg())
+        self.ais.sock.settimeout(mox.IgnoreArg())
+        self.ais.sock.sendall(b"N0CALL>APRS:>status\r\n")
+        mox.Replay(self.ais.sock)
+
+        self.ais.sendall(b"N0CALL>APRS:>status\r\n")
+
+        mox.Verify(self.ais.sock)
+
 
 class TC_IS_consumer(unittest.TestCase):
     def setUp(self):
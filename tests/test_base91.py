@@ -1,4 +1,5 @@
 import unittest
+import random
 import sys
 
 from aprslib import base91
@@ -110,5 +111,48 @@ class c_Both(unittest.TestCase):
             self.assertEqual(result, largeN)
 
 
+class d_Reference(unittest.TestCase):
+    def assertSameResult(self, func, reference, *args):
+        try:
+            expected = reference(*args)
+        except ValueError:
+            self.assertRaises(ValueError, func, *args)
+        else:
+            self.assertEqual(func(*args), expected)
+
+    def test_to_decimal_two_chars(self):
+        chars = [chr(i) for i in range(256)]
+
+        for a in chars:
+            self.assertSameResult(base91.to_decimal, base91.to_decimal_reference, a)
+
+            for b in chars:
+                self.assertSameResult(base91.to_decimal, base91.to_decimal_reference, a + b)
+
+    def test_to_decimal_wider(self):
+        rnd = random.Random(47)
+
+        for width in (0, 3, 4, 5, 9, 20):
+            for _ in range(2000):
+                text = "".join(chr(rnd.randrange(30, 130)) for _ in range(width))
+                self.assertSameResult(base91.to_decimal, base91.to_decimal_reference, text)
+
+    def test_from_decimal(self):
+        for number in range(91**2 + 91):
+            for width in (0, 1, 2, 3):
+                self.assertEqual(base91.from_decimal(number, width),
+                                 base91.from_decimal_reference(number, width))
+
+    def test_from_decimal_wider(self):
+        rnd = random.Random(47)
+        numbers = [91**i + d for i in range(2, 30) for d in (-1, 0, 1)]
+        numbers += [rnd.randrange(91**i) for i in range(3, 30) for _ in range(200)]
+
+        for number in numbers:
+            for width in (1, 4, 8):
+                self.assertEqual(base91.from_decimal(number, width),
+                                 base91.from_decimal_reference(number, width))
+
+
 if __name__ == '__main__':
     unittest.main()
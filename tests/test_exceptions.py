@@ -1,6 +1,7 @@
 import unittest
 
 from aprslib.exceptions import *
+from aprslib.exceptions import _IntEnum
 
 
 class ExceptionCorrectness(unittest.TestCase):
@@ -41,3 +42,24 @@ class ExceptionCorrectness(unittest.TestCase):
         excpInst = ConnectionDrop("test")
 
         self.assertIsInstance(excpInst, GenericError)
+
+
+class IntEnumFallback(unittest.TestCase):
+    def test_members(self):
+        # ParseErrorCode is based on it when the enum module is missing
+        class Code(_IntEnum):
+            EMPTY_PACKET = 1
+            INVALID_FORMAT = 7
+
+        self.assertTrue(Code(7) is Code.INVALID_FORMAT)
+        self.assertEqual(Code(7).name, 'INVALID_FORMAT')
+        self.assertEqual(Code.EMPTY_PACKET.value, 1)
+        self.assertEqual(Code.INVALID_FORMAT, 7)
+        self.assertEqual(list(Code), [Code.EMPTY_PACKET, Code.INVALID_FORMAT])
+        self.assertEqual(repr(Code.EMPTY_PACKET), "<Code.EMPTY_PACKET: 1>")
+        self.assertRaises(ValueError, Code, 3)
+
+    def test_parse_error_code(self):
+        for code in ParseErrorCode:
+            self.assertTrue(ParseErrorCode(int(code)) is code)
+            self.assertEqual(getattr(ParseErrorCode, code.name), code)
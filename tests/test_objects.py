@@ -0,0 +1,107 @@
+import unittest
+
+from aprslib import parse, ObjectRegistry
+
+
+def object_packet(name, flag='*', timestamp='092345z', source='N0CALL'):
+    return parse("%s>APRS:;%-9s%s%s4903.50N/07201.75W>" % (source, name, flag, timestamp))
+
+
+def key(name):
+    return ("N0CALL", name)
+
+
+class ObjectRegistryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000000
+        self.registry = ObjectRegistry(ttl=60, maxsize=3, clock=lambda: self.now)
+
+    def test_update(self):
+        parsed = object_packet("LEADER")
+
+        self.assertEqual(self.registry.update(parsed), key("LEADER"))
+        self.assertIs(self.registry.get(key("LEADER")), parsed)
+        self.assertIs(self.registry.get(key("LEADER   ")), parsed)
+        self.assertIn(key("LEADER"), self.registry)
+        self.assertEqual(self.registry.items(), [(key("LEADER"), parsed)])
+
+        newer = object_packet("LEADER", timestamp='092346z')
+        self.registry.update(newer)
+
+        self.assertIs(self.registry.get(key("LEADER")), newer)
+        self.assertEqual(len(self.registry), 1)
+
+    def test_items_and_objects_share_names(self):
+        self.registry.update(object_packet("AID"))
+        item = parse("N0CALL>APRS:)AID!4903.50N/07201.75WA")
+        self.registry.update(item)
+
+        self.assertIs(self.registry.get(key("AID")), item)
+        self.assertEqual(len(self.registry), 1)
+
+    def test_names_per_source(self):
+        mine = object_packet("LEADER")
+        theirs = object_packet("LEADER", source="N1CALL")
+        self.registry.update(mine)
+
+        self.assertEqual(self.registry.update(theirs), ("N1CALL", "LEADER"))
+        self.assertIs(self.registry.get(key("LEADER")), mine)
+        self.assertIs(self.registry.get(("N1CALL", "LEADER")), theirs)
+        self.assertEqual(len(self.registry), 2)
+
+    def test_other_formats(self):
+        self.assertIsNone(self.registry.update(None))
+        self.assertIsNone(self.registry.update(parse("N0CALL>APRS:>status")))
+        self.assertEqual(len(self.registry), 0)
+
+        parsed = parse("N0CALL>APRS:}N0CALL>APRS,TCPIP,N0CALL*:)AID!4903.50N/07201.75WA")
+        self.assertEqual(self.registry.update(parsed), key("AID"))
+        self.assertIs(self.registry.get(key("AID")), parsed['subpacket'])
+
+    def test_kill(self):
+        self.registry.update(object_packet("LEADER"))
+        self.assertEqual(self.registry.update(object_packet("LEADER", '_', '092346z')), key("LEADER"))
+
+        self.assertNotIn(key("LEADER"), self.registry)
+        self.assertEqual(len(self.registry), 0)
+
+    def test_older_report_ignored(self):
+        parsed = object_packet("LEADER")
+        self.registry.update(parsed)
+
+        self.assertIsNone(self.registry.update(object_packet("LEADER", timestamp='092344z')))
+        self.assertIsNone(self.registry.update(object_packet("LEADER", '_', '092344z')))
+        self.assertIs(self.registry.get(key("LEADER")), parsed)
+
+    def test_ttl(self):
+        self.registry.update(object_packet("A"))
+        self.now += 30
+        self.registry.update(object_packet("B"))
+        self.now += 30
+
+        self.assertIsNone(self.registry.get(key("A")))
+        self.assertEqual(list(self.registry), [key("B")])
+
+        self.assertEqual(len(self.registry), 1)
+
+        self.now += 30
+        self.assertEqual(len(self.registry), 0)
+        self.assertEqual(self.registry.items(), [])
+
+    def test_maxsize(self):
+        for name in "ABCD":
+            self.registry.update(object_packet(name))
+
+        self.registry.update(object_packet("B", timestamp='092346z'))
+        self.registry.update(object_packet("E"))
+
+        self.assertEqual(list(self.registry), [key(name) for name in "DBE"])
+
+    def test_unbounded(self):
+        registry = ObjectRegistry(ttl=None, maxsize=None, clock=lambda: self.now)
+
+        for i in range(100):
+            registry.update(object_packet("OBJ%d" % i))
+
+        self.now += 10 ** 9
+        self.assertEqual(len(list(registry)), 100)
@@ -0,0 +1,153 @@
+import random
+import unittest
+
+from aprslib import parse
+from aprslib.packets import PositionReport, TelemetryReport, PacketTemplate, render_batch
+from aprslib.packets.base import APRSPacket
+
+
+class PacketsTC(unittest.TestCase):
+    def test_defaults_not_shared(self):
+        a, b = PositionReport(), PositionReport()
+        a.path.append("WIDE1-1")
+
+        self.assertEqual(b.path, [])
+
+        a, b = TelemetryReport(), TelemetryReport()
+        a.telemetry['vals'][0] = '5'
+
+        self.assertEqual(b.telemetry, {'seq': 0, 'vals': ['0'] * 5 + [['1'] * 8]})
+        self.assertEqual(str(b), "N0CALL>N0CALL:T#000,000,000,000,000,000,11111111")
+
+    def test_slots(self):
+        for cls in (APRSPacket, PositionReport, TelemetryReport):
+            self.assertFalse(hasattr(cls(), '__dict__'))
+
+    def test_from_parsed(self):
+        parsed = parse("N0CALL>APRS,WIDE1-1:/092345z4903.50N/07201.75W>comment")
+        packet = PositionReport.from_parsed(parsed)
+
+        self.assertEqual(packet.fromcall, "N0CALL")
+        self.assertEqual(packet.tocall, "APRS")
+        self.assertEqual(packet.path, ["WIDE1-1"])
+        self.assertEqual(packet.latitude, parsed['latitude'])
+        self.assertEqual(packet.symbol, '>')
+        self.assertEqual(packet.comment, "comment")
+        self.assertEqual(packet.altitude, None)
+        self.assertEqual(packet, PositionReport(parsed))
+
+    def test_telemetry_from_parsed(self):
+        for text in ("N0CALL>APRS:T#005,199,000,255,073,123,01101001",
+                     "N0CALL>APRS:T#MIC,1.5,-02,255,073,123,00000001 comment"):
+            parsed = parse(text)
+            packet = TelemetryReport.from_parsed(parsed)
+
+            self.assertEqual(str(packet), text)
+            self.assertEqual(parse(str(packet))['telemetry'], parsed['telemetry'])
+
+        packet = TelemetryReport.from_parsed(parse("N0CALL>APRS:T#005,199,000,255,073,0.25"))
+
+        self.assertEqual(packet.telemetry['vals'][5], ['1'] * 8)
+        self.assertEqual(str(packet), "N0CALL>APRS:T#005,199,000,255,073,0.25,11111111")
+
+    def test_load_raw(self):
+        packet = APRSPacket("N0CALL>APRS,WIDE1-1:>status")
+
+        self.assertEqual(packet.path, ["WIDE1-1"])
+        self.assertEqual(str(packet), "N0CALL>APRS,WIDE1-1:>status")
+
+    def test_position_range(self):
+        self.assertRaises(ValueError, PositionReport.from_parsed, {'latitude': 91})
+        self.assertRaises(ValueError, PositionReport.from_parsed, {'longitude': -181})
+
+        packet = PositionReport.from_parsed({'latitude': 49.5, 'longitude': -72.25, 'comment': "test"})
+
+        self.assertEqual(str(packet), "N0CALL>N0CALL:!4930.00N/07215.00Wltest")
+
+    def test_cached_serialization(self):
+        packet = PositionReport.from_parsed({'latitude': 49.5, 'longitude': -72.25})
+        text = str(packet)
+
+        self.assertIs(str(packet), text)
+        self.assertEqual(packet.to_bytes(), text.encode('ascii'))
+        self.assertIs(packet.to_bytes(), packet.to_bytes())
+
+        packet.latitude = -10
+        self.assertEqual(str(packet), "N0CALL>N0CALL:!1000.00S/07215.00Wl")
+
+        packet.path.append("WIDE1-1")
+        self.assertEqual(packet.to_bytes(), b"N0CALL>N0CALL,WIDE1-1:!1000.00S/07215.00Wl")
+
+        packet = TelemetryReport()
+        str(packet)
+        packet.telemetry['vals'][5][0] = '0'
+        self.assertEqual(str(packet), "N0CALL>N0CALL:T#000,000,000,000,000,000,01111111")
+
+    def test_hash(self):
+        a = APRSPacket("N0CALL>APRS:>status")
+        b = APRSPacket("N0CALL>APRS:>status")
+
+        self.assertEqual(hash(a), hash(b))
+        self.assertEqual(len(set([a, b])), 1)
+        self.assertIn("N0CALL>APRS:>status", set([a]))
+        self.assertNotEqual(a, APRSPacket("N0CALL>APRS:>other"))
+
+    def test_to_bytes_utf8(self):
+        packet = APRSPacket(u"N0CALL>APRS:>caf\xe9")
+
+        self.assertEqual(packet.to_bytes(), u"N0CALL>APRS:>caf\xe9".encode('utf-8'))
+
+
+class PacketTemplateTC(unittest.TestCase):
+    def setUp(self):
+        self.template = PacketTemplate('N0CALL-9', 'APRS', ['WIDE1-1'], '/', '>', "fleet")
+
+    def test_matches_position_report(self):
+        rnd = random.Random(50)
+
+        for i in range(4000):
+            latitude, longitude = rnd.uniform(-90, 90), rnd.uniform(-180, 180)
+
+            # coordinates as a tracker reports them
+            if i % 2:
+                latitude, longitude = round(latitude, 5), round(longitude, 5)
+
+            packet = PositionReport({
+                'from': 'N0CALL-9', 'to': 'APRS', 'path': ['WIDE1-1'], 'symbol': '>', 'comment': "fleet",
+                'latitude': latitude,
+                'longitude': longitude,
+                'timestamp': rnd.randrange(1, 2 * 10 ** 9),
+                })
+
+            self.assertEqual(self.template.render(latitude, longitude, packet.timestamp),
+                             (str(packet) + "\r\n").encode('ascii'))
+
+    def test_rounding(self):
+        self.assertEqual(self.template.render(-50.73175, 72.5, 86400 * 31 + 3600 + 60),
+                         b"N0CALL-9>APRS,WIDE1-1:/010101z5043.90S/07230.00E>fleet\r\n")
+
+    def test_comment_and_clock(self):
+        template = PacketTemplate('N0CALL', symbol_table='%', comment="fleet", clock=lambda: 60)
+
+        self.assertEqual(template.render(-1, 2, comment="moving"), b"N0CALL>APRS:/010001z0100.00S%00200.00El" + b"moving\r\n")
+        self.assertEqual(template.render(1, 2), b"N0CALL>APRS:/010001z0100.00N%00200.00Elfleet\r\n")
+
+        template = PacketTemplate('N0CALL', timestamp=False)
+        self.assertEqual(template.render(1, 2, 12345), b"N0CALL>APRS:!0100.00N/00200.00El\r\n")
+
+    def test_range(self):
+        self.assertRaises(ValueError, self.template.render, 90.5, 0)
+        self.assertRaises(ValueError, self.template.render, 0, -180.5)
+
+    def test_batch(self):
+        other = PacketTemplate('N1CALL', timestamp=False)
+        rows = [(self.template, 1, 2, 0), (other, 3, 4), (self.template, 5, 6, 0, "moving")]
+
+        self.assertEqual(render_batch(rows), [
+            b"N0CALL-9>APRS,WIDE1-1:/010000z0100.00N/00200.00E>fleet\r\n",
+            b"N1CALL>APRS:!0300.00N/00400.00El\r\n",
+            b"N0CALL-9>APRS,WIDE1-1:/010000z0500.00N/00600.00E>moving\r\n",
+            ])
+        self.assertEqual(self.template.render_many([(1, 2, 0), (5, 6, 0, "moving")]),
+                         [render_batch(rows)[0], render_batch(rows)[2]])
+
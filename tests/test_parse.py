@@ -1,12 +1,15 @@
 # encoding: utf-8
 
 import sys
+import threading
 import unittest
 from mox3 import mox
 
-from aprslib import parse
+import aprslib
+from aprslib import parse, try_parse, Parser, FieldProfile
 from aprslib import parsing
-from aprslib.exceptions import ParseError, UnknownFormat
+from aprslib.parsing import trace
+from aprslib.exceptions import ParseError, UnknownFormat, ParseErrorCode
 
 
 def _u(text, c='utf8'):
@@ -104,9 +107,9 @@ class ParseBranchesTestCase(unittest.TestCase):
         self.assertEqual(result, expected)
 
     def test_mice_format_branch(self):
-        self.m.StubOutWithMock(parsing, "parse_mice")
-        parsing.parse_mice("B", "test").AndReturn(('', {'format': ''}))
-        parsing.parse_mice("D", "test").AndReturn(('', {'format': ''}))
+        self.m.StubOutWithMock(parsing, "_decode_mice")
+        parsing._decode_mice("B", "test", None, parsing.mice_dstcall_cache).AndReturn(('', {'format': ''}))
+        parsing._decode_mice("D", "test", None, parsing.mice_dstcall_cache).AndReturn(('', {'format': ''}))
         self.m.ReplayAll()
 
         parse("A>B:`test")
@@ -124,5 +127,547 @@ class ParseBranchesTestCase(unittest.TestCase):
         self.m.VerifyAll()
 
 
+class EncodingCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.confidence = 0.99
+        self.chardet = parsing.chardet
+
+        test = self
+
+        class chardet:
+            @staticmethod
+            def detect(x):
+                test.calls.append(x)
+                return {'confidence': test.confidence, 'encoding': 'cp1251'}
+
+        parsing.chardet = chardet
+        parsing.encoding_cache.clear()
+
+    def tearDown(self):
+        parsing.chardet = self.chardet
+        parsing.encoding_cache.clear()
+
+    def test_ascii_skips_detection(self):
+        parse(b"A>B:>status")
+
+        self.assertEqual(self.calls, [])
+
+    def test_detected_encoding_is_cached_per_source(self):
+        packet = _u("A>B:>статус").encode('cp1251')
+
+        for _ in range(3):
+            self.assertEqual(parse(packet)['status'], _u("статус"))
+
+        self.assertEqual(len(self.calls), 1)
+
+        parse(_u("C>B:>статус").encode('cp1251'))
+
+        self.assertEqual(len(self.calls), 2)
+
+    def test_low_confidence_retried_on_longer_body(self):
+        self.confidence = 0.1
+        packet = _u("A>B:>статус").encode('cp1251')
+
+        parse(packet)
+        parse(packet)
+
+        self.assertEqual(len(self.calls), 1)
+
+        parse(packet + b" longer")
+
+        self.assertEqual(len(self.calls), 2)
+
+    def test_cache_is_bounded(self):
+        maxsize = parsing.encoding_cache.maxsize
+        parsing.encoding_cache.maxsize = 2
+
+        try:
+            for call in "ABC":
+                parse(_u("%s>B:>статус" % call).encode('cp1251'))
+        finally:
+            parsing.encoding_cache.maxsize = maxsize
+
+        self.assertEqual(len(parsing.encoding_cache), 2)
+        self.assertNotIn(b"A", parsing.encoding_cache)
+
+
+class BytesParseTestCase(unittest.TestCase):
+    def test_bytes_like_input(self):
+        packet = b"A>B:!4903.50N/07201.75W-Test /A=001234"
+        expected = parse(packet.decode('ascii'))
+
+        for data in (packet, bytearray(packet), memoryview(packet)):
+            self.assertEqual(parse(data), expected)
+
+    def test_structured_format_free_text_decoding(self):
+        text = _u("A>B:!4903.50N/07201.75W-Grüße /A=001234")
+        result = parse(text.encode('utf-8'))
+
+        self.assertEqual(result['raw'], text)
+        self.assertEqual(result['comment'], _u("Grüße"))
+        self.assertEqual(result['symbol'], '-')
+        self.assertEqual(result['altitude'], parse(text)['altitude'])
+
+    def test_structured_format_error_packet_is_decoded(self):
+        text = _u("A>B:!invalid Grüße")
+
+        try:
+            parse(text.encode('utf-8'))
+        except ParseError as exp:
+            self.assertEqual(exp.packet, text)
+        else:
+            self.fail("ParseError not raised")
+
+
+class RegisterFormatTestCase(unittest.TestCase):
+    def tearDown(self):
+        parsing.register_format('~', None)
+
+    def test_custom_format(self):
+        calls = []
+
+        def parse_tilde(packet_type, body, parsed):
+            calls.append((packet_type, body, parsed['to']))
+            return ('', {'format': 'tilde', 'tilde': body})
+
+        self.assertRaises(UnknownFormat, parse, "A>B:~test")
+
+        parsing.register_format('~', parse_tilde)
+        result = parse("A>B:~test")
+
+        self.assertEqual(calls, [('~', 'test', 'B')])
+        self.assertEqual(result['format'], 'tilde')
+        self.assertEqual(result['tilde'], 'test')
+
+        parsing.register_format('~', None)
+
+        self.assertRaises(UnknownFormat, parse, "A>B:~test")
+
+    def test_parse_error_gets_packet(self):
+        def parse_tilde(packet_type, body, parsed):
+            raise ParseError("bad tilde")
+
+        parsing.register_format('~', parse_tilde)
+
+        try:
+            parse("A>B:~test")
+        except ParseError as exp:
+            self.assertEqual(exp.packet, "A>B:~test")
+        else:
+            self.fail("ParseError not raised")
+
+    def test_error_result(self):
+        parsing.register_format('~', lambda packet_type, body, parsed: (None, "bad tilde"))
+
+        self.assertEqual(try_parse("A>B:~test"), (None, ParseErrorCode.INVALID_FORMAT))
+
+        with self.assertRaises(ParseError) as ctx:
+            parse("A>B:~test")
+
+        self.assertEqual(str(ctx.exception), "bad tilde")
+        self.assertEqual(ctx.exception.packet, "A>B:~test")
+
+    def test_invalid_registration(self):
+        for packet_type in ['', '~~', None, 1, _u('\u0100')]:
+            self.assertRaises(ValueError, parsing.register_format, packet_type, None)
+
+        self.assertRaises(TypeError, parsing.register_format, '~', 'parser')
+
+
+class TryParseTestCase(unittest.TestCase):
+    def test_success(self):
+        packet = "A>B:!4903.50N/07201.75W-Test"
+
+        self.assertEqual(try_parse(packet), (parse(packet), None))
+
+    def test_error_codes(self):
+        testData = [
+            ("", ParseErrorCode.EMPTY_PACKET),
+            (b"", ParseErrorCode.EMPTY_PACKET),
+            ("A>B", ParseErrorCode.NO_BODY),
+            ("A>B:", ParseErrorCode.EMPTY_BODY),
+            ("A>B:!", ParseErrorCode.EMPTY_BODY),
+            ("A:asd", ParseErrorCode.INVALID_HEADER),
+            ("A>B:<aaa", ParseErrorCode.UNSUPPORTED_FORMAT),
+            ("A>B:~aaa", ParseErrorCode.UNKNOWN_FORMAT),
+            ("A>B:!aaa", ParseErrorCode.INVALID_FORMAT),
+            ]
+
+        for packet, code in testData:
+            self.assertEqual(try_parse(packet), (None, code), packet)
+
+    def test_matches_parse_exceptions(self):
+        testData = [
+            ("A>B:<aaa", UnknownFormat),
+            ("A>B:~aaa", UnknownFormat),
+            ("A>B", ParseError),
+            ("A:asd", ParseError),
+            ]
+
+        for packet, exception in testData:
+            self.assertRaises(exception, parse, packet)
+
+    def test_format_errors_not_raised(self):
+        testData = [
+            ("A>B:!4903.50N/07201", "invalid format"),
+            ("A>B:!9903.50N/07201.75W-", "latitude is out of range (0-90 degrees)"),
+            ("A>B:!4903. 0N/07201.75W-", "latitude and longitude ambiguity mismatch"),
+            ("A>B:!/5L!|<*e7>  !", "invalid characters in latitude/longitude encoding"),
+            ("A>B:;OBJECT", "invalid format"),
+            ("A>B:@092345z", "invalid position report format"),
+            ("A>T2SP0:`(_fn\"Oj/", "dstcall has to be 6 characters"),
+            ("A>T2SP0A:`(_fn\"Oj/", "invalid dstcall"),
+            ("A>TLZZZZ:`(_fn\"Oj/", "Unsupported position ambiguity: 5"),
+            ]
+
+        created = []
+        init = ParseError.__init__
+
+        def counting_init(self, *args, **kwargs):
+            created.append(args[0])
+            init(self, *args, **kwargs)
+
+        ParseError.__init__ = counting_init
+        try:
+            for packet, message in testData:
+                self.assertEqual(try_parse(packet), (None, ParseErrorCode.INVALID_FORMAT), packet)
+        finally:
+            ParseError.__init__ = init
+
+        self.assertEqual(created, [])
+
+        for packet, message in testData:
+            with self.assertRaises(ParseError) as ctx:
+                parse(packet)
+
+            self.assertEqual(str(ctx.exception), message)
+            self.assertEqual(ctx.exception.packet, packet)
+
+    def test_type_error(self):
+        self.assertRaises(TypeError, try_parse, None)
+
+    def test_packet_too_long(self):
+        packet = "A>B:>" + "x" * parsing.MAX_PACKET_LENGTH
+
+        self.assertEqual(try_parse(packet), (None, ParseErrorCode.PACKET_TOO_LONG))
+        self.assertEqual(try_parse(packet.encode('ascii')), (None, ParseErrorCode.PACKET_TOO_LONG))
+        self.assertRaises(ParseError, parse, packet)
+
+        limit = parsing.MAX_PACKET_LENGTH
+        parsing.MAX_PACKET_LENGTH = None
+        try:
+            self.assertEqual(parse(packet)['status'], "x" * limit)
+        finally:
+            parsing.MAX_PACKET_LENGTH = limit
+
+
+class FieldProfileTestCase(unittest.TestCase):
+    def test_selected_fields_only(self):
+        packet = "A>B:!4903.50N/07201.75W#PHG5132/A=001234|!!!!|test!W12!"
+        full = parse(packet)
+
+        for fields in (['from', 'comment', 'altitude'], FieldProfile(['from', 'comment', 'altitude'])):
+            result = parse(packet, fields=fields)
+            self.assertEqual(result, {
+                'from': full['from'],
+                'comment': full['comment'],
+                'altitude': full['altitude'],
+                })
+
+        self.assertEqual(try_parse(packet, fields=['raw']), ({'raw': packet}, None))
+
+    def test_skipped_decoding(self):
+        packet = "A>B:!4903.50N/07201.75W#PHG5132/A=001234|!!!!|test!W12!"
+        full = parse(packet)
+
+        # the comment telemetry is cut out, and DAO still corrects the position
+        result = parse(packet, fields=['phg', 'latitude', 'longitude', 'comment'])
+        self.assertEqual(result, dict((key, full[key]) for key in ('phg', 'latitude', 'longitude', 'comment')))
+
+        profile = FieldProfile(['from'])
+        self.assertFalse(profile.phg_details or profile.dao or profile.telemetry)
+        parsed = {'latitude': 1.0, 'longitude': 1.0}
+        self.assertEqual(parsing.parse_comment_extensions("x|!!!!|!W12!", parsed, profile=profile), "x")
+        self.assertEqual(parsed, {'latitude': 1.0, 'longitude': 1.0})
+        self.assertEqual(parsing.parse_data_extentions("PHG5132x", profile), ("x", {'phg': '5132'}))
+
+    def test_same_fields_as_full_parse(self):
+        packets = [
+            "A>B:!4903.50N/07201.75W#PHG5132/A=001234|!!!!|test!W12!",
+            "A>B:!4903.50N/07201.75W>088/036/270/729 df !wAB!",
+            "A>B:=4903.50N/07201.75W_225/000g000t050r000p001P000h00b10138 wx!W12!",
+            "A>B:!/5L!!<*e7>{?!RNG0050 !W12!",
+            "A>TQ4W2V:`c51!f?>/]\"4W}Moving along!wAB!=",
+            "A>T2SP0W:`(_fn\"Oj/'1234567890rest\"4W}!w5e!",
+            "A>B:_10090556c220s004g005t077r010p020P030h50b09900wRSW",
+            ]
+        testData = [
+            ['latitude', 'longitude'],
+            ['from', 'path', 'raw'],
+            ['comment'],
+            ['altitude', 'daodatumbyte'],
+            ['speed', 'phg_range', 'rng'],
+            ['weather', 'telemetry'],
+            ['mbits', 'bearing'],
+            ]
+
+        for packet in packets:
+            full = parse(packet)
+
+            for fields in testData:
+                expected = dict((key, value) for key, value in full.items() if key in fields)
+                self.assertEqual(parse(packet, fields=fields), expected, (packet, fields))
+
+    def test_comment_not_decoded(self):
+        calls = []
+        decode = parsing.position.parse_weather_data
+
+        def parse_weather_data(body):
+            calls.append(body)
+            return decode(body)
+
+        parsing.position.parse_weather_data = parse_weather_data
+        try:
+            packet = "A>B:=4903.50N/07201.75W_225/000g000t050r000p001P000h00b10138 wx"
+            parse(packet, fields=['from', 'latitude', 'longitude'])
+            self.assertEqual(calls, [])
+
+            parse(packet, fields=['weather'])
+            self.assertEqual(calls, ["g000t050r000p001P000h00b10138 wx"])
+        finally:
+            parsing.position.parse_weather_data = decode
+
+        result = parse("A>B:!4903.50N/07201.75W>088/036", fields=['from', 'raw'])
+        self.assertEqual(result, {'from': 'A', 'raw': "A>B:!4903.50N/07201.75W>088/036"})
+
+    def test_parser_reused(self):
+        packet = "A>B:!4903.50N/07201.75W#PHG5132/A=001234"
+        stats = parsing.thread_parser().stats
+        packets = stats['packets']
+
+        parse(packet, fields=['from', 'altitude'])
+        parser = parsing._parser_for(['altitude', 'from'], parsing.STRICT)
+
+        self.assertIs(parsing._parser_for(FieldProfile(['from', 'altitude']), parsing.STRICT), parser)
+        self.assertIsNot(parsing._parser_for(['from'], parsing.STRICT), parser)
+        self.assertIsNot(parsing._parser_for(['from', 'altitude'], parsing.LENIENT), parser)
+        self.assertEqual(parser.profile.fields, frozenset(['from', 'altitude']))
+        self.assertEqual(stats['packets'], packets + 1)
+
+    def test_registered_format(self):
+        parsing.register_format('~', lambda packet_type, body, parsed: ('', {'format': 'tilde', 'tilde': body}))
+
+        try:
+            self.assertEqual(parse("A>B:~test", fields=['tilde']), {'tilde': 'test'})
+        finally:
+            parsing.register_format('~', None)
+
+
+class ModesTestCase(unittest.TestCase):
+    def test_same_result_on_valid_packets(self):
+        testData = [
+            "A>B,C,qAR,D:!4903.50N/07201.75W-Test /A=001234",
+            "A>B:@092345z4903.50N/07201.75W_090/001g000t066r000p000...dUII",
+            "A>TQ4W2V:`c51!f?>/]\"4W}",
+            "A>B::N0CALL   :Message text{00123",
+            ]
+
+        for packet in testData:
+            expected = parse(packet)
+            for mode in (parsing.LENIENT, parsing.TRUSTED):
+                self.assertEqual(parse(packet, mode=mode), expected)
+
+    def test_validation(self):
+        packet = "A->B-99:!4903.50N/07201.75W-"
+        self.assertRaises(ParseError, parse, packet)
+        self.assertEqual(parse(packet, mode=parsing.LENIENT)['from'], 'A-')
+
+        packet = "A>B:!9903.50N/07201.75W-"
+        self.assertRaises(ParseError, parse, packet, mode=parsing.LENIENT)
+        self.assertAlmostEqual(parse(packet, mode=parsing.TRUSTED)['latitude'], 99.0583333)
+
+    def test_invalid_mode(self):
+        self.assertRaises(ValueError, parse, "A>B:>status", mode='sloppy')
+        self.assertRaises(ValueError, try_parse, "A>B:>status", mode='sloppy')
+
+class ParserTestCase(unittest.TestCase):
+    def test_same_result_as_parse(self):
+        parser = Parser()
+        packet = "A>B,C,qAR,D:/092345z4903.50N/07201.75W-Test /A=001234"
+
+        self.assertEqual(parser.parse(packet), parse(packet))
+        self.assertEqual(parser.try_parse(packet), (parse(packet), None))
+
+    def test_options(self):
+        parser = Parser(fields=['from', 'latitude'], mode=parsing.TRUSTED)
+
+        self.assertEqual(parser.parse("A>B:!9903.50N/07201.75W-"), {'from': 'A', 'latitude': 99.05833333333334})
+        self.assertRaises(ValueError, Parser, mode='sloppy')
+
+    def test_own_caches(self):
+        parser = Parser(clock=lambda: 1000000)
+        result = parser.parse(b"A>TQ4W2V:/020000z4903.50N/07201.75W-\xe4")
+
+        self.assertEqual(result['timestamp'], 86400)
+        self.assertIn("A>TQ4W2V", parser.header_cache)
+        self.assertIn(b"A", parser.encoding_cache)
+        self.assertNotIn(b"A", parsing.encoding_cache)
+
+        parser.parse("A>TQ4W2V:`c51!f?>/]\"4W}")
+        self.assertIn("TQ4W2V", parser.mice_cache)
+
+        parser.parse("A>B:$GPRMC,063909,A,3349.4302,N,11700.3721,W,,,170422,,")
+        self.assertIn("170422", parser.date_cache)
+        self.assertNotIn("170422", parsing.nmea_date_cache)
+
+    def test_cached_header_is_copied(self):
+        parser = Parser()
+        parser.parse("A>B,C:>status")['path'].append('D')
+
+        self.assertEqual(parser.parse("A>B,C:>status")['path'], ['C'])
+
+    def test_stats(self):
+        parser = Parser()
+        parser.parse("A>B:>status")
+        parser.try_parse("A>B")
+        self.assertRaises(ParseError, parser.parse, "A>B:!4903.50N/07201")
+
+        self.assertEqual(parser.stats, {'packets': 3, 'failed': 2})
+
+        parser.with_fields(['from']).parse("A>B:>status")
+        self.assertEqual(parser.stats['packets'], 4)
+
+        parser.clear()
+        self.assertEqual(parser.stats, {'packets': 0, 'failed': 0})
+        self.assertEqual(len(parser.header_cache), 0)
+
+    def test_thirdparty_uses_parser(self):
+        parser = Parser(fields=['from', 'subpacket'])
+        result = parser.parse("A>B:}C>D:>status")
+
+        self.assertEqual(result, {'from': 'A', 'subpacket': {'from': 'C'}})
+
+    def test_is_consumer(self):
+        parser = Parser()
+        ais = aprslib.IS("N0CALL", parser=parser)
+
+        self.assertEqual(ais._parse, parser.parse)
+        self.assertEqual(aprslib.IS("N0CALL")._parse, parse)
+
+
+class ThreadsTestCase(unittest.TestCase):
+    packets = [
+        "A>B,C,qAR,D:/092345z4903.50N/07201.75W-Test /A=001234",
+        "A>TQ4W2V:`c51!f?>/]\"4W}",
+        "A>B::N0CALL   :Message text{00123",
+        u"A>B:>Gr\xfc\xdfe".encode('cp1252'),
+        "A>B:$GPRMC,063909,A,3349.4302,N,11700.3721,W,43.022,89.3,291099,13.6,E*52",
+        "A>B",
+        ]
+
+    def run_threads(self, func, count=4):
+        results = [None] * count
+
+        def target(index):
+            results[index] = func()
+
+        threads = [threading.Thread(target=target, args=(i, )) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def test_own_parser_per_thread(self):
+        main = parsing.thread_parser()
+        self.assertTrue(main.encoding_cache is parsing.encoding_cache)
+        self.assertTrue(parsing.thread_parser(parsing.LENIENT).encoding_cache is parsing.encoding_cache)
+
+        parsers = self.run_threads(lambda: (parsing.thread_parser(), parsing.thread_parser()))
+
+        for first, second in parsers:
+            self.assertTrue(first is second)
+            self.assertFalse(first is main)
+            self.assertFalse(first.encoding_cache is parsing.encoding_cache)
+            self.assertFalse(first.header_cache is main.header_cache)
+            self.assertFalse(first.date_cache is main.date_cache)
+
+        self.assertEqual(len(set(id(first) for first, _ in parsers)), len(parsers))
+
+    def test_same_results(self):
+        expected = [try_parse(packet) for packet in self.packets]
+
+        def parse_all():
+            return [[try_parse(packet) for packet in self.packets] for _ in range(50)]
+
+        for results in self.run_threads(parse_all):
+            for result in results:
+                self.assertEqual(result, expected)
+
+
+class TraceTestCase(unittest.TestCase):
+    def tearDown(self):
+        for hook in list(trace._hooks):
+            trace.remove_hook(hook)
+
+    def test_no_hooks(self):
+        self.assertEqual(trace.hook, None)
+
+    def test_stages(self):
+        calls = []
+        trace.add_hook(lambda stage, detail: calls.append((stage, detail)))
+
+        result = parse("A>TQ4W2V:`c51!f?>/]\"4W}")
+
+        self.assertEqual(calls, [
+            ('packet', "A>TQ4W2V:`c51!f?>/]\"4W}"),
+            ('format', 'mic-e'),
+            ('parsed', result),
+            ])
+
+    def test_multiple_hooks(self):
+        first, second = [], []
+
+        def hook_first(stage, detail):
+            first.append(stage)
+
+        def hook_second(stage, detail):
+            second.append(stage)
+
+        trace.add_hook(hook_first)
+        trace.add_hook(hook_second)
+        trace.add_hook(hook_second)
+        parse("A>B:>status")
+
+        self.assertEqual(first, ['packet', 'format', 'parsed'])
+        self.assertEqual(second, first)
+
+        trace.remove_hook(hook_first)
+        self.assertTrue(trace.hook is hook_second)
+        trace.remove_hook(hook_second)
+        self.assertEqual(trace.hook, None)
+
+    def test_remove_bound_method(self):
+        class Recorder(object):
+            def __init__(self):
+                self.stages = []
+
+            def hook(self, stage, detail):
+                self.stages.append(stage)
+
+        recorder = Recorder()
+
+        # each access creates a new bound method object
+        trace.add_hook(recorder.hook)
+        trace.add_hook(recorder.hook)
+        parse("A>B:>status")
+        trace.remove_hook(recorder.hook)
+
+        self.assertEqual(trace.hook, None)
+        self.assertEqual(recorder.stages, ['packet', 'format', 'parsed'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,10 +1,12 @@
 import unittest
 import string
+import time
 from random import randint, randrange, sample
 from datetime import datetime
 
 from aprslib import base91
 from aprslib.parsing.common import *
+from aprslib.parsing.telemetry import parse_comment_telemetry
 from aprslib.exceptions import ParseError
 
 
@@ -155,6 +157,25 @@ class ParseHeader(unittest.TestCase):
             except ParseError:
                 continue
 
+    def test_modes(self):
+        head = "A->aaaaaaaaaaa,1234567890,qAR,C"
+        expected = {
+            "from": "A-",
+            "to": "aaaaaaaaaaa",
+            "via": "C",
+            "path": ['1234567890', 'qAR', 'C']
+            }
+
+        self.assertRaises(ParseError, parse_header, head)
+        self.assertRaises(ParseError, parse_header, head, STRICT)
+        self.assertEqual(parse_header(head, LENIENT), expected)
+        self.assertEqual(parse_header(head, TRUSTED), expected)
+
+        # the structure is still checked
+        for head in ["", ">CALL", "A>", "A>,B"]:
+            for mode in MODES:
+                self.assertRaises(ParseError, parse_header, head, mode)
+
 
 class TimestampTC(unittest.TestCase):
     def test_timestamp_invalid(self):
@@ -223,6 +244,57 @@ class TimestampTC(unittest.TestCase):
             'raw_timestamp': '999999z',
             })
 
+    def test_injected_clock(self):
+        def epoch(*args):
+            return int((datetime(*args) - datetime(1970, 1, 1)).total_seconds())
+
+        now = [epoch(2021, 3, 1, 0, 30, 0)]
+        decoder = TimestampDecoder(clock=lambda: now[0])
+
+        testData = [
+            # same day and month
+            ("000000h", epoch(2021, 3, 1, 0, 0, 0)),
+            ("010000z", epoch(2021, 3, 1, 0, 0, 0)),
+            # day rollover, sent before midnight
+            ("235959h", epoch(2021, 2, 28, 23, 59, 59)),
+            # month rollover, day is not in the current month
+            ("282359z", epoch(2021, 2, 28, 23, 59, 0)),
+            ("312359z", epoch(2021, 1, 31, 23, 59, 0)),
+            ("292359z", epoch(2021, 1, 29, 23, 59, 0)),
+            ("302359/", epoch(2021, 1, 30, 23, 59, 0)),
+            # month rollover, day is in the future
+            ("152359/", epoch(2021, 2, 15, 23, 59, 0)),
+            # invalid values
+            ("240000h", 0),
+            ("006000h", 0),
+            ("000060h", 0),
+            ("000000z", 0),
+            ("012400z", 0),
+            ("010060z", 0),
+            ("322359z", 0),
+            ]
+
+        for body, expected in testData:
+            remaining, parsed = parse_timestamp(body + "text", decoder=decoder)
+
+            self.assertEqual(remaining, 'text')
+            self.assertEqual(parsed, {
+                'timestamp': expected,
+                'raw_timestamp': body,
+                }, body)
+
+        # timestamps just after midnight, from a station with a fast clock
+        now[0] = epoch(2020, 2, 29, 23, 59, 0)
+
+        for body, expected in [("000100h", epoch(2020, 3, 1, 0, 1, 0)),
+                               ("010001z", epoch(2020, 3, 1, 0, 1, 0)),
+                               ("292359z", epoch(2020, 2, 29, 23, 59, 0))]:
+            self.assertEqual(parse_timestamp(body, decoder=decoder)[1]['timestamp'], expected)
+
+        # the 31st, after a 30 day month
+        now[0] = epoch(2026, 10, 19, 12, 0, 0)
+        self.assertEqual(decoder.decode("310000", 'z'), epoch(2026, 8, 31, 0, 0, 0))
+
 
 class CommentTC(unittest.TestCase):
     def test_comment(self):
@@ -244,6 +316,56 @@ class CommentTC(unittest.TestCase):
 
         self.assertEqual(parsed, {'comment': body.strip(' ')})
 
+    def test_extensions_match_sequential_parsers(self):
+        testData = [
+            "Test /A=001234",
+            "/A=-01234|!!!!|x!W12!",
+            "a|#B>@\"v90!+|b/A=040849c!wvU!d",
+            "|ab/A=123456cd|",
+            "|!!!!!|odd length",
+            "!W1!/A=001234",
+            "!!!!!!",
+            "|!w5e!!|",
+            "no extensions",
+            "line\n/A=001234",
+            ]
+
+        for body in testData:
+            expected = {'latitude': 10.0, 'longitude': -20.0}
+            text, result = parse_comment_altitude(body)
+            expected.update(result)
+            text, result = parse_comment_telemetry(text)
+            expected.update(result)
+            text = parse_dao(text, expected)
+
+            parsed = {'latitude': 10.0, 'longitude': -20.0}
+            self.assertEqual(parse_comment_extensions(body, parsed), text, body)
+            self.assertEqual(parsed, expected, body)
+
+    def test_line_breaks(self):
+        parsed = {'latitude': 0, 'longitude': 0}
+        self.assertEqual(parse_comment_extensions("a/A=001234|!!!!|!W12!\n", parsed), "a")
+        self.assertEqual(sorted(parsed), ['altitude', 'daodatumbyte', 'latitude', 'longitude', 'telemetry'])
+
+        parsed = {'latitude': 0, 'longitude': 0}
+        body = "a/A=001234|!!!!|!W12!\nb"
+        self.assertEqual(parse_comment_extensions(body, parsed), body)
+        self.assertEqual(parsed, {'latitude': 0, 'longitude': 0})
+
+    def test_adversarial_input_is_linear(self):
+        # each of these took seconds with the backtracking regexes
+        testData = [
+            "!" + "!a  " * 20000 + "\nx",
+            "|!!!!" * 20000 + "\nx",
+            "/A=000000" * 20000 + "\nx",
+            "|" * 50000 + "/A=000000" + "\n\n",
+            ]
+
+        for body in testData:
+            started = time.time()
+            parse_comment_extensions(body, {'latitude': 0, 'longitude': 0})
+            self.assertLess(time.time() - started, 0.5)
+
 
 class DataExtentionsTC(unittest.TestCase):
     def test_course_speed(self):
@@ -122,3 +122,41 @@ class MessageTestBodyTests(unittest.TestCase):
 
         self.assertEqual(unparsed, '')
         self.assertEqual(expected, result)
+
+# bulletins, announcements and invalid addressees
+class BulletinTests(unittest.TestCase):
+
+    # group bulletin, text is cut at 67 characters
+    def test_group_bulletin(self):
+        unparsed, result = parse_message("bln3WX   :" + "x" * 70)
+        expected = {
+            'format': 'group-bulletin',
+            'message_text': "x" * 67,
+            'bid': '3',
+            'identifier': 'WX',
+        }
+
+        self.assertEqual(unparsed, '')
+        self.assertEqual(expected, result)
+
+    # announcement needs an upper case BLN
+    def test_announcement(self):
+        unparsed, result = parse_message("BLNA     :Club meeting")
+        expected = {
+            'format': 'announcement',
+            'message_text': 'Club meeting',
+            'aid': 'A',
+            'identifier': '',
+        }
+
+        self.assertEqual(unparsed, '')
+        self.assertEqual(expected, result)
+
+        unparsed, result = parse_message("blnA     :Club meeting")
+        self.assertEqual(result['format'], 'message')
+        self.assertEqual(result['addresse'], 'blnA')
+
+    # addressee must be 9 characters followed by ':'
+    def test_invalid_addressee(self):
+        for body in ("WXBOT:text", "WXBOT    ;text", "WX/BOT   :text", "WXBOT    :a\nb"):
+            self.assertEqual(parse_message(body), ('', {}))
@@ -0,0 +1,114 @@
+import unittest
+
+from aprslib.parsing import mice
+from aprslib.parsing.mice import parse_mice
+from aprslib.exceptions import ParseError
+
+
+class ParseMiceTC(unittest.TestCase):
+    def setUp(self):
+        self.maxDiff = None
+        mice.mice_dstcall_cache.clear()
+
+    def test_position(self):
+        expected = {
+            'format': 'mic-e',
+            'symbol': '>',
+            'symbol_table': '/',
+            'posambiguity': 0,
+            'latitude': 41.78766666666667,
+            'mbits': '110',
+            'mtype': 'M1: En Route',
+            'longitude': -71.42016666666666,
+            'speed': 105.56400000000001,
+            'course': 35,
+            'altitude': 64,
+            'comment': ']Moving along=',
+            }
+
+        for _ in range(2):
+            self.assertEqual(parse_mice("TQ4W2V-9", "c51!f?>/]\"4W}Moving along="), ('', expected))
+
+    def test_message_bits(self):
+        testData = [
+            ("T2SP0W", '101', 'M2: In Service'),
+            ("ABCP0W", '222', 'C0: Custom-0'),
+            ("0A1P0W", '020', 'C5: Custom-5'),
+            ("000P0W", '000', 'Emergency'),
+            ]
+
+        for dstcall, mbits, mtype in testData:
+            _, parsed = parse_mice(dstcall, "(_fn\"Oj/")
+
+            self.assertEqual(parsed['mbits'], mbits)
+            self.assertEqual(parsed['mtype'], mtype)
+
+    def test_ambiguity(self):
+        testData = [
+            ("T2SP0W", 0, 42.50116666666667, -12.129),
+            ("T2S1PW", 0, -42.517833333333336, -112.129),
+            ("T2SPZZ", 2, 42.50833333333333, -112.125),
+            ("T2SZZZ", 3, 42.583333333333336, -112.08333333333333),
+            ("T2ZZZZ", 4, 42.5, -112.5),
+            ]
+
+        for dstcall, posambiguity, latitude, longitude in testData:
+            _, parsed = parse_mice(dstcall, "(_fn\"Oj/")
+
+            self.assertEqual(parsed['posambiguity'], posambiguity)
+            self.assertEqual(parsed['latitude'], latitude)
+            self.assertEqual(parsed['longitude'], longitude)
+
+    def test_telemetry_altitude_and_dao(self):
+        _, parsed = parse_mice("T2SP0W", "(_fn\"Oj/'1234567890rest\"4W}!w5e!")
+
+        self.assertEqual(parsed['telemetry'], [18, 52, 86, 120, 144])
+        self.assertEqual(parsed['altitude'], 64)
+        self.assertEqual(parsed['daodatumbyte'], 'W')
+        self.assertEqual(parsed['comment'], 'rest')
+
+        _, parsed = parse_mice("T2SP0W", "(_fn\"Oj/`1a2bx|!!!!|comment")
+
+        self.assertEqual(parsed['telemetry'], {'seq': 0, 'vals': [0, 0, 0, 0, 0], 'bits': '00000000'})
+        self.assertEqual(parsed['comment'], 'xcomment')
+
+    def test_altitude_last_match(self):
+        _, parsed = parse_mice("T2SP0W", "(_fn\"Oj/x}y\"4W}\"4X}z")
+
+        self.assertEqual(parsed['altitude'], 65)
+        self.assertEqual(parsed['comment'], 'x}y"4W}z')
+
+    def test_newline_in_comment(self):
+        _, parsed = parse_mice("T2SP0W", "(_fn\"Oj/\"4W}line\nbreak")
+
+        self.assertNotIn('altitude', parsed)
+        self.assertEqual(parsed['comment'], "\"4W}line\nbreak")
+
+    def test_invalid(self):
+        testData = [
+            ("T2SP0", "(_fn\"Oj/", "dstcall has to be 6 characters"),
+            ("T2SP0W", "(_fn\"O", "packet data field is too short"),
+            ("T2SP0a", "(_fn\"Oj/", "invalid dstcall"),
+            ("T2SP0W", "\x00_fn\"Oj/", "invalid data format"),
+            ("A1LP0W", "(_fn\"Oj/", "invalid latitude ambiguity"),
+            ("TMSP0W", "(_fn\"Oj/", "invalid latitude ambiguity"),
+            ("TLZZZZ", "(_fn\"Oj/", "Unsupported position ambiguity: 5"),
+            ]
+
+        for dstcall, body, message in testData:
+            for _ in range(2):
+                with self.assertRaises(ParseError) as ctx:
+                    parse_mice(dstcall, body)
+
+                self.assertEqual(str(ctx.exception), message)
+
+    def test_dstcall_cache(self):
+        parse_mice("T2SP0W-1", "(_fn\"Oj/")
+        parse_mice("T2SP0W-2", "(_fn\"Oj/")
+
+        self.assertEqual(len(mice.mice_dstcall_cache), 1)
+        self.assertIn("T2SP0W", mice.mice_dstcall_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+
+from aprslib import try_parse
+from aprslib.exceptions import ParseError, UnknownFormat, ParseErrorCode
+from aprslib.parsing import parse_nmea, classify, TRUSTED, TimestampDecoder
+
+
+class ParseNMEA(unittest.TestCase):
+    def setUp(self):
+        self.decoder = TimestampDecoder(clock=lambda: 1000000)
+
+    def test_rmc(self):
+        body = "GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A"
+
+        self.assertEqual(parse_nmea(body), ('', {
+            'format': 'nmea',
+            'nmea_sentence': 'RMC',
+            'symbol': '/',
+            'symbol_table': '/',
+            'posambiguity': 0,
+            'latitude': 48.1173,
+            'longitude': 11.516666666666667,
+            'speed': 22.4 * 1.852,
+            'course': 84,
+            'timestamp': 764426119,
+            }))
+
+    def test_gga(self):
+        body = "GPGGA,123519,4807.038,S,01131.000,W,1,08,0.9,545.4,M,46.9,M,,*47"
+        body = body[:-2] + "%02X" % (int(body[-2:], 16) ^ ord('N') ^ ord('S') ^ ord('E') ^ ord('W'))
+
+        self.assertEqual(parse_nmea(body, decoder=self.decoder), ('', {
+            'format': 'nmea',
+            'nmea_sentence': 'GGA',
+            'symbol': '/',
+            'symbol_table': '/',
+            'posambiguity': 0,
+            'latitude': -48.1173,
+            'longitude': -11.516666666666667,
+            'altitude': 545.4,
+            'timestamp': 11 * 86400 + 45319,
+            }))
+
+    def test_gll(self):
+        _, result = parse_nmea("GPGLL,4916.45,N,12311.12,W,225444,A,*1D", decoder=self.decoder)
+
+        self.assertEqual(result['latitude'], 49.274166666666666)
+        self.assertEqual(result['longitude'], -123.18533333333333)
+        self.assertEqual(result['timestamp'], 10 * 86400 + 82484)
+
+    def test_symbol(self):
+        testData = [
+            ("GPSLK", ('/', 'k')),
+            ("GPSC65-9", ('/', 'a')),
+            ("GPSE01", ('\\', '!')),
+            ("SYMPA", ('/', 'A')),
+            ("SPCOB", ('\\', '!')),
+            ("GPSAA5", ('5', 'A')),
+            ("GPSLK5", ('/', 'k')),
+            ("GPSC95", ('/', '/')),
+            ("GPSXY", ('/', '/')),
+            ("APRS", ('/', '/')),
+            ]
+
+        for tocall, symbol in testData:
+            _, result = parse_nmea("GPGLL,4916.45,N,12311.12,W,225444,A", tocall=tocall)
+            self.assertEqual((result['symbol_table'], result['symbol']), symbol, tocall)
+
+        self.assertEqual(try_parse("A>GPSLK:$GPGLL,4916.45,N,12311.12,W,225444,A")[0]['symbol'], 'k')
+
+    def test_talkers_and_checksum(self):
+        # the checksum is optional, and its hex digits may be lower case
+        for body in ("GNGLL,4916.45,N,12311.12,W,225444,A",
+                     "GNGLL,4916.45,N,12311.12,W,225444,A,*03",
+                     "GPGLL,4916.45,N,12311.12,W,225444,A,*1d"):
+            _, result = parse_nmea(body)
+            self.assertEqual(result['nmea_sentence'], 'GLL')
+
+        self.assertRaises(ParseError, parse_nmea, "GPGLL,4916.45,N,12311.12,W,225444,A,*1E")
+        self.assertRaises(ParseError, parse_nmea, "GPGLL,4916.45,N,12311.12,W,225444,A,*")
+
+    def test_no_fix(self):
+        for body in ("GPRMC,123519,V,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W",
+                     "GPGGA,123519,4807.038,N,01131.000,E,0,08,0.9,545.4,M,46.9,M,,",
+                     "GPGLL,4916.45,N,12311.12,W,225444,V"):
+            self.assertRaises(ParseError, parse_nmea, body)
+
+    def test_optional_fields(self):
+        _, result = parse_nmea("GPRMC,123519,A,4807.038,N,01131.000,E,,,,,")
+
+        self.assertNotIn('speed', result)
+        self.assertNotIn('course', result)
+        self.assertEqual(result['timestamp'], 0)
+
+        _, result = parse_nmea("GPRMC,123519,A,4807.038,N,01131.000,E,0.0,0.0,010100,,")
+
+        self.assertEqual(result['course'], 360)
+        self.assertEqual(result['timestamp'], 946730119)
+
+        for time, date in (("123519", "310299"), ("253519", "010100")):
+            _, result = parse_nmea("GPRMC,%s,A,4807.038,N,01131.000,E,,,%s,," % (time, date))
+            self.assertEqual(result['timestamp'], 0)
+
+    def test_invalid(self):
+        for body in ("GPRMC,123519,A,4807.038,N",
+                     "GPRMC,123519,A,4807038,N,01131.000,E,,,,,",
+                     "GPRMC,123519,A,4807.038,X,01131.000,E,,,,,",
+                     "GPRMC,123519,A,4807.038,N,01131.000,E,fast,,,,",
+                     "GPRMC,123519,A,9107.038,N,01131.000,E,,,,,",
+                     "GPRMC,123519,A,4807.038,N,18131.000,E,,,,,"):
+            self.assertRaises(ParseError, parse_nmea, body)
+
+        for value in ("nan", "inf", "-inf", "1e400", "1e5", "Infinity"):
+            for body in ("GPRMC,063909,A,3349.4302,N,11700.3721,W,1,%s,291099" % value,
+                         "GPRMC,063909,A,3349.4302,N,11700.3721,W,%s,1,291099" % value,
+                         "GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,%s,M,46.9,M,," % value):
+                self.assertRaises(ParseError, parse_nmea, body)
+
+            line = "A>B:$GPRMC,063909,A,3349.4302,N,11700.3721,W,1,%s,291099" % value
+            self.assertEqual(try_parse(line)[1], ParseErrorCode.INVALID_FORMAT)
+
+        _, result = parse_nmea("GPRMC,123519,A,9107.038,N,01131.000,E,,,,,", TRUSTED)
+        self.assertEqual(result['latitude'], 91.1173)
+
+    def test_unsupported_sentence(self):
+        self.assertRaises(UnknownFormat, parse_nmea, "GPGSV,3,1,11,03,03,111,00")
+        self.assertRaises(UnknownFormat, parse_nmea, "ULTW0000000001FF000427C70002CCD30001026E003A050F00040000")
+
+    def test_try_parse(self):
+        line = "N0CALL>GPSLK:$GPGLL,4916.45,N,12311.12,W,225444,A,*1D"
+
+        parsed, code = try_parse(line)
+        self.assertIsNone(code)
+        self.assertEqual(parsed['format'], 'nmea')
+
+        self.assertEqual(try_parse(line[:-1] + "E")[1], ParseErrorCode.INVALID_FORMAT)
+        self.assertEqual(try_parse("N0CALL>APRS:$ULTW0000")[1], ParseErrorCode.UNKNOWN_FORMAT)
+        self.assertEqual(classify(line), ('N0CALL', 'GPSLK', '$', 'nmea'))
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from aprslib.parsing import parse, classify, peek_position
+
+packets = [
+    "A>APRS,TCPIP*,qAC,T2TEST:!5126.12N/01234.56E#PHG3460/ digipeater",
+    "A>APRS:@092345z/5L!!<*e7>7P[",
+    "A>APRS:/092345z4903.50N/07201.75W>088/036",
+    "A>APRS:;LEADER   *092345z4903.50N/07201.75W>088/036",
+    "A>APRS:)AID #2!4903.50N/07201.75WA",
+    "A>TQ4W2V:`c51!f?>/]\"4W}",
+    "A>APRS:!49  .  N/072  .  W>",
+    ]
+
+
+class ClassifyTC(unittest.TestCase):
+    def test_agrees_with_parse(self):
+        for packet in packets:
+            parsed = parse(packet)
+            result = classify(packet)
+
+            self.assertEqual(result, (parsed['from'], parsed['to'], packet.split(':', 1)[1][0], parsed['format']))
+
+    def test_formats(self):
+        for body, expected in (
+                (":N0CALL   :hello{1", 'message'),
+                (":N0CALL   :PARM.Battery", 'telemetry-message'),
+                (">status text", 'status'),
+                ("_10090556c220s004g005t077", 'wx'),
+                ("}B>C:>status", 'thirdparty'),
+                ("T#005,199,000,255,073,123,01101001", 'telemetry'),
+                ("<IGATE,MSG_CNT=0", None),
+                ("xxx!4903.50N/07201.75W>", 'uncompressed'),
+                ):
+            self.assertEqual(classify("A>B:" + body)[3], expected)
+
+    def test_bytes(self):
+        packet = b"A>B,WIDE1-1:>status \xe4"
+
+        for raw in (packet, bytearray(packet), memoryview(packet)):
+            self.assertEqual(classify(raw), ('A', 'B', '>', 'status'))
+
+    def test_invalid(self):
+        for packet in ("", "A>B", "AB:test", "A>B:", ">B:test", "A:B>C"):
+            self.assertEqual(classify(packet), None)
+
+        self.assertRaises(TypeError, classify, 5)
+
+
+class PeekPositionTC(unittest.TestCase):
+    def test_agrees_with_parse(self):
+        for packet in packets:
+            parsed = parse(packet)
+
+            self.assertEqual(peek_position(packet), (parsed['latitude'], parsed['longitude']))
+            self.assertEqual(peek_position(packet.encode('ascii')), (parsed['latitude'], parsed['longitude']))
+
+    def test_no_position(self):
+        for packet in (
+                "A>B:>status",
+                "A>B:!4903.50N/07201.75",
+                "A>B:!4903.5 N/07201.75W>",
+                "A>B:!9903.50N/07201.75W>",
+                "A>B:`c51!f?>/",
+                "A>TQ4W2:`c51!f?>/]",
+                "A>B:_10090556c220s004g005t077",
+                "A>B:)AB!4903.50N/07201.75WA",
+                "A>B",
+                ):
+            self.assertEqual(peek_position(packet), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
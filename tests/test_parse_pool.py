@@ -0,0 +1,143 @@
+import decimal
+import unittest
+
+try:
+    import concurrent.futures as futures
+except ImportError:
+    futures = None  # py2 without the futures backport
+
+import aprslib
+from aprslib import parsing
+from aprslib.parsing import ParsePool, try_parse
+from aprslib.parsing.pool import _parse_chunk, _load_chunk, _register_formats
+from aprslib.exceptions import ParseErrorCode
+
+packets = [
+    "A>B,C,qAR,D:!4903.50N/07201.75W-Test /A=001234",
+    "A>TQ4W2V:`c51!f?>/]\"4W}",
+    "A>B::N0CALL   :Message text{00123",
+    u"A>B:>Gr\xfc\xdfe".encode('cp1252'),
+    "A>B:}C>D:>status",
+    "A>B",
+    "A>B:?APRS?",
+    "A>B:!4903.50N/07201",
+    ]
+
+
+def parse_tilde(packet_type, body, parsed):
+    return ('', {'format': 'tilde', 'tilde': body})
+
+
+class ParsePoolTC(unittest.TestCase):
+    def check_backend(self, backend):
+        expected = [try_parse(packet) for packet in packets] * 10
+
+        with ParsePool(backend, workers=2, chunksize=3) as pool:
+            self.assertEqual(list(pool.map(packets * 10)), expected)
+
+        with ParsePool(backend, workers=2, fields=['from', 'to']) as pool:
+            self.assertEqual(pool.submit(packets[:1]).result(), [({'from': 'A', 'to': 'B'}, None)])
+
+    @unittest.skipIf(futures is None, "needs concurrent.futures")
+    def test_thread(self):
+        self.check_backend('thread')
+
+    @unittest.skipIf(futures is None, "needs concurrent.futures")
+    def test_process(self):
+        self.check_backend('process')
+
+    @unittest.skipUnless(hasattr(futures, 'InterpreterPoolExecutor'), "needs Python 3.14+")
+    def test_interpreter(self):
+        self.check_backend('interpreter')
+
+    @unittest.skipIf(futures is None or hasattr(futures, 'InterpreterPoolExecutor'),
+                     "needs concurrent.futures without sub-interpreters")
+    def test_interpreter_unavailable(self):
+        self.assertRaises(RuntimeError, ParsePool, 'interpreter')
+
+    def check_registered_format(self, backend):
+        parsing.register_format('~', parse_tilde)
+
+        try:
+            with ParsePool(backend, workers=2) as pool:
+                self.assertEqual(list(pool.map(["A>B:~test"])), [try_parse("A>B:~test")])
+        finally:
+            parsing.register_format('~', None)
+
+        self.assertEqual(try_parse("A>B:~test"), (None, ParseErrorCode.UNKNOWN_FORMAT))
+
+    @unittest.skipIf(futures is None, "needs concurrent.futures")
+    def test_registered_format_process(self):
+        self.check_registered_format('process')
+
+    @unittest.skipUnless(hasattr(futures, 'InterpreterPoolExecutor'), "needs Python 3.14+")
+    def test_registered_format_interpreter(self):
+        self.check_registered_format('interpreter')
+
+    @unittest.skipIf(futures is None, "needs concurrent.futures")
+    def test_unpicklable_format(self):
+        parsing.register_format('~', lambda packet_type, body, parsed: ('', {}))
+
+        try:
+            self.assertRaises(ValueError, ParsePool, 'process')
+        finally:
+            parsing.register_format('~', None)
+
+    def test_worker_initializer(self):
+        _register_formats((('~', parse_tilde), ))
+
+        try:
+            self.assertEqual(try_parse("A>B:~test")[0]['tilde'], 'test')
+        finally:
+            parsing.register_format('~', None)
+
+    def test_invalid_options(self):
+        self.assertRaises(ValueError, ParsePool, 'fibers')
+        self.assertRaises(ValueError, ParsePool, 'thread', mode='sloppy')
+
+    def test_chunk_encoding(self):
+        data = _parse_chunk(packets, None, parsing.STRICT)
+
+        self.assertTrue(isinstance(data, bytes))
+        self.assertEqual(_load_chunk(data), [try_parse(packet) for packet in packets])
+        self.assertEqual(_load_chunk(data)[-1][1], ParseErrorCode.INVALID_FORMAT)
+
+    def test_chunk_encoding_fallback(self):
+        parsing.register_format('~', lambda packet_type, body, parsed: ('', {
+            'format': 'decimal',
+            'value': decimal.Decimal(body),
+            }))
+
+        try:
+            data = _parse_chunk(["A>B:~1.5"], None, parsing.STRICT)
+        finally:
+            parsing.register_format('~', None)
+
+        self.assertEqual(_load_chunk(data)[0][0]['value'], decimal.Decimal('1.5'))
+
+
+@unittest.skipIf(futures is None, "needs concurrent.futures")
+class ConsumerTC(unittest.TestCase):
+    def test_consumer_with_pool(self):
+        ais = aprslib.IS("N0CALL")
+        ais._connected = True
+        lines = [b"# aprsc 2.1"] + [packet if isinstance(packet, bytes) else packet.encode('ascii')
+                                   for packet in packets]
+
+        def readlines(blocking):
+            for i, line in enumerate(lines):
+                # more lines are pending until the last one
+                ais.buf = b"" if i == len(lines) - 1 else b"pending\r\n"
+                yield line
+
+        ais._socket_readlines = readlines
+        results = []
+
+        with ParsePool('thread', workers=2) as pool:
+            ais.consumer(results.append, blocking=False, pool=pool)
+
+        self.assertEqual(results, [try_parse(line)[0] for line in lines[1:] if try_parse(line)[1] is None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,23 @@
 import unittest
 from datetime import datetime
 
-from aprslib.parsing import parse_position
+from aprslib.exceptions import ParseError
+from aprslib.parsing import parse_position, parse_compressed
+from aprslib.parsing import common
 
 class ParsePositionDataExtAndWeather(unittest.TestCase):
+    now = datetime(2020, 3, 15, 12, 0, 0)
+
     def setUp(self):
         self.maxDiff = None
+        self.clock = common.timestamp_decoder.clock
+        common.timestamp_decoder.clock = lambda: (self.now - datetime(1970, 1, 1)).total_seconds()
+
+    def tearDown(self):
+        common.timestamp_decoder.clock = self.clock
 
     def timestamp_from_partial(self, day, hour, minute):
-        now = datetime.now()
-        corrected = now.replace(day=day, hour=hour, minute=minute, second=0, microsecond=0)
+        corrected = self.now.replace(day=day, hour=hour, minute=minute, second=0, microsecond=0)
         return int((corrected - datetime(1970, 1, 1)).total_seconds())
 
     def test_position_packet_only_weather_valid(self):
@@ -166,5 +174,58 @@ class ParsePositionDataExtAndWeather(unittest.TestCase):
         _, result = parse_position(packet_type, packet)
         self.assertEqual(expected, result)
 
+
+class ParseCompressed(unittest.TestCase):
+    def test_position(self):
+        _, result = parse_compressed("/5L!!<*e7>  !text")
+
+        self.assertEqual(result['latitude'], 90 - (((20 * 91 + 43) * 91 + 0) * 91 + 0) / 380926.0)
+        self.assertEqual(result['longitude'], -180 + (((27 * 91 + 9) * 91 + 68) * 91 + 22) / 190463.0)
+        self.assertEqual(result['gpsfixstatus'], 0)
+
+        self.assertRaises(ParseError, parse_compressed, "/5L!|<*e7>  !text")
+
+    def test_course_speed(self):
+        for s in range(92):
+            _, result = parse_compressed("/5L!!<*e7>!" + chr(33 + s) + "!")
+
+            self.assertEqual(result['course'], 360)
+            self.assertEqual(result['speed'], (1.08 ** s - 1) * 1.852)
+
+    def test_radio_range(self):
+        _, result = parse_compressed("/5L!!<*e7>{|!")
+        self.assertEqual(result['radiorange'], (2 * 1.08 ** 91) * 1.609344)
+
+    def test_altitude(self):
+        for cs in ("!!", "S]", "||", "S]"):
+            _, result = parse_compressed("/5L!!<*e7>" + cs + "3")
+            c, s = [ord(x) - 33 for x in cs]
+
+            self.assertEqual(result['altitude'], (1.002 ** (c * 91 + s)) * 0.3048)
+
+
+class ParseItem(unittest.TestCase):
+    def test_item(self):
+        _, result = parse_position(')', "AID #2!4903.50N/07201.75WAfirst aid")
+
+        self.assertEqual(result['item_name'], "AID #2")
+        self.assertTrue(result['alive'])
+        self.assertEqual(result['format'], 'item')
+        self.assertEqual(result['object_format'], 'uncompressed')
+        self.assertEqual(result['latitude'], 49.058333333333333)
+        self.assertEqual(result['comment'], "first aid")
+
+    def test_killed_compressed(self):
+        _, result = parse_position(')', "MOBIL_/5L!!<*e7>  !")
+
+        self.assertEqual(result['item_name'], "MOBIL")
+        self.assertFalse(result['alive'])
+        self.assertEqual(result['object_format'], 'compressed')
+
+    def test_invalid_name(self):
+        for body in ("AB!4903.50N/07201.75WA", "ABCDEFGHIJ!4903.50N/07201.75WA", "NAME"):
+            self.assertRaises(ParseError, parse_position, ')', body)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+from aprslib import parse, try_parse
+from aprslib.exceptions import ParseError, ParseErrorCode
+from aprslib.parsing import parse_telemetry_report
+
+
+class ParseTelemetryReport(unittest.TestCase):
+    def test_report(self):
+        self.assertEqual(parse_telemetry_report("#005,199,000,255,073,123,01101001"), ('', {
+            'format': 'telemetry',
+            'telemetry': {
+                'seq': 5,
+                'vals': [199, 0, 255, 73, 123],
+                'bits': '01101001',
+                },
+            }))
+
+    def test_mic(self):
+        for body in ("#MIC199,000,255,073,123,01101001", "#MIC,199,000,255,073,123,01101001"):
+            _, result = parse_telemetry_report(body)
+
+            self.assertEqual(result['telemetry'], {
+                'seq': 'MIC',
+                'vals': [199, 0, 255, 73, 123],
+                'bits': '01101001',
+                })
+
+    def test_values(self):
+        _, result = parse_telemetry_report("#1,1.5,-2,.5,3.,-0.25")
+
+        self.assertEqual(result['telemetry'], {'seq': 1, 'vals': [1.5, -2, 0.5, 3.0, -0.25]})
+
+    def test_bits_and_comment(self):
+        _, result = parse_telemetry_report("#005,1,2,3,4,5,01100000 solar panel")
+
+        self.assertEqual(result['telemetry']['bits'], '01100000')
+        self.assertEqual(result['comment'], 'solar panel')
+
+        _, result = parse_telemetry_report("#005,1,2,3,4,5,11111111comment")
+
+        self.assertEqual(result['telemetry']['bits'], '11111111')
+        self.assertEqual(result['comment'], 'comment')
+
+        _, result = parse_telemetry_report("#005,1,2,3,4,5,")
+
+        self.assertEqual(result, {'format': 'telemetry', 'telemetry': {'seq': 5, 'vals': [1, 2, 3, 4, 5]}})
+
+    def test_invalid(self):
+        for body in ("005,1,2,3,4,5", "#,1,2,3,4,5", "#5a,1,2,3,4,5", "#5,1,2,3,4",
+                     "#5,1,2,x,4,5", "#5,1,2,,4,5", "#5,1,2,.,4,5", "#5,1,2,1.2.3,4,5", "#5,1,2,--3,4,5"):
+            self.assertRaises(ParseError, parse_telemetry_report, body)
+
+    def test_missing_channel(self):
+        for body in ("#005,19,000,255073,123,01101001", "#005,199,000,255,01101001",
+                     "#MIC199,000,255,073,01101001"):
+            self.assertRaises(ParseError, parse_telemetry_report, body)
+
+        self.assertEqual(try_parse("A>B:T#005,19,000,255073,123,01101001"),
+                         (None, ParseErrorCode.INVALID_FORMAT))
+
+    def test_malformed_bits(self):
+        for body in ("#005,1,2,3,4,5,011", "#005,1,2,3,4,5,011 solar panel", "#005,1,2,3,4,5,011010011",
+                     "#005,1,2,3,4,5,0110100x", "#005,1,2,3,4,5,comment", "#005,1,2,3,4,5,6,01101001"):
+            self.assertRaises(ParseError, parse_telemetry_report, body)
+
+        self.assertEqual(try_parse("A>B:T#005,1,2,3,4,5,0110"), (None, ParseErrorCode.INVALID_FORMAT))
+
+    def test_parse(self):
+        result = parse("N0CALL-11>APRS,TCPIP*,qAC,T2TEST:T#005,199,000,255,073,123,01101001")
+
+        self.assertEqual(result['format'], 'telemetry')
+        self.assertEqual(result['telemetry']['vals'], [199, 0, 255, 73, 123])
+        self.assertEqual(try_parse("A>B:T#005,1,2"), (None, ParseErrorCode.INVALID_FORMAT))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -187,6 +187,21 @@ class ParseCommentWeather(unittest.TestCase):
         result = parse_weather_data("s...s999")
         self.assertEqual(expected, result)
 
+    def test_comment_is_untouched(self):
+        expected = "comments", {
+            "wind_gust": 0.0,
+            "temperature": 10.0,
+        }
+        result = parse_weather_data("g000t050comments")
+        self.assertEqual(expected, result)
+
+    def test_invalid_values_are_skipped(self):
+        expected = " rest", {
+            "temperature": 10.0,
+        }
+        result = parse_weather_data("g...t050h  b.....S-12 rest")
+        self.assertEqual(expected, result)
+
     def test_rain_raw(self):
         expected = "", {
             "rain_raw": 000